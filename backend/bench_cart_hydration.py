@@ -0,0 +1,83 @@
+"""
+Benchmark GET /api/user/cart hydration against a 20k-product Master.
+
+"before" is the old handler body: normalize the whole catalog, then scan it
+once per cart item. "after" is main.hydrate_cart over the cached catalog
+snapshot's id index. Latency should no longer grow with catalog size.
+
+Run: python bench_cart_hydration.py
+"""
+import time
+
+import main
+import sheets
+
+CATALOG_SIZES = [1_000, 20_000]
+CART_SIZES = [1, 10, 50]
+REPEATS = 20
+
+
+def make_master(count):
+    return [
+        {
+            "Product Name": f"Product {i}",
+            "Category": f"Category {i % 40}",
+            "Header Product Name": f"Product {i} Premium",
+            "Price_100g": f"₹ {100 + i % 50}",
+            "Price_250g": 250 + i % 90,
+            "Description": "Premium quality nuts. " * 5,
+        }
+        for i in range(count)
+    ]
+
+
+def make_cart(catalog_size, cart_size):
+    # Spread items across the catalog so the linear scan pays its average cost
+    step = catalog_size // cart_size
+    return [
+        {"product_id": f"Product {i * step + step // 2}", "added_at": "", "id": f"Product {i * step + step // 2}"}
+        for i in range(cart_size)
+    ]
+
+
+def hydrate_before(cart_items, master):
+    all_products = sheets.build_catalog(master).products
+    hydrated_cart = []
+    for item in cart_items:
+        product = next((p for p in all_products if p["id"] == item["product_id"]), None)
+        if product:
+            full_item = {**product, **item}
+            full_item.setdefault("quantity", 1)
+            full_item.setdefault("variant", "250g")
+            hydrated_cart.append(full_item)
+    return hydrated_cart
+
+
+def hydrate_after(cart_items):
+    return main.hydrate_cart(cart_items, sheets.get_catalog().products_by_id)
+
+
+def timed(func, repeats=REPEATS):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = func()
+    return (time.perf_counter() - start) / repeats * 1000, result
+
+
+def run():
+    print(f"{'catalog':>8} {'cart':>5} {'before (ms)':>12} {'after (ms)':>11} {'speedup':>9}")
+    for catalog_size in CATALOG_SIZES:
+        master = make_master(catalog_size)
+        sheets.CACHE["Master"] = {'data': master, 'timestamp': time.time(), 'version': catalog_size, 'indexes': {}}
+        sheets.get_catalog()  # warm-up builds the snapshot once per Master version
+        for cart_size in CART_SIZES:
+            cart = make_cart(catalog_size, cart_size)
+            before, expected = timed(lambda: hydrate_before(cart, master), repeats=3)
+            after, actual = timed(lambda: hydrate_after(cart))
+            assert actual == expected
+            print(f"{catalog_size:>8,} {cart_size:>5} {before:>12.2f} {after:>11.4f} {before / after:>8.0f}x")
+    sheets.CACHE.clear()
+
+
+if __name__ == "__main__":
+    run()
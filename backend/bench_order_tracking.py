@@ -0,0 +1,115 @@
+"""
+Load test: public order tracking (GET /api/orders/{order_id}) as order history grows.
+
+Drives the real FastAPI app in-process through httpx with concurrent clients, against a
+warm Orders cache of 1k..100k synthetic orders. Half the requests track real orders and
+half are bot-style guesses at IDs that don't exist. Latency should stay flat with order
+count; the old linear scan is timed alongside for comparison.
+
+Run: python bench_order_tracking.py [requests_per_size]
+"""
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+import httpx
+
+import main
+import sheets
+
+SIZES = [1_000, 10_000, 100_000]
+CONCURRENCY = 20
+
+
+def make_orders(count):
+    return [{
+        "Order_ID": f"ORD-{1700000000 + i}-{i % 9973:04X}",
+        "User_Email": f"user{i % 500}@example.com",
+        "Items": "[]",
+        "Total_Amount": 500,
+        "Created_At": "2024-01-01 10:00:00",
+        "Tracking_Stage": "Order Placed"
+    } for i in range(count)]
+
+
+def linear_get_order_by_id(orders, order_id):
+    """The lookup as it was before the index"""
+    for order in orders:
+        if order.get('Order_ID') == order_id:
+            return order
+    return None
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def drive(order_ids):
+    """Fire the requests with CONCURRENCY clients; returns per-request latencies in ms"""
+    transport = httpx.ASGITransport(app=main.app)
+    latencies = []
+    queue = list(order_ids)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            while queue:
+                order_id = queue.pop()
+                start = time.perf_counter()
+                response = await client.get(f"/api/orders/{order_id}")
+                latencies.append((time.perf_counter() - start) * 1000)
+                assert response.status_code in (200, 404)
+
+        await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return latencies
+
+
+def main_bench():
+    requests_per_size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    fetches = 0
+
+    def fake_fetch(sheet_name):
+        nonlocal fetches
+        fetches += 1
+        return sheets.CACHE[sheet_name]['data']
+
+    original_worksheet = sheets.get_worksheet
+    sheets.get_worksheet = lambda sheet_name, **kwargs: type("Sheet", (), {
+        "get_all_records": lambda self: fake_fetch(sheet_name)
+    })()
+    try:
+        print(f"{'orders':>8} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8} {'fetches':>8} {'linear scan ms':>15}")
+        for size in SIZES:
+            orders = make_orders(size)
+            sheets.CACHE.clear()
+            sheets.CACHE["Orders"] = {
+                'data': orders, 'timestamp': time.time(), 'version': next(sheets._version_counter), 'indexes': {}
+            }
+            sheets.get_index("Orders", "order_id")
+            fetches = 0
+
+            real = [random.choice(orders)["Order_ID"] for _ in range(requests_per_size // 2)]
+            guessed = [f"ORD-{random.randrange(10**9)}-BOT{i % 50}" for i in range(requests_per_size // 2)]
+            ids = real + guessed
+            random.shuffle(ids)
+
+            start = time.perf_counter()
+            latencies = asyncio.run(drive(ids))
+            elapsed = time.perf_counter() - start
+
+            scan_start = time.perf_counter()
+            for order_id in ids[:50]:
+                linear_get_order_by_id(orders, order_id)
+            scan_ms = (time.perf_counter() - scan_start) * 1000 / 50
+
+            print(f"{size:>8} {statistics.median(latencies):>8.2f} {percentile(latencies, 99):>8.2f} "
+                  f"{len(ids) / elapsed:>8.0f} {fetches:>8} {scan_ms:>15.3f}")
+    finally:
+        sheets.get_worksheet = original_worksheet
+        sheets.CACHE.clear()
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,115 @@
+"""
+Count Google API round trips per endpoint, before and after sharing the Sheets client.
+
+"before" drops the shared client ahead of every sheets.py call, which is exactly what the
+old code did (authorize + open_by_key + worksheet on each call). "after" keeps one warm
+client for the whole process. Each run starts from the same fresh data with empty caches,
+so reads are misses and both runs do the same work; "after" only has its client and
+worksheet handles opened beforehand.
+
+Run: python bench_round_trips.py
+"""
+import gspread
+
+import fake_sheets
+import sheets
+
+# The fake client (fake_sheets.FakeClient) counts every Sheets/Drive call it serves; these
+# kinds are authorization and metadata overhead rather than data reads and writes
+METADATA_CALLS = ("open_by_key", "worksheet", "worksheets", "add_worksheet", "get_lastUpdateTime")
+
+
+def make_fixture():
+    fixture = fake_sheets.make_fixture(products=50, users=20, orders=20, wishlist=20, subscribers=5)
+    fixture["OTP_Codes"] = (sheets.OTP_HEADERS, [
+        ["user0@example.com", "123456", "2024-01-01 10:00:00", "2999-01-01 00:00:00", "false"]
+    ])
+    return fixture
+
+
+FIXTURE = make_fixture()
+ORDER_ID = FIXTURE["Orders"][1][0][0]
+
+
+# Each endpoint is the sequence of sheets.py calls main.py makes for it
+ENDPOINTS = {
+    "GET /api/products": [lambda: sheets.get_products()],
+    "GET /api/categories": [lambda: sheets.get_categories()],
+    "GET /api/brands": [lambda: sheets.get_brands()],
+    "POST /api/auth/register": [
+        lambda: sheets.get_credentials_by_email("new@example.com"),
+        lambda: sheets.create_user("new@example.com", "hash"),
+    ],
+    "POST /api/auth/login": [
+        lambda: sheets.get_credentials_by_email("user0@example.com"),
+        lambda: sheets.update_session_token("user0@example.com", "token"),
+    ],
+    "PUT /api/user/profile": [
+        lambda: sheets.get_credentials_by_username("user0"),
+        lambda: sheets.update_user_profile_auth("user0@example.com", full_name="Bench"),
+    ],
+    "POST /api/auth/verify-otp": [lambda: sheets.verify_otp("user0@example.com", "123456")],
+    "POST /api/user/wishlist/{id}": [lambda: sheets.add_to_wishlist("user0@example.com", "Product 2")],
+    "POST /api/user/cart/{id}": [lambda: sheets.add_to_cart_history("user0@example.com", "Product 3")],
+    "GET /api/user/cart": [
+        lambda: sheets.get_user_cart("user0@example.com"),
+        lambda: sheets.get_products(),
+    ],
+    "POST /api/orders": [lambda: sheets.create_order({"email": "user0@example.com", "items": [], "total_amount": 500})],
+    "PUT /api/orders/{id}/status": [
+        lambda: sheets.get_order_by_id(ORDER_ID),
+        lambda: sheets.update_order_status(ORDER_ID, "Shipped"),
+    ],
+}
+
+
+def run_endpoint(calls, shared_client):
+    """(round trips, of which auth/metadata) for one endpoint against fresh data and empty caches"""
+    client = fake_sheets.FakeClient(FIXTURE)
+    sessions = []
+
+    def authorize(creds):
+        # A new client fetches an OAuth token before its first request
+        sessions.append(creds)
+        return client
+
+    original_authorize, original_credentials = gspread.authorize, sheets._load_credentials
+    gspread.authorize, sheets._load_credentials = authorize, lambda: None
+    try:
+        sheets.reset_sheets_client()
+        if shared_client:
+            # Open the client and worksheet handles only: no data is read or written, so
+            # the measured calls take the same path as in the "before" run
+            for sheet_name in FIXTURE:
+                sheets.get_worksheet(sheet_name)
+            sessions.clear()
+            client.reset_stats()
+        sheets.CACHE.clear()
+        for call in calls:
+            if not shared_client:
+                sheets.reset_sheets_client()
+            call()
+    finally:
+        gspread.authorize, sheets._load_credentials = original_authorize, original_credentials
+        sheets.reset_sheets_client()
+        sheets.CACHE.clear()
+    overhead = len(sessions) + sum(client.calls[kind] for kind in METADATA_CALLS)
+    return len(sessions) + sum(client.calls.values()), overhead
+
+
+def main():
+    print(f"{'Endpoint':32} {'before':>8} {'after':>8} {'saved':>8}   (auth/metadata before -> after)")
+    print("-" * 90)
+    total_before = total_after = 0
+    for name, calls in ENDPOINTS.items():
+        before, overhead_before = run_endpoint(calls, shared_client=False)
+        after, overhead_after = run_endpoint(calls, shared_client=True)
+        total_before += before
+        total_after += after
+        print(f"{name:32} {before:>8} {after:>8} {before - after:>8}   ({overhead_before} -> {overhead_after})")
+    print("-" * 90)
+    print(f"{'Total':32} {total_before:>8} {total_after:>8} {total_before - total_after:>8}")
+
+
+if __name__ == "__main__":
+    main()
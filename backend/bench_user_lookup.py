@@ -0,0 +1,83 @@
+"""
+Microbenchmark: user lookup by email/username over 100k synthetic users.
+
+Compares the old linear scan over the Users records with the normalized
+email/username indexes sheets.py now builds once per Users cache refresh.
+
+Run: python bench_user_lookup.py [user_count]
+"""
+import random
+import sys
+import time
+
+import sheets
+
+LOOKUPS = 200
+
+
+def make_users(count):
+    return [
+        {
+            "Email": f"User{i}@Example.com ",
+            "Username": f"user{i}",
+            "Password_Hash": "hash",
+            "Full_Name": f"User {i}",
+            "Profile_Complete": "true",
+        }
+        for i in range(count)
+    ]
+
+
+def linear_get_user_by_email(records, email):
+    """The lookup as it was before the index: normalize and compare every row"""
+    target_email = email.lower().strip()
+    for record in records:
+        if str(record.get('Email', '')).lower().strip() == target_email:
+            return record
+    return None
+
+
+def linear_get_user_by_username(records, username):
+    for record in records:
+        if str(record.get('Username', '')).lower() == username.lower():
+            return record
+    return None
+
+
+def timed(func, targets):
+    start = time.perf_counter()
+    for target in targets:
+        assert func(target) is not None
+    return (time.perf_counter() - start) / len(targets)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    records = make_users(count)
+    sheets.CACHE["Users"] = {'data': records, 'timestamp': time.time(), 'version': 0, 'indexes': {}}
+
+    start = time.perf_counter()
+    sheets.get_index("Users", "email")
+    sheets.get_index("Users", "username")
+    build = time.perf_counter() - start
+
+    rng = random.Random(42)
+    emails = [f"user{rng.randrange(count)}@example.com" for _ in range(LOOKUPS)]
+    usernames = [f"USER{rng.randrange(count)}" for _ in range(LOOKUPS)]
+
+    rows = [
+        ("get_user_by_email", timed(lambda e: linear_get_user_by_email(records, e), emails),
+         timed(sheets.get_user_by_email, emails)),
+        ("get_user_by_username", timed(lambda u: linear_get_user_by_username(records, u), usernames),
+         timed(sheets.get_user_by_username, usernames)),
+    ]
+
+    print(f"{count:,} users, {LOOKUPS} random lookups each; index build (both): {build * 1000:.1f} ms")
+    print(f"{'Lookup':24} {'linear scan':>14} {'indexed':>12} {'speedup':>10}")
+    for name, linear, indexed in rows:
+        print(f"{name:24} {linear * 1e6:>11.1f} us {indexed * 1e6:>9.2f} us {linear / indexed:>9.0f}x")
+    sheets.CACHE.clear()
+
+
+if __name__ == "__main__":
+    main()
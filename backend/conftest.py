@@ -0,0 +1,17 @@
+"""
+Shared pytest fixtures for the backend tests.
+"""
+import pytest
+
+import fake_sheets
+
+
+@pytest.fixture
+def sheets_api():
+    """Point sheets.py at a fake spreadsheet for one test.
+
+    Call it with a fixture ({sheet name: (headers, rows)}) and FakeClient options; it returns
+    the client. Caches are cleared going in and out.
+    """
+    with fake_sheets.installed() as install:
+        yield install
@@ -3,12 +3,22 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
 
+import metrics
+
 # Email configuration - these should be in environment variables
 SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
 SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
 SMTP_EMAIL = os.getenv('SMTP_EMAIL', '')
 SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
 
+def _send_message(msg, kind):
+    """Send msg over SMTP, recording latency and failures under `kind`"""
+    with metrics.timed(metrics.SMTP_SENDS, metrics.SMTP_ERRORS, kind=kind):
+        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
+            server.starttls()
+            server.login(SMTP_EMAIL, SMTP_PASSWORD)
+            server.send_message(msg)
+
 def send_otp_email(to_email: str, otp: str) -> bool:
     """
     Send OTP email to user
@@ -120,10 +130,7 @@ def send_otp_email(to_email: str, otp: str) -> bool:
             print(f"[TEST MODE] OTP for {to_email}: {otp}")
             return True
 
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_EMAIL, SMTP_PASSWORD)
-            server.send_message(msg)
+        _send_message(msg, "otp")
         
         print(f"OTP email sent successfully to {to_email}")
         return True
@@ -226,10 +233,7 @@ def send_welcome_email(to_email: str, username: str) -> bool:
             print(f"[TEST MODE] Welcome email would be sent to {to_email}")
             return True
 
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_EMAIL, SMTP_PASSWORD)
-            server.send_message(msg)
+        _send_message(msg, "welcome")
         
         print(f"Welcome email sent successfully to {to_email}")
         return True
@@ -278,10 +282,7 @@ def send_marketing_email(to_email: str, subject: str, content: str) -> bool:
             print(f"[TEST MODE] Marketing email to {to_email}: {subject}")
             return True
 
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_EMAIL, SMTP_PASSWORD)
-            server.send_message(msg)
+        _send_message(msg, "marketing")
         
         return True
     except Exception as e:
@@ -358,10 +359,7 @@ def send_order_cancelled_email(to_email: str, order_id: str, user_name: str, ite
             print(f"[TEST MODE] Order cancelled email to {to_email}: {order_id}")
             return True
 
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_EMAIL, SMTP_PASSWORD)
-            server.send_message(msg)
+        _send_message(msg, "order_cancelled")
         
         print(f"Order cancellation email sent to {to_email} for order {order_id}")
         return True
@@ -449,10 +447,7 @@ def send_order_status_update_email(to_email: str, order_id: str, user_name: str,
             print(f"[TEST MODE] Order status update email to {to_email}: {order_id} -> {new_status}")
             return True
 
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_EMAIL, SMTP_PASSWORD)
-            server.send_message(msg)
+        _send_message(msg, "order_status")
         
         print(f"Order status update email sent to {to_email} for order {order_id}: {new_status}")
         return True
@@ -0,0 +1,391 @@
+"""
+In-process stand-in for the Google Sheets API, for offline tests and benchmarks.
+
+FakeClient implements the gspread calls sheets.py makes (open_by_key, worksheet,
+get, get_all_records, append_row, update_cell, find, delete_rows, batch_update, row_values,
+values_batch_get, get_lastUpdateTime) over in-memory rows seeded from a fixture.
+Every API call can be slowed down (latency + jitter), rate limited (429 once a
+per-window quota is spent) or failed at random, and is counted in `client.calls`.
+
+    client = fake_sheets.install(fake_sheets.make_fixture(orders=5000), latency=0.15, jitter=0.05)
+    ...  # sheets.py / the API now talk to the fake
+    fake_sheets.uninstall()
+
+Tests take the `sheets_api` fixture (conftest.py), which is `install` undone after the test.
+"""
+import datetime
+import json
+import random
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+import gspread
+import requests
+from gspread.utils import a1_range_to_grid_range, a1_to_rowcol, numericise_all
+
+import sheets
+
+# ============================================
+# Fixtures
+# ============================================
+
+MASTER_HEADERS = ["Product Name", "Category", "Header Product Name", "Price_100g", "Price_250g",
+                  "Price_500g", "Price_1kg", "Description", "Benefits", "Image"]
+BRANDS_HEADERS = ["name", "image"]
+CATEGORIES = ["Nuts", "Dried Fruits", "Seeds", "Berries", "Dates", "Trail Mix"]
+STAGES = ["Order Placed", "Confirmed", "Picked", "Shipped", "Delivered", "Cancelled"]
+# Call kinds that read cell values
+READ_CALLS = ("get", "get_all_values", "get_all_records", "values_batch_get")
+
+
+def make_fixture(products=200, users=1000, orders=5000, wishlist=3000, subscribers=500, seed=0,
+                 password_hash=None):
+    """Synthetic store data shaped like the real spreadsheet: {sheet name: (headers, rows)}
+
+    Users get `password_hash` (e.g. auth.hash_password("...")) so they can log in; without it
+    the hash is a placeholder that never verifies.
+    """
+    rng = random.Random(seed)
+    password_hash = password_hash or "$2b$12$" + "x" * 53
+    start = datetime.datetime(2024, 1, 1)
+
+    def timestamp(i, total):
+        return (start + datetime.timedelta(minutes=int(i * 525600 / max(total, 1)))).strftime("%Y-%m-%d %H:%M:%S")
+
+    master = [[
+        f"Product {i}", CATEGORIES[i % len(CATEGORIES)], f"Premium Product {i}",
+        f"₹{100 + i % 50}", f"₹{250 + i % 120}", f"₹{480 + i % 200}", f"₹{900 + i % 400}",
+        "Hand-picked and slow roasted. " * 4, "Rich in protein, fibre and healthy fats. " * 3,
+        f"/images/product-{i}.png"
+    ] for i in range(products)]
+    users_rows = [[
+        f"user{i}@example.com", f"user{i}", password_hash, f"User {i}", f"98{i:08d}",
+        f"{i} Market Road", "Bengaluru", "Karnataka", "560001", timestamp(i, users), timestamp(i, users),
+        "", "true"
+    ] for i in range(users)]
+    orders_rows = [[
+        f"ORD-{1704067200 + i * 60}-{i % 65536:04X}", f"user{rng.randrange(max(users, 1))}@example.com",
+        f"User {i}", json.dumps([{"id": f"Product {rng.randrange(max(products, 1))}", "quantity": 1}]),
+        rng.choice([499, 750, 1200, 2400]), "Pending", "WhatsApp/COD", timestamp(i, orders), rng.choice(STAGES)
+    ] for i in range(orders)]
+    wishlist_rows = []
+    for i in range(wishlist):
+        email = f"user{rng.randrange(max(users, 1))}@example.com"
+        product = f"Product {rng.randrange(max(products, 1))}"
+        # Same sheet holds wishlist entries (Product_ID) and cart history (Add_Card_Product)
+        wishlist_rows.append([email, product, timestamp(i, wishlist), ""] if i % 2 else
+                             [email, "", timestamp(i, wishlist), product])
+    return {
+        "Master": (MASTER_HEADERS, master),
+        "Brands": (BRANDS_HEADERS, [["Nutraj", "/logo-clean.png"], ["The Wild Nuts", "/logo-clean.png"]]),
+        "Users": (sheets.USERS_HEADERS, users_rows),
+        "Orders": (sheets.ORDERS_HEADERS, orders_rows),
+        "User_Wishlist": (sheets.WISHLIST_HEADERS, wishlist_rows),
+        "Subscribers": (sheets.SUBSCRIBERS_HEADERS,
+                        [[f"fan{i}@example.com", timestamp(i, subscribers)] for i in range(subscribers)]),
+        "OTP_Codes": (sheets.OTP_HEADERS, []),
+    }
+
+
+def load_fixture(path):
+    """Read a fixture saved as {"Sheet": {"headers": [...], "rows": [[...], ...]}, ...}"""
+    with open(path) as f:
+        data = json.load(f)
+    return {name: (sheet["headers"], sheet["rows"]) for name, sheet in data.items()}
+
+
+def save_fixture(fixture, path):
+    with open(path, "w") as f:
+        json.dump({name: {"headers": h, "rows": r} for name, (h, r) in fixture.items()}, f)
+
+# ============================================
+# Fake API
+# ============================================
+
+
+def _api_error(code, status, message):
+    """A gspread APIError carrying a Sheets-style JSON error body"""
+    response = requests.Response()
+    response.status_code = code
+    response._content = json.dumps({"error": {"code": code, "message": message, "status": status}}).encode()
+    return gspread.exceptions.APIError(response)
+
+
+def _cell(value):
+    # Sheets stores what it is sent as text; get_all_records numericises it back
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    return str(value)
+
+
+class FakeClient:
+    """Stands in for gspread.Client; one client holds one spreadsheet"""
+
+    def __init__(self, fixture=None, latency=0.0, jitter=0.0, quota=None, quota_window=60.0,
+                 error_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.quota = quota  # max API calls per quota_window seconds, None for unlimited
+        self.quota_window = quota_window
+        self.error_rate = error_rate
+        self.calls = Counter()
+        self.throttled = 0
+        self.failed = 0
+        self._random = random.Random(seed)
+        self._recent_calls = deque()
+        self._fail_next = deque()
+        self._lock = threading.RLock()
+        self.spreadsheet = FakeSpreadsheet(self, sheets.SHEET_ID)
+        for title, (headers, rows) in (fixture or {}).items():
+            self.spreadsheet._add(title, headers, rows)
+
+    def fail_next(self, count=1, code=503, status="UNAVAILABLE"):
+        """Make the next `count` API calls fail with the given HTTP error"""
+        with self._lock:
+            self._fail_next.extend([(code, status)] * count)
+
+    def reads(self):
+        """Round trips so far that read cell values"""
+        with self._lock:
+            return sum(self.calls[kind] for kind in READ_CALLS)
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls.clear()
+            self.throttled = self.failed = 0
+
+    def _call(self, kind):
+        """Account for one API round trip: quota, injected failures, then latency"""
+        with self._lock:
+            self.calls[kind] += 1
+            now = time.monotonic()
+            if self.quota is not None:
+                while self._recent_calls and now - self._recent_calls[0] >= self.quota_window:
+                    self._recent_calls.popleft()
+                if len(self._recent_calls) >= self.quota:
+                    self.throttled += 1
+                    raise _api_error(429, "RESOURCE_EXHAUSTED", "Quota exceeded for quota metric 'Read requests'")
+                self._recent_calls.append(now)
+            failure = self._fail_next.popleft() if self._fail_next else None
+            if failure is None and self.error_rate and self._random.random() < self.error_rate:
+                failure = (500, "INTERNAL")
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter)) if self.latency or self.jitter else 0.0
+        if delay:
+            time.sleep(delay)
+        if failure is not None:
+            with self._lock:
+                self.failed += 1
+            raise _api_error(failure[0], failure[1], "Injected failure")
+
+    def set_timeout(self, timeout):
+        pass
+
+    def open_by_key(self, key):
+        self._call("open_by_key")
+        return self.spreadsheet
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, key):
+        self.client = client
+        self.id = key
+        self._worksheets = {}
+        self._last_update = datetime.datetime.now(datetime.timezone.utc)
+
+    def _add(self, title, headers, rows):
+        sheet = FakeWorksheet(self, title, len(self._worksheets), [list(headers)] + [list(r) for r in rows])
+        self._worksheets[title] = sheet
+        return sheet
+
+    def _touch(self):
+        self._last_update = datetime.datetime.now(datetime.timezone.utc)
+
+    def worksheet(self, title):
+        self.client._call("worksheet")
+        with self.client._lock:
+            if title not in self._worksheets:
+                raise gspread.exceptions.WorksheetNotFound(title)
+            return self._worksheets[title]
+
+    def worksheets(self):
+        self.client._call("worksheets")
+        with self.client._lock:
+            return list(self._worksheets.values())
+
+    def add_worksheet(self, title, rows=1000, cols=26, index=None):
+        self.client._call("add_worksheet")
+        with self.client._lock:
+            self._touch()
+            return self._add(title, [], [])
+
+    def values_batch_get(self, ranges, params=None):
+        """Several ranges in one round trip, e.g. ["Users", "Orders!A1:I"]"""
+        self.client._call("values_batch_get")
+        value_ranges = []
+        with self.client._lock:
+            for a1 in ranges:
+                title, _, cells = a1.partition("!")
+                title = title.strip("'")
+                if title not in self._worksheets:
+                    raise _api_error(400, "INVALID_ARGUMENT", f"Unable to parse range: {a1}")
+                values = self._worksheets[title]._values(cells)
+                entry = {"range": a1, "majorDimension": "ROWS"}
+                if values:
+                    entry["values"] = values
+                value_ranges.append(entry)
+        return {"spreadsheetId": self.id, "valueRanges": value_ranges}
+
+    def get_lastUpdateTime(self):
+        """Drive's modifiedTime for the spreadsheet: changes on every write"""
+        self.client._call("get_lastUpdateTime")
+        with self.client._lock:
+            return self._last_update.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, sheet_id, rows):
+        self.spreadsheet = spreadsheet
+        self.client = spreadsheet.client
+        self.title = title
+        self.id = sheet_id
+        self.rows = [[_cell(v) for v in row] for row in rows]
+
+    def _write(self):
+        self.spreadsheet._touch()
+
+    def _values(self, cells=""):
+        """Rows of the A1 range `cells` (whole sheet if empty), trailing blanks trimmed like the API"""
+        rows = self.rows
+        if cells:
+            grid = a1_range_to_grid_range(cells)
+            rows = [
+                row[grid.get("startColumnIndex", 0):grid.get("endColumnIndex")]
+                for row in rows[grid.get("startRowIndex", 0):grid.get("endRowIndex")]
+            ]
+        trimmed = []
+        for row in rows:
+            row = list(row)
+            while row and row[-1] == "":
+                row.pop()
+            trimmed.append(row)
+        while trimmed and not trimmed[-1]:
+            trimmed.pop()
+        return trimmed
+
+    def get_all_values(self):
+        self.client._call("get_all_values")
+        with self.client._lock:
+            return self._values()
+
+    def get(self, range_name=None, **kwargs):
+        """Values of an A1 range of this sheet, e.g. "A120:I" (whole sheet if omitted)"""
+        self.client._call("get")
+        with self.client._lock:
+            return self._values(range_name or "")
+
+    def get_all_records(self):
+        self.client._call("get_all_records")
+        return self.records()
+
+    def records(self):
+        """What get_all_records returns right now, without counting a round trip"""
+        with self.client._lock:
+            values = self._values()
+        if not values:
+            return []
+        headers = values[0]
+        records = []
+        for row in values[1:]:
+            padded = row + [""] * (len(headers) - len(row))
+            records.append(dict(zip(headers, numericise_all(padded[:len(headers)], default_blank=""))))
+        return records
+
+    def row_values(self, row):
+        self.client._call("row_values")
+        with self.client._lock:
+            values = self._values()
+            return list(values[row - 1]) if row <= len(values) else []
+
+    def append_row(self, values, value_input_option=None, **kwargs):
+        self.client._call("append_row")
+        with self.client._lock:
+            self.rows.append([_cell(v) for v in values])
+            self._write()
+        return {"updates": {"updatedRows": 1}}
+
+    def update_cell(self, row, col, value):
+        self.client._call("update_cell")
+        with self.client._lock:
+            self._set(row, col, value)
+            self._write()
+        return {"updatedCells": 1}
+
+    def _set(self, row, col, value):
+        while len(self.rows) < row:
+            self.rows.append([])
+        values = self.rows[row - 1]
+        values.extend([""] * (col - len(values)))
+        values[col - 1] = _cell(value)
+
+    def batch_update(self, data, **kwargs):
+        """Write several A1 ranges in one call: [{"range": "F2", "values": [["Shipped"]]}, ...]"""
+        self.client._call("batch_update")
+        with self.client._lock:
+            for update in data:
+                start = update["range"].split(":")[0]
+                row, col = a1_to_rowcol(start)
+                for r, row_values in enumerate(update["values"]):
+                    for c, value in enumerate(row_values):
+                        self._set(row + r, col + c, value)
+            self._write()
+        return {"totalUpdatedCells": sum(len(v) for u in data for v in u["values"])}
+
+    def find(self, query, in_row=None, in_column=None, case_sensitive=True):
+        self.client._call("find")
+        with self.client._lock:
+            for r, values in enumerate(self.rows, start=1):
+                if in_row is not None and r != in_row:
+                    continue
+                for c, value in enumerate(values, start=1):
+                    if in_column is not None and c != in_column:
+                        continue
+                    matches = value == str(query) if case_sensitive else value.lower() == str(query).lower()
+                    if matches:
+                        return gspread.Cell(r, c, value)
+        return None
+
+    def delete_rows(self, start_index, end_index=None):
+        self.client._call("delete_rows")
+        with self.client._lock:
+            del self.rows[start_index - 1:(end_index or start_index)]
+            self._write()
+        return {}
+
+# ============================================
+# Wiring into sheets.py
+# ============================================
+
+
+def install(fixture=None, **options):
+    """Point sheets.py at a new FakeClient (options as for FakeClient) and return it"""
+    client = FakeClient(fixture if fixture is not None else make_fixture(), **options)
+    sheets.use_sheets_client(client)
+    return client
+
+
+def uninstall():
+    """Drop the fake; the next Sheets call authorizes against Google again"""
+    sheets.use_sheets_client(None)
+
+
+@contextmanager
+def installed():
+    """Yields `install`, and uninstalls whatever it installed on the way out"""
+    try:
+        yield install
+    finally:
+        uninstall()
@@ -0,0 +1,129 @@
+"""
+HTTP caching for catalog endpoints.
+
+Catalog payloads only change when their cached sheet data changes, so each one is
+serialized and compressed (gzip, and brotli when installed) once per data version and
+labelled with a content-hash ETag. Requests then just pick the stored bytes matching
+their Accept-Encoding, and clients that send a matching If-None-Match get a bodyless 304.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from typing import NamedTuple, Optional
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # optional: without it clients just get gzip
+    brotli = None
+
+# Browsers/CDNs may reuse a catalog response for a minute, then serve it stale for
+# up to 10 more while they revalidate with If-None-Match in the background
+CATALOG_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=600"
+
+# Bodies smaller than this aren't worth compressing
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 9
+# Quality 11 is ~60x slower than 9 on a large catalog for ~30% smaller output
+BROTLI_QUALITY = 9
+
+
+class CachedPayload(NamedTuple):
+    version: object  # data version the payload was built from
+    etag: str
+    body: bytes
+    gzip_body: Optional[bytes]
+    br_body: Optional[bytes]
+
+
+_payloads = {}
+_payloads_lock = threading.Lock()
+
+
+def cached_payload(key, version):
+    """Return the payload for key if it was built from this data version, else None"""
+    payload = _payloads.get(key)
+    if payload is not None and payload.version == version:
+        return payload
+    return None
+
+
+def build_payload(key, version, data):
+    """Serialize data once for this version and remember it under key"""
+    payload = cached_payload(key, version)
+    if payload is not None:
+        return payload
+
+    # Same encoding FastAPI's JSONResponse uses
+    body = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    gzip_body = br_body = None
+    if len(body) >= MIN_COMPRESS_SIZE:
+        gzip_body = gzip.compress(body, GZIP_LEVEL)
+        if brotli is not None:
+            br_body = brotli.compress(body, quality=BROTLI_QUALITY)
+    payload = CachedPayload(version, etag, body, gzip_body, br_body)
+    with _payloads_lock:
+        _payloads[key] = payload
+    return payload
+
+
+def _variant_etag(etag, encoding):
+    # Each encoding is a different byte sequence, so it gets its own strong ETag
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header against our ETag (any encoding)"""
+    if not if_none_match:
+        return False
+    variants = {etag, _variant_etag(etag, "gzip"), _variant_etag(etag, "br")}
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") in variants:
+            return True
+    return False
+
+
+def accepted_encodings(accept_encoding):
+    """Encodings the client accepts (q > 0), from an Accept-Encoding header"""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name and q > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def choose_encoding(payload: CachedPayload, accept_encoding):
+    """Pick the smallest stored variant the client can decode"""
+    accepted = accepted_encodings(accept_encoding)
+    if payload.br_body is not None and ("br" in accepted or "*" in accepted):
+        return "br", payload.br_body
+    if payload.gzip_body is not None and ("gzip" in accepted or "*" in accepted):
+        return "gzip", payload.gzip_body
+    return None, payload.body
+
+
+def respond(request: Request, payload: CachedPayload, cache_control=CATALOG_CACHE_CONTROL):
+    """304 if the client already has this payload, otherwise the stored bytes for its encoding"""
+    encoding, body = choose_encoding(payload, request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": _variant_etag(payload.etag, encoding),
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding"
+    }
+    if etag_matches(request.headers.get("if-none-match"), payload.etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,326 @@
+"""
+Scenario-driven load test for the API.
+
+Runs the FastAPI app in-process (httpx ASGITransport) on top of the fake Sheets backend
+(fake_sheets.py), so it needs no server, credentials or network. Each scenario is a user
+journey repeated by `--concurrency` clients for `--duration` seconds:
+
+    browse     anonymous catalog browsing: products, categories, brands
+    login      login storm: password login followed by a profile fetch
+    cart       wishlist/cart churn: add, list and remove items
+    checkout   place an order (POST /api/orders), then track it and list order history
+    admin      admin dashboard: stats, two pages of orders, recent subscribers
+
+Per endpoint it reports throughput, p50/p95/p99 latency and error rate, and writes them as
+JSON. With --baseline it compares the run against a stored result and exits non-zero on a
+regression, so any performance change can be checked against loadtest_baseline.json.
+
+Run: python loadtest.py [--scenario browse --scenario admin] [--concurrency 20] [--duration 5]
+                        [--sheets-latency 0.15] [--output results.json]
+                        [--baseline loadtest_baseline.json] [--save-baseline]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+import auth
+import fake_sheets
+import main
+import sheets
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "loadtest_baseline.json")
+PASSWORD = "LoadTest#2024"
+# A run regresses when an endpoint's p95 grows by more than this fraction (and LATENCY_NOISE_MS)
+REGRESSION_TOLERANCE = 0.25
+LATENCY_NOISE_MS = 2.0
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Recorder:
+    """Latency samples and error counts per endpoint ("METHOD /path/template")"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.enabled = True
+
+    async def request(self, client, method, endpoint, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            failed = response.status_code >= 400
+        except Exception:
+            response, failed = None, True
+        if self.enabled:
+            self.latencies[endpoint].append((time.perf_counter() - start) * 1000)
+            if failed:
+                self.errors[endpoint] += 1
+        return response if not failed else None
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            endpoints[endpoint] = {
+                "requests": len(samples),
+                "errors": self.errors[endpoint],
+                "error_rate": round(self.errors[endpoint] / len(samples), 4),
+                "throughput_rps": round(len(samples) / elapsed, 1),
+                "p50_ms": round(percentile(samples, 50), 3),
+                "p95_ms": round(percentile(samples, 95), 3),
+                "p99_ms": round(percentile(samples, 99), 3),
+                "max_ms": round(max(samples), 3),
+            }
+        total = sum(e["requests"] for e in endpoints.values())
+        errors = sum(e["errors"] for e in endpoints.values())
+        return {
+            "requests": total,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "throughput_rps": round(total / elapsed, 1),
+            "endpoints": endpoints,
+        }
+
+# ============================================
+# Scenarios
+# ============================================
+
+
+class Context:
+    """What the scenarios need to know about the seeded data"""
+
+    def __init__(self, users, product_ids, order_ids):
+        self.users = users
+        self.product_ids = product_ids
+        self.order_ids = order_ids
+        self.admin_headers = {"Authorization": f"Bearer {auth.generate_jwt_token(main.ADMIN_IDENTIFIER, 'admin')}"}
+        self._user_headers = {}
+
+    def user_headers(self, email):
+        headers = self._user_headers.get(email)
+        if headers is None:
+            token = auth.generate_jwt_token(email, email.split("@")[0])
+            headers = self._user_headers[email] = {"Authorization": f"Bearer {token}"}
+        return headers
+
+
+async def browse(client, rec, ctx, rng, worker):
+    await rec.request(client, "GET", "GET /api/products", "/api/products")
+    await rec.request(client, "GET", "GET /api/categories", "/api/categories")
+    await rec.request(client, "GET", "GET /api/brands", "/api/brands")
+
+
+async def login(client, rec, ctx, rng, worker):
+    email = rng.choice(ctx.users)
+    identifier = email if rng.random() < 0.5 else email.split("@")[0]
+    r = await rec.request(client, "POST", "POST /api/auth/login", "/api/auth/login",
+                          json={"identifier": identifier, "password": PASSWORD})
+    if r is not None:
+        headers = {"Authorization": f"Bearer {r.json()['token']}"}
+        await rec.request(client, "GET", "GET /api/user/profile", "/api/user/profile", headers=headers)
+
+
+async def cart(client, rec, ctx, rng, worker):
+    # Each client churns its own user's lists, so no two clients add and remove the same item
+    headers = ctx.user_headers(ctx.users[worker % len(ctx.users)])
+    product_id = ctx.product_ids[worker % len(ctx.product_ids)]
+    await rec.request(client, "POST", "POST /api/user/wishlist/{id}", f"/api/user/wishlist/{product_id}", headers=headers)
+    await rec.request(client, "GET", "GET /api/user/wishlist", "/api/user/wishlist", headers=headers)
+    await rec.request(client, "POST", "POST /api/user/cart/{id}", f"/api/user/cart/{product_id}", headers=headers)
+    await rec.request(client, "GET", "GET /api/user/cart", "/api/user/cart", headers=headers)
+    await rec.request(client, "DELETE", "DELETE /api/user/cart/{id}", f"/api/user/cart/{product_id}", headers=headers)
+    await rec.request(client, "DELETE", "DELETE /api/user/wishlist/{id}", f"/api/user/wishlist/{product_id}", headers=headers)
+
+
+async def checkout(client, rec, ctx, rng, worker):
+    headers = ctx.user_headers(rng.choice(ctx.users))
+    await rec.request(client, "GET", "GET /api/user/cart", "/api/user/cart", headers=headers)
+    items = [{"id": product_id, "quantity": rng.randint(1, 3), "variant": "250g"}
+             for product_id in rng.sample(ctx.product_ids, 2)]
+    r = await rec.request(client, "POST", "POST /api/orders", "/api/orders", headers=headers, json={
+        "items": items, "total_amount": rng.choice([499, 750, 1200]), "payment_mode": "WhatsApp/COD"
+    })
+    order_id = r.json().get("order_id") if r is not None else rng.choice(ctx.order_ids)
+    await rec.request(client, "GET", "GET /api/orders/{id}", f"/api/orders/{order_id}")
+    await rec.request(client, "GET", "GET /api/user/orders", "/api/user/orders", headers=headers)
+
+
+async def admin(client, rec, ctx, rng, worker):
+    headers = ctx.admin_headers
+    await rec.request(client, "GET", "GET /api/admin/stats", "/api/admin/stats", headers=headers)
+    r = await rec.request(client, "GET", "GET /api/admin/orders", "/api/admin/orders",
+                          headers=headers, params={"limit": 50})
+    cursor = r.json().get("next_cursor") if r is not None else None
+    if cursor:
+        await rec.request(client, "GET", "GET /api/admin/orders?cursor", "/api/admin/orders",
+                          headers=headers, params={"limit": 50, "cursor": cursor})
+    await rec.request(client, "GET", "GET /api/admin/subscribers", "/api/admin/subscribers",
+                      headers=headers, params={"limit": 10})
+
+
+SCENARIOS = {
+    "browse": browse,
+    "login": login,
+    "cart": cart,
+    "checkout": checkout,
+    "admin": admin,
+}
+
+# ============================================
+# Runner
+# ============================================
+
+
+def seed_fake_sheets(args, password_hash):
+    """Fresh fake spreadsheet for one scenario; returns the scenario Context"""
+    fixture = fake_sheets.make_fixture(products=args.products, users=args.users, orders=args.orders,
+                                       wishlist=args.users * 3, seed=args.seed, password_hash=password_hash)
+    fake_sheets.install(fixture, latency=args.sheets_latency, jitter=args.sheets_latency / 3, seed=args.seed)
+    users = [row[0] for row in fixture["Users"][1]]
+    order_ids = [row[0] for row in fixture["Orders"][1]]
+    return Context(users, [p["id"] for p in sheets.get_products()], order_ids)
+
+
+async def run_scenario(name, ctx, args):
+    step = SCENARIOS[name]
+    rec = Recorder()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        # One untimed pass warms the caches the way live traffic would have
+        rec.enabled = False
+        await step(client, rec, ctx, random.Random(args.seed), 0)
+        rec.enabled = True
+
+        deadline = time.perf_counter() + args.duration
+        iterations = 0
+
+        async def worker(n):
+            nonlocal iterations
+            rng = random.Random(args.seed * 1000 + n)
+            while time.perf_counter() < deadline:
+                await step(client, rec, ctx, rng, n)
+                iterations += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+    result = rec.summary(elapsed)
+    result["iterations"] = iterations
+    result["elapsed_s"] = round(elapsed, 2)
+    return result
+
+
+def run(args):
+    password_hash = auth.hash_password(PASSWORD)
+    results = {}
+    try:
+        for name in args.scenario:
+            ctx = seed_fake_sheets(args, password_hash)
+            # The app logs every request; keep that out of the report
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                results[name] = asyncio.run(run_scenario(name, ctx, args))
+            print_scenario(name, results[name])
+    finally:
+        fake_sheets.uninstall()
+    return {
+        "config": {
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "sheets_latency_s": args.sheets_latency,
+            "products": args.products,
+            "users": args.users,
+            "orders": args.orders,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "scenarios": results,
+    }
+
+
+def print_scenario(name, result):
+    print(f"\n{name}: {result['iterations']} iterations, {result['throughput_rps']} req/s, "
+          f"error rate {result['error_rate']:.2%}")
+    print(f"  {'endpoint':36} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for endpoint, e in result["endpoints"].items():
+        print(f"  {endpoint:36} {e['requests']:>7} {e['throughput_rps']:>8} {e['p50_ms']:>8.2f} "
+              f"{e['p95_ms']:>8.2f} {e['p99_ms']:>8.2f} {e['errors']:>7}")
+
+
+def compare(report, baseline):
+    """Print the run against the baseline; returns the list of regressions"""
+    regressions = []
+    print(f"\nAgainst baseline (p95 regression threshold {REGRESSION_TOLERANCE:.0%}):")
+    for name, result in report["scenarios"].items():
+        base_scenario = baseline.get("scenarios", {}).get(name)
+        if base_scenario is None:
+            print(f"  {name}: not in baseline")
+            continue
+        for endpoint, e in result["endpoints"].items():
+            base = base_scenario["endpoints"].get(endpoint)
+            if base is None:
+                continue
+            change = (e["p95_ms"] - base["p95_ms"]) / base["p95_ms"] if base["p95_ms"] else 0.0
+            slower = change > REGRESSION_TOLERANCE and e["p95_ms"] - base["p95_ms"] > LATENCY_NOISE_MS
+            more_errors = e["error_rate"] > base["error_rate"]
+            flag = "REGRESSION" if slower or more_errors else ""
+            if flag:
+                regressions.append(f"{name} {endpoint}")
+            print(f"  {name:9} {endpoint:36} p95 {base['p95_ms']:>8.2f} -> {e['p95_ms']:>8.2f} ms ({change:+.0%})"
+                  f"  errors {base['error_rate']:.2%} -> {e['error_rate']:.2%}  {flag}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="In-process load test against the fake Sheets backend")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable; default: all)")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent clients per scenario")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    parser.add_argument("--sheets-latency", type=float, default=0.0,
+                        help="simulated Sheets API round trip in seconds (real API: ~0.1-0.3)")
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="loadtest-results.json", help="where to write the JSON report")
+    parser.add_argument("--baseline", help="compare against this report (e.g. loadtest_baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write the report to {BASELINE_PATH}")
+    args = parser.parse_args(argv)
+    args.scenario = args.scenario or list(SCENARIOS)
+    return args
+
+
+def main_cli(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.output}")
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {BASELINE_PATH}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f))
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -1,11 +1,18 @@
-from fastapi import FastAPI, HTTPException, Header
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel, EmailStr
 from typing import Optional
+from datetime import date
 import sheets
+import sheets_async
+import http_cache
+import metrics
 import auth
 import email_service
 import uvicorn
+import asyncio
 import os
 from dotenv import load_dotenv
 
@@ -16,7 +23,43 @@ load_dotenv()
 ADMIN_KEY = os.getenv("ADMIN_PASSWORD", "Cantgetme@1") 
 ADMIN_IDENTIFIER = os.getenv("ADMIN_EMAIL", "connectwiththewildnuts@gmail.com")
 
-app = FastAPI(title="The Wild Nuts API")
+# Startup prewarm: /api/ready answers 503 until it has finished
+PREWARM_ATTEMPTS = 3
+PREWARM_RETRY_DELAY = 5  # seconds
+PREWARM_TIMEOUT = 120  # seconds per attempt
+readiness = {"ready": False, "failed": []}
+
+async def prewarm_storage():
+    """Load the data the first requests need, retrying what fails, then report ready"""
+    failed = []
+    for attempt in range(PREWARM_ATTEMPTS):
+        if attempt:
+            await asyncio.sleep(PREWARM_RETRY_DELAY)
+        try:
+            failed = await sheets_async.prewarm_storage(timeout=PREWARM_TIMEOUT)
+        except Exception as e:
+            print(f"Prewarm attempt {attempt + 1} failed: {e}")
+            failed = ["*"]
+        if not failed:
+            break
+    # Serve even if some data is still cold: those requests fetch it on demand as before
+    readiness["failed"] = failed
+    readiness["ready"] = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the storage backend while starting up and let it persist state on shutdown"""
+    readiness.update(ready=False, failed=[])
+    await sheets_async.start_storage()
+    prewarm = asyncio.create_task(prewarm_storage())
+    yield
+    prewarm.cancel()
+    try:
+        await sheets_async.stop_storage()
+    except Exception as e:
+        print(f"Error stopping storage: {e}")
+
+app = FastAPI(title="The Wild Nuts API", lifespan=lifespan)
 
 # CORS configuration
 app.add_middleware(
@@ -26,6 +69,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Per-route latency for /api/admin/metrics
+app.add_middleware(metrics.RequestMetricsMiddleware)
+
+@app.exception_handler(sheets_async.SheetsTimeoutError)
+async def sheets_timeout_handler(request: Request, exc: sheets_async.SheetsTimeoutError):
+    """A Sheets call took too long; fail this request instead of the whole worker"""
+    print(f"Sheets timeout on {request.url.path}: {exc}")
+    return JSONResponse(status_code=504, content={"detail": "Data service timed out, please retry"})
 
 # ============================================
 # Pydantic Models
@@ -85,6 +136,13 @@ def verify_token(authorization: Optional[str] = Header(None)):
         print(f"DEBUG: Token verification failed: {str(e)}")
         raise HTTPException(status_code=401, detail="Invalid authorization token")
 
+def verify_admin(authorization: Optional[str] = Header(None)):
+    """Verify the token belongs to the admin account"""
+    payload = verify_token(authorization)
+    if payload["email"] not in (ADMIN_IDENTIFIER, "admin@thewildnuts.com"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return payload
+
 # ============================================
 # Authentication Endpoints
 # ============================================
@@ -102,15 +160,15 @@ async def register(request: RegisterRequest):
         raise HTTPException(status_code=400, detail=message)
     
     # Check if user already exists
-    existing_user = sheets.get_user_by_email(request.email)
+    existing_user = await sheets_async.get_credentials_by_email(request.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Hash password
-    password_hash = auth.hash_password(request.password)
+    password_hash = await sheets_async.hash_password(request.password)
     
     # Create user
-    result = sheets.create_user(request.email, password_hash)
+    result = await sheets_async.create_user(request.email, password_hash)
     
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
@@ -150,45 +208,41 @@ async def login(request: LoginRequest):
              }
          }
 
-    # Try to find user by email or username
-    user = None
+    # Try to find user by email or username (sign-in fields only)
+    credentials = None
     
     if "@" in request.identifier:
         # It's an email
-        user = sheets.get_user_by_email(request.identifier)
+        credentials = await sheets_async.get_credentials_by_email(request.identifier)
     else:
         # It's a username
-        user = sheets.get_user_by_username(request.identifier)
+        credentials = await sheets_async.get_credentials_by_username(request.identifier)
     
-    if not user:
+    if not credentials:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Verify password
-    if not auth.verify_password(request.password, user["password_hash"]):
+    if not await sheets_async.verify_password(request.password, credentials["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Generate new session token
     session_token = auth.generate_session_token()
-    sheets.update_session_token(user["email"], session_token)
+    await sheets_async.update_session_token(credentials["email"], session_token)
     
     # Generate JWT token
-    token = auth.generate_jwt_token(user["email"], user.get("username"))
+    token = auth.generate_jwt_token(credentials["email"], credentials.get("username"))
     
+    # Answered from the sign-in fields alone; the rest of the profile is at /api/user/profile
     return {
         "success": True,
         "token": token,
-        "email": user["email"],
-        "username": user.get("username"),
-        "profile_complete": user.get("profile_complete") == "true",
+        "email": credentials["email"],
+        "username": credentials.get("username"),
+        "profile_complete": credentials.get("profile_complete") == "true",
         "user": {
-            "email": user["email"],
-            "username": user.get("username"),
-            "full_name": user.get("full_name"),
-            "phone": user.get("phone"),
-            "address": user.get("address"),
-            "city": user.get("city"),
-            "state": user.get("state"),
-            "pincode": user.get("pincode")
+            "email": credentials["email"],
+            "username": credentials.get("username"),
+            "full_name": credentials.get("full_name")
         }
     }
 
@@ -198,7 +252,7 @@ async def logout(authorization: Optional[str] = Header(None)):
     payload = verify_token(authorization)
     
     # Clear session token
-    sheets.update_session_token(payload["email"], "")
+    await sheets_async.update_session_token(payload["email"], "")
     
     return {"success": True, "message": "Logged out successfully"}
 
@@ -206,7 +260,7 @@ async def logout(authorization: Optional[str] = Header(None)):
 async def forgot_password(request: ForgotPasswordRequest):
     """Request OTP for password reset"""
     # Check if user exists
-    user = sheets.get_user_by_email(request.email)
+    user = await sheets_async.get_credentials_by_email(request.email)
     if not user:
         # Don't reveal if email exists or not for security
         return {"success": True, "message": "If the email exists, an OTP has been sent"}
@@ -215,7 +269,7 @@ async def forgot_password(request: ForgotPasswordRequest):
     otp = auth.generate_otp()
     
     # Store OTP
-    result = sheets.store_otp(request.email, otp)
+    result = await sheets_async.store_otp(request.email, otp)
     
     if "error" in result:
         raise HTTPException(status_code=500, detail="Failed to generate OTP")
@@ -228,7 +282,7 @@ async def forgot_password(request: ForgotPasswordRequest):
 @app.post("/api/auth/verify-otp")
 async def verify_otp(request: VerifyOTPRequest):
     """Verify OTP"""
-    result = sheets.verify_otp(request.email, request.otp)
+    result = await sheets_async.verify_otp(request.email, request.otp)
     
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
@@ -239,7 +293,7 @@ async def verify_otp(request: VerifyOTPRequest):
 async def reset_password(request: ResetPasswordRequest):
     """Reset password with OTP"""
     # Verify OTP first
-    otp_result = sheets.verify_otp(request.email, request.otp)
+    otp_result = await sheets_async.verify_otp(request.email, request.otp)
     
     if "error" in otp_result:
         raise HTTPException(status_code=400, detail=otp_result["error"])
@@ -250,10 +304,10 @@ async def reset_password(request: ResetPasswordRequest):
         raise HTTPException(status_code=400, detail=message)
     
     # Hash new password
-    new_password_hash = auth.hash_password(request.new_password)
+    new_password_hash = await sheets_async.hash_password(request.new_password)
     
     # Update password
-    result = sheets.update_password_hash(request.email, new_password_hash)
+    result = await sheets_async.update_password_hash(request.email, new_password_hash)
     
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
@@ -300,41 +354,21 @@ async def get_admin_stats(authorization: Optional[str] = Header(None)):
     except:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    orders = sheets.get_all_orders()
-    users = sheets.get_all_users()
-    
-    total_revenue = 0
-    completed_orders_count = 0
-    recent_orders = []
-    
-    for order in orders:
-        # Only count revenue from completed/delivered orders
-        tracking_stage = order.get('Tracking_Stage', '').lower()
-        
-        # Skip cancelled orders
-        if tracking_stage == 'cancelled':
-            continue
-            
-        # Only count delivered orders for revenue
-        if tracking_stage == 'delivered':
-            try:
-                # Clean amount string "₹ 1,200" -> 1200
-                amount_str = str(order.get('Total_Amount', 0))
-                clean_amount = ''.join(filter(str.isdigit, amount_str))
-                total_revenue += int(clean_amount) if clean_amount else 0
-                completed_orders_count += 1
-            except:
-                pass
+    stats = await sheets_async.get_admin_stats()
+    if "error" in stats:
+        raise HTTPException(status_code=500, detail=stats["error"])
+    return stats
 
-    # Simple aggregated data
-    return {
-        "revenue": total_revenue,
-        "orders_count": len(orders),  # Total orders (including all statuses)
-        "completed_orders": completed_orders_count,  # Only delivered orders
-        "customers_count": len(users),
-        "conversion_rate": round((len(orders) / len(users) * 100), 1) if users else 0,
-        "recent_orders": orders[-5:] if orders else [] # Last 5 orders
-    }
+@app.get("/api/admin/metrics")
+async def get_admin_metrics(
+    authorization: Optional[str] = Header(None),
+    format: str = Query("prometheus", pattern="^(prometheus|json)$")
+):
+    """Request latencies, Sheets/SMTP call stats and cache hit ratios for this worker"""
+    verify_admin(authorization)
+    if format == "json":
+        return metrics.snapshot()
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 class UpdateStatusRequest(BaseModel):
     status: str
@@ -354,12 +388,12 @@ async def update_order_status_api(
         raise HTTPException(status_code=401, detail="Unauthorized")
 
     # Get order details before updating (to send email)
-    order = sheets.get_order_by_id(order_id)
+    order = await sheets_async.get_order_by_id(order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
     # Update the status
-    result = sheets.update_order_status(order_id, request.status)
+    result = await sheets_async.update_order_status(order_id, request.status)
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     
@@ -401,17 +435,35 @@ async def update_order_status_api(
     return result
 
 @app.get("/api/admin/orders")
-async def get_admin_orders(authorization: Optional[str] = Header(None)):
-    """Get all orders for admin"""
+async def get_admin_orders(
+    authorization: Optional[str] = Header(None),
+    stage: Optional[str] = None,
+    email: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=sheets.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """Get a page of orders for admin (newest first by default); pass next_cursor back for the next page"""
     # Verify Admin Token
     try:
         verify_token(authorization)
     except:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    orders = sheets.get_all_orders()
-    # Reverse to show newest first
-    return {"orders": orders[::-1]}
+    result = await sheets_async.query_orders(
+        stage=stage,
+        email=email,
+        date_from=date_from.isoformat() if date_from else None,
+        date_to=date_to.isoformat() if date_to else None,
+        order=order,
+        limit=limit,
+        cursor=cursor
+    )
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
 
 # ============================================
 # Marketing & Catalog Endpoints
@@ -427,21 +479,37 @@ async def subscribe(request: SubscribeRequest):
     if not auth.validate_email(request.email):
          raise HTTPException(status_code=400, detail="Invalid email")
          
-    result = sheets.store_subscriber(request.email)
+    result = await sheets_async.store_subscriber(request.email)
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
         
     return result
 
 @app.get("/api/admin/subscribers")
-async def get_subscribers(authorization: Optional[str] = Header(None)):
-    """Get all subscribers"""
+async def get_subscribers(
+    authorization: Optional[str] = Header(None),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=sheets.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """Get a page of subscribers (newest first by default)"""
     try:
         verify_token(authorization)
     except:
         raise HTTPException(status_code=401, detail="Unauthorized")
-        
-    return sheets.get_all_subscribers()
+
+    result = await sheets_async.query_subscribers(
+        date_from=date_from.isoformat() if date_from else None,
+        date_to=date_to.isoformat() if date_to else None,
+        order=order,
+        limit=limit,
+        cursor=cursor
+    )
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
 
 class ProductOfferRequest(BaseModel):
     is_offer: bool
@@ -454,7 +522,7 @@ async def update_offer(id: str, request: ProductOfferRequest, authorization: Opt
     except:
         raise HTTPException(status_code=401, detail="Unauthorized")
         
-    result = sheets.update_product_offer(id, request.is_offer)
+    result = await sheets_async.update_product_offer(id, request.is_offer)
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
     return result
@@ -472,7 +540,7 @@ async def send_marketing(request: MarketingEmailRequest, authorization: Optional
     except:
         raise HTTPException(status_code=401, detail="Unauthorized")
         
-    subscribers = sheets.get_all_subscribers()
+    subscribers = await sheets_async.get_all_subscribers()
     count = 0
     
     for sub in subscribers:
@@ -498,7 +566,7 @@ async def get_profile(authorization: Optional[str] = Header(None)):
     """Get user profile"""
     payload = verify_token(authorization)
     
-    user = sheets.get_user_by_email(payload["email"])
+    user = await sheets_async.get_user_by_email(payload["email"])
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -530,12 +598,12 @@ async def update_profile(
             raise HTTPException(status_code=400, detail=message)
         
         # Check if username is already taken
-        existing_user = sheets.get_user_by_username(request.username)
+        existing_user = await sheets_async.get_credentials_by_username(request.username)
         if existing_user and existing_user["email"] != payload["email"]:
             raise HTTPException(status_code=400, detail="Username already taken")
     
     # Update profile
-    result = sheets.update_user_profile_auth(
+    result = await sheets_async.update_user_profile_auth(
         payload["email"],
         username=request.username,
         full_name=request.full_name,
@@ -560,7 +628,7 @@ async def get_wishlist(authorization: Optional[str] = Header(None)):
     """Get user's wishlist"""
     payload = verify_token(authorization)
     
-    wishlist = sheets.get_user_wishlist(payload["email"])
+    wishlist = await sheets_async.get_user_wishlist(payload["email"])
     
     return {"wishlist": wishlist}
 
@@ -572,7 +640,7 @@ async def add_to_wishlist(
     """Add product to wishlist"""
     payload = verify_token(authorization)
     
-    result = sheets.add_to_wishlist(payload["email"], product_id)
+    result = await sheets_async.add_to_wishlist(payload["email"], product_id)
     
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
@@ -584,17 +652,20 @@ async def get_cart(authorization: Optional[str] = Header(None)):
     """Get user's cart history"""
     payload = verify_token(authorization)
     
-    # Get cart items (IDs)
-    cart_items = sheets.get_user_cart(payload["email"])
-    
-    # We need to hydrate these IDs with product details for the frontend
-    # Fetch all products (cached)
-    all_products = sheets.get_products()
+    # Get cart items (IDs) and the catalog snapshot to hydrate them with - both at once
+    cart_items, catalog = await asyncio.gather(
+        sheets_async.get_user_cart(payload["email"]),
+        sheets_async.get_catalog()
+    )
     
+    return {"cart": hydrate_cart(cart_items, catalog.products_by_id)}
+
+def hydrate_cart(cart_items, products_by_id):
+    """Merge cart history items with their product details for the frontend"""
     hydrated_cart = []
     for item in cart_items:
         # Find product details
-        product = next((p for p in all_products if p["id"] == item["product_id"]), None)
+        product = products_by_id.get(item["product_id"])
         if product:
             # Merge details
             full_item = {**product, **item} 
@@ -606,7 +677,7 @@ async def get_cart(authorization: Optional[str] = Header(None)):
                 full_item["variant"] = "250g" # Default variant if not tracked
             hydrated_cart.append(full_item)
             
-    return {"cart": hydrated_cart}
+    return hydrated_cart
 
 @app.post("/api/user/cart/{product_id}")
 async def add_to_cart_history(
@@ -616,7 +687,7 @@ async def add_to_cart_history(
     """Add product to cart history"""
     payload = verify_token(authorization)
     
-    result = sheets.add_to_cart_history(payload["email"], product_id)
+    result = await sheets_async.add_to_cart_history(payload["email"], product_id)
     
     if "error" in result:
         # Don't fail the request if history saving fails, just log it (optional)
@@ -634,7 +705,7 @@ async def remove_from_cart_history(
     """Remove product from cart history"""
     payload = verify_token(authorization)
     
-    result = sheets.remove_from_cart_history(payload["email"], product_id)
+    result = await sheets_async.remove_from_cart_history(payload["email"], product_id)
     
     if "error" in result:
         # Consider 404/500 based on error, but 500 is safe for generic
@@ -653,7 +724,7 @@ async def remove_from_wishlist(
     """Remove product from wishlist"""
     payload = verify_token(authorization)
     
-    result = sheets.remove_from_wishlist(payload["email"], product_id)
+    result = await sheets_async.remove_from_wishlist(payload["email"], product_id)
     
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
@@ -669,7 +740,7 @@ async def get_orders(authorization: Optional[str] = Header(None)):
     """Get user's order history"""
     payload = verify_token(authorization)
     
-    orders = sheets.get_user_orders(payload["email"])
+    orders = await sheets_async.get_user_orders(payload["email"])
     
     return {"orders": orders}
 
@@ -687,7 +758,7 @@ async def create_order(
     order_data["email"] = payload["email"]
     order_data["user_name"] = payload.get("full_name", payload.get("username", ""))
     
-    result = sheets.create_order(order_data)
+    result = await sheets_async.create_order(order_data)
     
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
@@ -697,7 +768,7 @@ async def create_order(
 @app.get("/api/orders/{order_id}")
 async def get_order_by_id(order_id: str):
     """Get order details by ID (public endpoint for tracking)"""
-    order = sheets.get_order_by_id(order_id)
+    order = await sheets_async.get_order_by_id(order_id)
     
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -712,24 +783,42 @@ async def get_order_by_id(order_id: str):
 async def root():
     return {"message": "Welcome to The Wild Nuts API"}
 
+@app.get("/api/ready")
+async def ready():
+    """Readiness probe: 200 once startup prewarm has finished, 503 before"""
+    if not readiness["ready"]:
+        return JSONResponse(status_code=503, content={"ready": False})
+    return {"ready": True, "degraded": readiness["failed"]}
+
+async def catalog_response(request: Request, key: str, version, data):
+    """Serve a catalog payload with ETag/Cache-Control, serializing it once per data version"""
+    payload = http_cache.cached_payload(key, version)
+    if payload is None:
+        # Serializing a large catalog is CPU work; keep it off the event loop
+        payload = await sheets_async.run(http_cache.build_payload, key, version, data)
+    return http_cache.respond(request, payload)
+
 @app.get("/api/categories")
-async def get_categories():
+async def get_categories(request: Request):
     print("Hit /api/categories")
-    data = sheets.get_categories()
-    print(f"Returning {len(data)} categories")
-    return data
+    catalog = await sheets_async.get_catalog()
+    print(f"Returning {len(catalog.categories)} categories")
+    return await catalog_response(request, "categories", catalog.version, catalog.categories)
 
 @app.get("/api/products")
-async def get_products():
+async def get_products(request: Request):
     print("Hit /api/products")
-    data = sheets.get_products()
-    print(f"Returning {len(data)} products")
-    return data
+    catalog = await sheets_async.get_catalog()
+    print(f"Returning {len(catalog.products)} products")
+    return await catalog_response(request, "products", catalog.version, catalog.products)
 
 @app.get("/api/brands")
-async def get_brands():
-    data = sheets.get_brands()
-    return data
+async def get_brands(request: Request):
+    # Read the version first: if the data changes in between, the newer data is
+    # cached under the older version and simply rebuilt on the next request
+    version = await sheets_async.get_data_version("Brands")
+    data = await sheets_async.get_brands()
+    return await catalog_response(request, "brands", version, data)
 
 # Legacy endpoints (keeping for backward compatibility)
 class OldLoginRequest(BaseModel):
@@ -743,14 +832,14 @@ class OldResetRequest(BaseModel):
 @app.post("/api/login-password")
 async def login_password(request: OldLoginRequest):
     # Try to authenticate
-    user = sheets.authenticate_user(request.email, request.password)
+    user = await sheets_async.authenticate_user(request.email, request.password)
     
     # If user not found, try to register (implicit first-time register as per user request flow)
     # "check the first time email and password"
     if "error" in user:
         if user["error"] == "User not found":
              # Auto-register
-             user = sheets.register_user(request.email, request.password)
+             user = await sheets_async.register_user(request.email, request.password)
         else:
              # Wrong password
              raise HTTPException(status_code=400, detail=user["error"])
@@ -762,7 +851,7 @@ async def login_password(request: OldLoginRequest):
 
 @app.post("/api/reset-password")
 async def reset_password_api(request: OldResetRequest):
-    result = sheets.reset_password(request.email, request.new_password)
+    result = await sheets_async.reset_password(request.email, request.new_password)
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     return result
@@ -793,7 +882,7 @@ async def update_profile_api(request: OldUpdateProfileRequest):
     if request.gender: profile_data["Gender"] = request.gender
     if request.age: profile_data["Age"] = request.age
 
-    result = sheets.update_user_profile(email, profile_data)
+    result = await sheets_async.update_user_profile(email, profile_data)
     if "error" in result:
          raise HTTPException(status_code=400, detail=result["error"])
     return result
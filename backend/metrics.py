@@ -0,0 +1,238 @@
+"""
+In-process metrics for the API: request latency per route, Google Sheets and SMTP calls
+per worksheet/operation, and cache hit/miss/stale counts per sheet.
+
+Everything is kept in memory by this worker process and served by /api/admin/metrics,
+as Prometheus text (render_prometheus) or JSON (snapshot).
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+
+
+class Counter:
+    """Monotonic count per label set"""
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        with _lock:
+            return [(dict(zip(self.labelnames, key)), value) for key, value in sorted(self.values.items())]
+
+    def reset(self):
+        with _lock:
+            self.values.clear()
+
+
+class Histogram:
+    """Count, sum and cumulative bucket counts of observed durations per label set"""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.values = {}
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with _lock:
+            state = self.values.get(key)
+            if state is None:
+                # [count, sum, per-bucket counts (not cumulative)]
+                state = self.values[key] = [0, 0.0, [0] * len(self.buckets)]
+            state[0] += 1
+            state[1] += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[2][i] += 1
+                    break
+
+    def samples(self):
+        """(labels, count, sum, cumulative bucket counts) per label set"""
+        with _lock:
+            items = [(key, state[0], state[1], list(state[2])) for key, state in sorted(self.values.items())]
+        result = []
+        for key, count, total, per_bucket in items:
+            cumulative, running = [], 0
+            for n in per_bucket:
+                running += n
+                cumulative.append(running)
+            result.append((dict(zip(self.labelnames, key)), count, total, cumulative))
+        return result
+
+    def reset(self):
+        with _lock:
+            self.values.clear()
+
+
+HTTP_REQUESTS = Histogram(
+    "http_request_duration_seconds", "API request latency by route template",
+    ("method", "route", "status"))
+SHEETS_CALLS = Histogram(
+    "sheets_api_call_duration_seconds", "Google Sheets API call latency",
+    ("worksheet", "operation"))
+SHEETS_ERRORS = Counter(
+    "sheets_api_errors_total", "Google Sheets API calls that raised",
+    ("worksheet", "operation", "error"))
+SMTP_SENDS = Histogram(
+    "smtp_send_duration_seconds", "SMTP send latency by email kind",
+    ("kind",))
+SMTP_ERRORS = Counter(
+    "smtp_errors_total", "SMTP sends that raised",
+    ("kind", "error"))
+CACHE_REQUESTS = Counter(
+    "sheet_cache_requests_total", "Sheet cache lookups by outcome (hit, stale, miss)",
+    ("sheet", "result"))
+
+METRICS = (HTTP_REQUESTS, SHEETS_CALLS, SHEETS_ERRORS, SMTP_SENDS, SMTP_ERRORS, CACHE_REQUESTS)
+
+
+def reset():
+    for metric in METRICS:
+        metric.reset()
+
+# ============================================
+# Recording helpers
+# ============================================
+
+
+@contextmanager
+def timed(histogram, errors, **labels):
+    """Observe the block's duration in `histogram`; count it in `errors` if it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        errors.inc(error=type(e).__name__, **labels)
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+
+class InstrumentedSheet:
+    """Wraps a gspread Worksheet/Spreadsheet so each API method call is timed under `worksheet`"""
+
+    def __init__(self, target, worksheet):
+        self._target = target
+        self._worksheet = worksheet
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            with timed(SHEETS_CALLS, SHEETS_ERRORS, worksheet=self._worksheet, operation=name):
+                return attr(*args, **kwargs)
+        return call
+
+    def __repr__(self):
+        return f"InstrumentedSheet({self._target!r})"
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording each HTTP request's latency under its route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router puts the matched route in the scope; unmatched paths share one label
+            route = scope.get("route")
+            HTTP_REQUESTS.observe(
+                time.perf_counter() - start,
+                method=scope["method"], route=getattr(route, "path", "unmatched"), status=status)
+
+# ============================================
+# Exposition
+# ============================================
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def render_prometheus():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if metric.kind == "counter":
+            for labels, value in metric.samples():
+                lines.append(f"{metric.name}{_label_text(labels)} {value}")
+            continue
+        for labels, count, total, cumulative in metric.samples():
+            for bound, n in zip(metric.buckets, cumulative):
+                lines.append(f"{metric.name}_bucket{_label_text({**labels, 'le': repr(bound)})} {n}")
+            lines.append(f"{metric.name}_bucket{_label_text({**labels, 'le': '+Inf'})} {count}")
+            lines.append(f"{metric.name}_sum{_label_text(labels)} {total:.6f}")
+            lines.append(f"{metric.name}_count{_label_text(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def cache_hit_ratios():
+    """Share of lookups per sheet answered from cache (fresh or stale)"""
+    totals = {}
+    for labels, value in CACHE_REQUESTS.samples():
+        hits, total = totals.get(labels["sheet"], (0, 0))
+        served = value if labels["result"] in ("hit", "stale") else 0
+        totals[labels["sheet"]] = (hits + served, total + value)
+    return {sheet: round(hits / total, 4) for sheet, (hits, total) in totals.items() if total}
+
+
+def snapshot():
+    """All metrics as a JSON-friendly dict"""
+    result = {}
+    for metric in METRICS:
+        if metric.kind == "counter":
+            result[metric.name] = [{"labels": labels, "value": value} for labels, value in metric.samples()]
+            continue
+        result[metric.name] = [{
+            "labels": labels,
+            "count": count,
+            "sum": round(total, 6),
+            "mean": round(total / count, 6) if count else 0.0,
+            "buckets": {repr(bound): n for bound, n in zip(metric.buckets, cumulative)},
+        } for labels, count, total, cumulative in metric.samples()]
+    result["sheet_cache_hit_ratio"] = cache_hit_ratios()
+    return result
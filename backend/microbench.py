@@ -0,0 +1,233 @@
+"""
+Microbenchmarks for the CPU-bound data shaping behind the API.
+
+Each case times one function over a synthetic dataset (Master, Users, Orders, OTP_Codes)
+at 1k..1M rows, and measures its peak Python allocation with tracemalloc in a separate
+run. Cached sheets are loaded straight into sheets.CACHE, so only the function's own work
+is measured; verify_otp reads OTP_Codes through the fake Sheets client (fake_sheets.py),
+as it checks the sheet for new codes on every call (after the first, only the new rows).
+
+Results are compared against microbench_baseline.json; the run fails (exit 1) when a
+case is more than TIME_TOLERANCE slower or MEMORY_TOLERANCE bigger than its baseline.
+
+Run: python microbench.py [--sizes 1000,10000,100000,1000000] [--case get_products]
+                          [--output results.json] [--save-baseline]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import auth
+import fake_sheets
+import sheets
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "microbench_baseline.json")
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# 1M-row datasets need a few GB of RAM, so they only run when asked for with --sizes
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+TIME_TOLERANCE = 0.5
+MEMORY_TOLERANCE = 0.25
+# Differences below these are noise, whatever the ratio
+TIME_NOISE_MS = 0.5
+MEMORY_NOISE_KB = 64
+
+# ============================================
+# Datasets
+# ============================================
+
+
+def dataset_rows(sheet_name, rows):
+    """(headers, rows) for `rows` rows of one sheet"""
+    if sheet_name == "OTP_Codes":
+        return sheets.OTP_HEADERS, [
+            [f"user{i % 5000}@example.com", f"{100000 + i % 900000}", "2024-01-01 10:00:00", "2024-01-01 10:10:00", "true"]
+            for i in range(rows)
+        ]
+    counts = {"products": 0, "users": 0, "orders": 0, "wishlist": 0, "subscribers": 0}
+    counts[{"Master": "products", "Users": "users", "Orders": "orders"}[sheet_name]] = rows
+    return fake_sheets.make_fixture(**counts)[sheet_name]
+
+
+def load_cached(sheet_name, rows):
+    """Put `rows` synthetic records in the cache, parsed the way get_all_records returns them"""
+    headers, values = dataset_rows(sheet_name, rows)
+    client = fake_sheets.FakeClient({sheet_name: (headers, values)})
+    records = client.spreadsheet._worksheets[sheet_name].get_all_records()
+    sheets._store_cache(sheet_name, records, sheets._cache_generation.get(sheet_name, 0))
+    return records
+
+
+def load_sheet(sheet_name, rows):
+    """Serve `rows` synthetic rows from the fake Sheets client, with an empty cache"""
+    fake_sheets.install({sheet_name: dataset_rows(sheet_name, rows)})
+
+# ============================================
+# Cases
+# ============================================
+# Each case is (dataset, prepare(rows) -> state, reset(state), run(state)).
+# reset() runs before every timed call and restores the cold state the case measures.
+
+
+def _catalog_case(function):
+    def reset(records):
+        # A new cache version, as after a Master refresh: the catalog is rebuilt on next use
+        sheets._store_cache("Master", records, sheets._cache_generation.get("Master", 0))
+    return ("Master", lambda rows: load_cached("Master", rows), reset, lambda _: function())
+
+
+def _reindex(sheet_name):
+    def reset(records):
+        sheets._store_cache(sheet_name, records, sheets._cache_generation.get(sheet_name, 0))
+    return reset
+
+
+def _load_orders(rows):
+    # The dashboard also counts customers; an empty Users sheet keeps that out of the timing
+    sheets._store_cache("Users", [], sheets._cache_generation.get("Users", 0))
+    return load_cached("Orders", rows)
+
+
+def _last_email(records):
+    return records[-1]["Email"]
+
+
+CASES = {
+    # Catalog snapshot rebuild after Master changes
+    "get_products": _catalog_case(sheets.get_products),
+    "get_categories": _catalog_case(sheets.get_categories),
+    # OrderStats build: the revenue / stage-count loop over every order
+    "get_admin_stats": ("Orders", _load_orders, _reindex("Orders"),
+                        lambda _: sheets.get_admin_stats()),
+    # First lookup after a Users refresh builds the email index
+    "get_user_by_email": ("Users", lambda rows: load_cached("Users", rows), _reindex("Users"),
+                          lambda records: sheets.get_user_by_email(_last_email(records))),
+    # Tail read and newest-first scan of OTP_Codes for a code that isn't there
+    "verify_otp": ("OTP_Codes", lambda rows: load_sheet("OTP_Codes", rows), lambda _: None,
+                   lambda _: sheets.verify_otp("user1@example.com", "000000")),
+    # Per-row validation cost, applied to every user's email / a password per user
+    "validate_email": ("Users", lambda rows: [f"user{i}@example.com" for i in range(rows)], lambda _: None,
+                       lambda emails: [auth.validate_email(e) for e in emails]),
+    "validate_password_strength": ("Users", lambda rows: [f"Secret{i}pass" for i in range(rows)], lambda _: None,
+                                   lambda passwords: [auth.validate_password_strength(p) for p in passwords]),
+}
+
+
+def repeats_for(rows):
+    return 5 if rows <= 10_000 else 3 if rows <= 100_000 else 1
+
+
+def measure(case, rows):
+    """Best-of-N time (ms) and peak allocation (KB) of one case at one size"""
+    _, prepare, reset, run = CASES[case]
+    state = prepare(rows)
+    try:
+        best = None
+        for _ in range(repeats_for(rows)):
+            reset(state)
+            gc.collect()
+            start = time.perf_counter()
+            run(state)
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+
+        reset(state)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run(state)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        sheets.CACHE.clear()
+        sheets.reset_sheets_client()
+    return {"time_ms": round(best, 3), "peak_kb": round(peak / 1024, 1)}
+
+# ============================================
+# Runner
+# ============================================
+
+
+def run(cases, sizes):
+    results = {}
+    print(f"{'case':28} {'dataset':10} {'rows':>9} {'time ms':>10} {'peak KB':>10}")
+    for case in cases:
+        dataset = CASES[case][0]
+        for rows in sizes:
+            result = measure(case, rows)
+            results.setdefault(case, {})[str(rows)] = result
+            print(f"{case:28} {dataset:10} {rows:>9} {result['time_ms']:>10.3f} {result['peak_kb']:>10.1f}")
+    return results
+
+
+def compare(results, baseline):
+    """Cases and sizes that are slower or bigger than the baseline allows"""
+    regressions = []
+    for case, by_size in results.items():
+        for rows, result in by_size.items():
+            base = baseline.get(case, {}).get(rows)
+            if base is None:
+                continue
+            slower = (result["time_ms"] > base["time_ms"] * (1 + TIME_TOLERANCE)
+                      and result["time_ms"] - base["time_ms"] > TIME_NOISE_MS)
+            bigger = (result["peak_kb"] > base["peak_kb"] * (1 + MEMORY_TOLERANCE)
+                      and result["peak_kb"] - base["peak_kb"] > MEMORY_NOISE_KB)
+            if slower:
+                regressions.append(f"{case}@{rows}: time {base['time_ms']:.3f} -> {result['time_ms']:.3f} ms")
+            if bigger:
+                regressions.append(f"{case}@{rows}: peak {base['peak_kb']:.1f} -> {result['peak_kb']:.1f} KB")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the data-shaping functions")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help=f"comma-separated row counts (available: {', '.join(str(s) for s in SIZES)})")
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="case to run (repeatable; default: all)")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write the results to {BASELINE_PATH}")
+    parser.add_argument("--no-compare", action="store_true", help="skip the baseline comparison")
+    args = parser.parse_args(argv)
+    args.sizes = [int(s) for s in args.sizes.split(",")]
+    args.case = args.case or list(CASES)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args.case, args.sizes)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH) as f:
+                baseline = json.load(f)
+        for case, by_size in results.items():
+            baseline.setdefault(case, {}).update(by_size)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return 0
+
+    if args.no_compare or not os.path.exists(BASELINE_PATH):
+        return 0
+    with open(BASELINE_PATH) as f:
+        regressions = compare(results, json.load(f))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {os.path.basename(BASELINE_PATH)}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"\nNo regressions against {os.path.basename(BASELINE_PATH)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+One-shot copy of the Google Sheets data into the SQLite backend.
+
+Every worksheet the API uses is read once and written to a table of the same name,
+replacing whatever that table held. Run it again to re-sync.
+
+Run: python migrate_to_sqlite.py [path/to/database.db]
+Then start the API with STORAGE_BACKEND=sqlite (and SQLITE_PATH if you passed a path).
+"""
+import sys
+
+import gspread
+
+import sheets
+from sqlite_storage import SQLITE_PATH, TABLES, SQLiteStorage
+
+
+def migrate(db, source=None):
+    """Copy each worksheet into db; `source(name)` returns (headers, records) or None if missing"""
+    source = source or read_worksheet
+    copied = {}
+    for table in TABLES:
+        data = source(table)
+        if data is None:
+            print(f"{table:15} missing in the spreadsheet, skipped")
+            continue
+        headers, records = data
+        copied[table] = db.import_rows(table, headers, records)
+        print(f"{table:15} {copied[table]:>7} rows")
+    return copied
+
+
+def read_worksheet(sheet_name):
+    try:
+        sheet = sheets.get_worksheet(sheet_name)
+    except gspread.exceptions.WorksheetNotFound:
+        return None
+    # get_all_records gives the same values the Sheets backend serves
+    return sheet.row_values(1), sheet.get_all_records()
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else SQLITE_PATH
+    print(f"Migrating spreadsheet {sheets.SHEET_ID} -> {path}")
+    db = SQLiteStorage(path)
+    copied = migrate(db)
+    print(f"Done: {sum(copied.values())} rows in {len(copied)} tables")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,43 @@
 import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from google.auth.transport.requests import Request
+from google.oauth2.service_account import Credentials
+import base64
+import bisect
+import datetime
 import json
 import os
+import itertools
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
+
+import metrics
 
-# Google Sheets Setup
 # Google Sheets Setup
 SHEET_ID = "1Ynl2Z_55tbjIsoGX5rY884tdanb2--TjRGnaKstzQLw"
 # Path to local credentials file
 CREDENTIALS_PATH = os.path.join(os.path.dirname(__file__), "google_credentials.json")
 
-def get_sheets_client():
+# Seconds to wait on a single HTTP request to Google before giving up
+HTTP_TIMEOUT = float(os.getenv("SHEETS_HTTP_TIMEOUT", "15"))
+# Refresh the access token this long before Google says it expires
+TOKEN_REFRESH_MARGIN = 300  # 5 minutes in seconds
+
+# Process-wide client, spreadsheet and worksheet handles.
+# Authorizing and opening the spreadsheet each cost a round trip, so we do it once.
+_client_lock = threading.RLock()
+_client = None
+_spreadsheet = None
+_worksheets = {}
+
+def _load_credentials():
+    # google-auth credentials: gspread's session uses them as-is, so their token and
+    # expiry are the ones the requests actually carry
     scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
     
     # Check for credentials in environment variable (for Render/Vercel)
@@ -22,222 +50,1281 @@ def get_sheets_client():
         with open(CREDENTIALS_PATH, 'r') as f:
             creds_dict = json.load(f)
             
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-    client = gspread.authorize(creds)
-    return client
+    return Credentials.from_service_account_info(creds_dict, scopes=scope)
 
-import time
+def _refresh_token_if_needed(client):
+    """Refresh the client's access token shortly before it expires"""
+    creds = getattr(getattr(client, "http_client", None), "auth", None)
+    if not isinstance(creds, Credentials) or not creds.token or creds.expiry is None:
+        # No token yet: the session fetches one on its first request
+        return
+    # google-auth keeps expiry as naive UTC
+    remaining = (creds.expiry - datetime.datetime.utcnow()).total_seconds()
+    if remaining < TOKEN_REFRESH_MARGIN:
+        creds.refresh(Request())
+
+def get_sheets_client():
+    """Return the shared gspread client, authorizing on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = gspread.authorize(_load_credentials())
+            _client.set_timeout(HTTP_TIMEOUT)
+        else:
+            _refresh_token_if_needed(_client)
+        return _client
+
+def get_spreadsheet():
+    """Return the shared handle to the store spreadsheet"""
+    global _spreadsheet
+    with _client_lock:
+        client = get_sheets_client()
+        if _spreadsheet is None:
+            with metrics.timed(metrics.SHEETS_CALLS, metrics.SHEETS_ERRORS, worksheet="(spreadsheet)", operation="open_by_key"):
+                spreadsheet = client.open_by_key(SHEET_ID)
+            _spreadsheet = metrics.InstrumentedSheet(spreadsheet, "(spreadsheet)")
+        return _spreadsheet
+
+def get_worksheet(sheet_name, headers=None, rows="1000", cols=None):
+    """Return a cached worksheet handle, creating the sheet with `headers` if it is missing"""
+    with _client_lock:
+        spreadsheet = get_spreadsheet()
+        sheet = _worksheets.get(sheet_name)
+        if sheet is not None:
+            return sheet
+        try:
+            sheet = metrics.InstrumentedSheet(spreadsheet.worksheet(sheet_name), sheet_name)
+        except gspread.exceptions.WorksheetNotFound:
+            if headers is None:
+                raise
+            sheet = spreadsheet.add_worksheet(title=sheet_name, rows=rows, cols=cols or str(len(headers)))
+            sheet = metrics.InstrumentedSheet(sheet, sheet_name)
+            sheet.append_row(headers)
+        _worksheets[sheet_name] = sheet
+        return sheet
+
+def forget_worksheet(sheet_name):
+    """Drop a cached worksheet handle so the next call looks it up again"""
+    with _client_lock:
+        _worksheets.pop(sheet_name, None)
+
+def reset_sheets_client():
+    """Drop the shared client and every handle derived from it"""
+    global _client, _spreadsheet
+    with _client_lock:
+        _client = None
+        _spreadsheet = None
+        _worksheets.clear()
+
+def use_sheets_client(client):
+    """Use `client` from now on instead of authorizing (e.g. fake_sheets.FakeClient for offline runs)"""
+    global _client
+    with _client_lock:
+        reset_sheets_client()
+        _client = client
+    # Cached data came from the previous spreadsheet
+    CACHE.clear()
+    with _missing_orders_lock:
+        _missing_orders.clear()
+
+# Column layouts used when a worksheet has to be created
+USERS_HEADERS = [
+    "Email", "Username", "Password_Hash", "Full_Name", "Phone",
+    "Address", "City", "State", "Pincode", "Created_At",
+    "Last_Login", "Session_Token", "Profile_Complete"
+]
+OTP_HEADERS = ["Email", "OTP_Code", "Created_At", "Expires_At", "Used"]
+WISHLIST_HEADERS = ["Email", "Product_ID", "Added_At", "Add_Card_Product"]
+# Columns: OrderID, Email, User_Name, Items_JSON, Total_Amount, Status, Payment_Mode, Created_At, Tracking_Stage
+ORDERS_HEADERS = ["Order_ID", "User_Email", "User_Name", "Items", "Total_Amount", "Status", "Payment_Mode", "Created_At", "Tracking_Stage"]
+SUBSCRIBERS_HEADERS = ["Email", "Joined_At"]
 
 # Simple in-memory cache
-# Format: { 'key': {'data': ..., 'timestamp': ...} }
+# Format: { 'key': {'data': ..., 'timestamp': ..., 'version': ..., 'indexes': {...}} }
 CACHE = {}
 CACHE_DURATION = 300  # 5 minutes in seconds
 
+# Per-sheet cache policy (seconds):
+#   ttl     - data is fresh this long and served as-is
+#   max_age - after ttl and up to this age, stale data is served immediately
+#             while a background refresh runs; older entries block on a refetch
+CACHE_POLICIES = {
+    "Master": {"ttl": 600, "max_age": 3600},
+    "Brands": {"ttl": 600, "max_age": 3600},
+    "Users": {"ttl": 300, "max_age": 1800},
+    "User_Wishlist": {"ttl": 120, "max_age": 900},
+    "Orders": {"ttl": 30, "max_age": 600},
+}
+DEFAULT_CACHE_POLICY = {"ttl": CACHE_DURATION, "max_age": CACHE_DURATION * 3}
+
+# Sheets that only grow through append_row (edits and deletes made here are mirrored by
+# write-through). Their refreshes read just the rows past the cached copy; a full read
+# every this many seconds reconciles changes made outside this process.
+INCREMENTAL_SHEETS = {
+    "Orders": 3600,
+    "OTP_Codes": 3600,
+    "User_Wishlist": 3600,
+    "Subscribers": 3600,
+}
+
+def get_cache_policy(key):
+    return CACHE_POLICIES.get(key, DEFAULT_CACHE_POLICY)
+
+# Every cache store gets a new version so derived data can tell when its source changed
+_version_counter = itertools.count(1)
+
+# Background refreshes for stale entries
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+
+# Fetches currently running, keyed like CACHE, so concurrent misses share one request
+_inflight_lock = threading.Lock()
+_inflight = {}
+# Bumped on every invalidation so a fetch that started before a write doesn't cache old data
+_cache_generation = {}
+# Bumped whenever a read stores rows, so a write can tell whether one landed while it ran
+_cache_reads = {}
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+def _single_flight(key, load):
+    """Run load() once for all concurrent callers of the same key and share its result"""
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _Flight()
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = load()
+        return flight.result
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            if _inflight.get(key) is flight:
+                del _inflight[key]
+        flight.done.set()
+
+def _get_fresh(key, ttl=None):
+    """Return cached data for key if it is younger than ttl (default: its policy ttl), else None"""
+    entry = CACHE.get(key)
+    if ttl is None:
+        ttl = get_cache_policy(key)['ttl']
+    if entry and time.time() - entry['timestamp'] < ttl:
+        return entry['data']
+    return None
+
+def _store_cache(key, data, generation, change_token=None):
+    """Cache data unless the key was invalidated after the fetch started.
+
+    `change_token` is the change probe's token taken before the fetch, if any.
+    """
+    with _inflight_lock:
+        if _cache_generation.get(key, 0) != generation:
+            return
+        _cache_reads[key] = _cache_reads.get(key, 0) + 1
+        now = time.time()
+        CACHE[key] = {
+            'data': data,
+            'timestamp': now,
+            'version': next(_version_counter),
+            'indexes': {},
+            'reconciled_at': now,
+            'change_token': change_token
+        }
+
+def get_cache_version(key):
+    """Version of the cached data for key (changes on every refresh or write), or None"""
+    entry = CACHE.get(key)
+    return entry['version'] if entry else None
+
 def invalidate_cache(sheet_name):
     global CACHE
-    if sheet_name in CACHE:
-        del CACHE[sheet_name]
+    keys = [sheet_name] + [key for key, (source, _) in PROJECTIONS.items() if source == sheet_name]
+    with _inflight_lock:
+        for key in keys:
+            _cache_generation[key] = _cache_generation.get(key, 0) + 1
+            CACHE.pop(key, None)
+            # Later readers must not join a fetch that may predate the write
+            _inflight.pop(key, None)
 
-def get_sheet_data(sheet_name, silent=False):
-    global CACHE
-    current_time = time.time()
-    
-    # Check cache first
-    if sheet_name in CACHE:
-        if current_time - CACHE[sheet_name]['timestamp'] < CACHE_DURATION:
-            # print(f"Serving {sheet_name} from cache")
-            return CACHE[sheet_name]['data']
-    
+# ============================================
+# Write-through cache updates
+# ============================================
+
+def _cell_value(value):
+    """Convert a written value the way get_all_records would read it back"""
+    return gspread.utils.numericise(value, default_blank="")
+
+def _reads_before_write(sheet_name):
+    """Read counts for sheet_name and its projections; take them before a write that is
+    not safe to mirror twice (appends, single-row deletes) and pass them to the _cache_* call"""
+    keys = [sheet_name] + [key for key, (source, _) in PROJECTIONS.items() if source == sheet_name]
+    with _inflight_lock:
+        return {key: _cache_reads.get(key, 0) for key in keys}
+
+def _apply_write(sheet_name, change, headers=None, reads=None):
+    """Apply a successful Sheets write to the cached rows instead of dropping them.
+
+    `change(records, headers)` returns the new record list plus the (old, new) record
+    pairs it touched, which are used to keep the entry's indexes in step.
+    A fetch already in flight may predate the write, so it is detached and its result
+    discarded, as with invalidation. A read stored since `reads` (from _reads_before_write)
+    may already show the write, so the entry is dropped rather than changed twice.
+    """
+    with _inflight_lock:
+        _cache_generation[sheet_name] = _cache_generation.get(sheet_name, 0) + 1
+        _inflight.pop(sheet_name, None)
+        entry = CACHE.get(sheet_name)
+        if entry is None:
+            return
+        if reads is not None and _cache_reads.get(sheet_name, 0) != reads.get(sheet_name, 0):
+            del CACHE[sheet_name]
+            return
+        records = entry['data']
+        sheet_headers = list(records[0].keys()) if records else list(headers or [])
+        new_records, touched = change(records, sheet_headers)
+        for index in entry['indexes'].values():
+            for old, new in touched:
+                index.replace(old, new)
+        CACHE[sheet_name] = {
+            **entry,
+            'data': new_records,
+            'version': next(_version_counter)
+        }
+
+def _cache_append(sheet_name, row, headers, reads):
+    """Mirror append_row(row) in the cached records; `reads` is _reads_before_write() from before it"""
+    def change(records, sheet_headers):
+        values = [_cell_value(v) for v in row] + [""] * (len(sheet_headers) - len(row))
+        record = dict(zip(sheet_headers, values))
+        return records + [record], [(None, record)]
+    _apply_write(sheet_name, change, headers, reads)
+
+    for key, (source, columns) in PROJECTIONS.items():
+        if source == sheet_name:
+            written = dict(zip(_sheet_headers(sheet_name) or headers, row))
+            _cache_append(key, [written.get(column, "") for column in columns], columns, reads)
+
+def _cache_update(sheet_name, match, cells):
+    """Mirror update_cell() calls on the first cached record matching `match`.
+
+    `cells` maps a column number (1-based, as in update_cell) or a header name to the new value.
+    """
+    def change(records, sheet_headers):
+        for idx, record in enumerate(records):
+            if match(record):
+                updated = dict(record)
+                for col, value in cells.items():
+                    if isinstance(col, int):
+                        if col > len(sheet_headers):
+                            continue
+                        col = sheet_headers[col - 1]
+                    updated[col] = _cell_value(value)
+                return records[:idx] + [updated] + records[idx + 1:], [(record, updated)]
+        return records, []
+    _apply_write(sheet_name, change)
+
+    # Projections get the cells they hold; `match` must only look at projected columns
+    for key, (source, columns) in PROJECTIONS.items():
+        if source != sheet_name:
+            continue
+        headers = _sheet_headers(sheet_name)
+        projected = {}
+        for col, value in cells.items():
+            if isinstance(col, int):
+                col = headers[col - 1] if col <= len(headers) else None
+            if col in columns:
+                projected[col] = value
+        if projected:
+            _cache_update(key, match, projected)
+
+def _cache_delete(sheet_name, match, first_only=False, reads=None):
+    """Mirror delete_rows() of the cached records matching `match`.
+
+    Deleting only the first match is not safe to repeat: pass `reads` from _reads_before_write().
+    """
+    def change(records, sheet_headers):
+        kept = []
+        deleted = []
+        for record in records:
+            if match(record) and not (first_only and deleted):
+                deleted.append((record, None))
+                continue
+            kept.append(record)
+        return kept, deleted
+    _apply_write(sheet_name, change, reads=reads)
+
+    for key, (source, _) in PROJECTIONS.items():
+        if source == sheet_name:
+            _cache_delete(key, match, first_only, reads)
+
+# ============================================
+# Record indexes
+# ============================================
+
+class RecordIndex:
+    """Dictionary index over one cached sheet, keyed by `key(record)`.
+
+    Records sharing a key are kept in sheet order, so `get` returns the same record a
+    linear scan would find first and `get_all` returns them as a filter would.
+    Records whose key is None are not indexed.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.groups = {}
+
+    def build(self, records):
+        for record in records:
+            self.add(record)
+        return self
+
+    def add(self, record):
+        k = self.key(record)
+        if k is not None:
+            self.groups.setdefault(k, []).append(record)
+
+    def remove(self, record):
+        k = self.key(record)
+        group = self.groups.get(k)
+        if group is None:
+            return
+        for i, existing in enumerate(group):
+            if existing is record:
+                del group[i]
+                break
+        if not group:
+            del self.groups[k]
+
+    def replace(self, old, new):
+        if old is not None and new is not None and self.key(old) == self.key(new):
+            # Same key: swap in place to keep sheet order
+            group = self.groups.get(self.key(old), [])
+            for i, existing in enumerate(group):
+                if existing is old:
+                    group[i] = new
+                    return
+        if old is not None:
+            self.remove(old)
+        if new is not None:
+            self.add(new)
+
+    def get(self, key):
+        group = self.groups.get(key)
+        return group[0] if group else None
+
+    def get_all(self, key):
+        return list(self.groups.get(key, ()))
+
+class SortedIndex:
+    """Records of one cached sheet kept in `sort_key(record)` order, for range scans and paging.
+
+    With a `group_key` the records are split into separately sorted groups (e.g. one per
+    status); without one they all sit in group None. Sort keys should be unique, e.g. by
+    ending in the row's id, so the last key of a page can serve as the cursor for the next.
+    """
+
+    def __init__(self, sort_key, group_key=None):
+        self.sort_key = sort_key
+        self.group_key = group_key or (lambda record: None)
+        self.groups = {}  # group -> ([sort keys], [records]), both ascending
+
+    def build(self, records):
+        grouped = {}
+        for record in records:
+            grouped.setdefault(self.group_key(record), []).append((self.sort_key(record), record))
+        for group, pairs in grouped.items():
+            pairs.sort(key=lambda pair: pair[0])
+            self.groups[group] = ([k for k, _ in pairs], [r for _, r in pairs])
+        return self
+
+    def add(self, record):
+        keys, records = self.groups.setdefault(self.group_key(record), ([], []))
+        k = self.sort_key(record)
+        i = bisect.bisect_right(keys, k)
+        keys.insert(i, k)
+        records.insert(i, record)
+
+    def remove(self, record):
+        group = self.group_key(record)
+        keys, records = self.groups.get(group, ((), ()))
+        k = self.sort_key(record)
+        i = bisect.bisect_left(keys, k)
+        while i < len(keys) and keys[i] == k:
+            if records[i] is record:
+                del keys[i]
+                del records[i]
+                break
+            i += 1
+        if group in self.groups and not keys:
+            del self.groups[group]
+
+    def replace(self, old, new):
+        if old is not None:
+            self.remove(old)
+        if new is not None:
+            self.add(new)
+
+    def _bounds(self, keys, lower, upper):
+        lo = bisect.bisect_left(keys, lower) if lower is not None else 0
+        hi = bisect.bisect_right(keys, upper) if upper is not None else len(keys)
+        return lo, hi
+
+    def count(self, group=None, lower=None, upper=None):
+        """Number of records in `group` whose sort key lies within [lower, upper]"""
+        keys, _ = self.groups.get(group, ((), ()))
+        lo, hi = self._bounds(keys, lower, upper)
+        return max(hi - lo, 0)
+
+    def page(self, group=None, limit=50, after=None, descending=False, lower=None, upper=None, predicate=None):
+        """Up to `limit` records of `group` past the cursor key `after`, within [lower, upper].
+
+        Returns (records, next_cursor), where next_cursor is None on the last page.
+        """
+        keys, records = self.groups.get(group, ((), ()))
+        lo, hi = self._bounds(keys, lower, upper)
+        if after is not None:
+            if descending:
+                hi = min(hi, bisect.bisect_left(keys, after))
+            else:
+                lo = max(lo, bisect.bisect_right(keys, after))
+        positions = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+
+        found = []
+        last = None
+        for i in positions:
+            if predicate is not None and not predicate(records[i]):
+                continue
+            if len(found) == limit:
+                return found, keys[last]
+            found.append(records[i])
+            last = i
+        return found, None
+
+# Index builders per sheet: {sheet_name: {index_name: factory}}
+INDEX_BUILDERS = {}
+
+def register_index(sheet_name, name, key, index_class=RecordIndex, **options):
+    """Declare an index over a cached sheet; it is built lazily by get_index"""
+    INDEX_BUILDERS.setdefault(sheet_name, {})[name] = lambda: index_class(key, **options)
+
+def get_index(sheet_name, name, silent=False):
+    """Return the named index over the cached sheet, building it once per cache refresh"""
+    get_sheet_data(sheet_name, silent)
+    entry = CACHE.get(sheet_name)
+    if entry is None:
+        return None
+    index = entry['indexes'].get(name)
+    if index is not None:
+        return index
+
+    with _inflight_lock:
+        # Writes swap the entry under this lock; build against the current one
+        entry = CACHE.get(sheet_name)
+        if entry is None:
+            return None
+        index = entry['indexes'].get(name)
+        if index is None:
+            index = INDEX_BUILDERS[sheet_name][name]().build(entry['data'])
+            entry['indexes'][name] = index
+        return index
+
+def _fetch_sheet(sheet_name, ttl=None):
+    # Another caller may have filled the cache while we waited to lead
+    data = _get_fresh(sheet_name, ttl)
+    if data is not None:
+        return data
+
+    generation = _cache_generation.get(sheet_name, 0)
+    tail = _tail_range(sheet_name)
+    data = None
+    token = None
+    if tail is not None:
+        data = _apply_tail(sheet_name, tail, get_worksheet(sheet_name).get(tail[2]), generation)
+    elif sheet_name in CACHE:
+        token = _probe_changes([sheet_name]).get(sheet_name)
+        data = _keep_if_unchanged(sheet_name, token, generation)
+    if data is None:
+        data = _read_sheet(sheet_name)
+        _store_cache(sheet_name, data, generation, token)
+    _schedule_snapshot()
+    return data
+
+def _read_sheet(sheet_name):
+    if sheet_name in PROJECTIONS:
+        return _read_projection(sheet_name)
     try:
-        client = get_sheets_client()
-        sheet = client.open_by_key(SHEET_ID).worksheet(sheet_name)
-        data = sheet.get_all_records()
-        
-        # Update cache
+        return get_worksheet(sheet_name).get_all_records()
+    except gspread.exceptions.WorksheetNotFound:
+        # A missing sheet is just empty; cache that too so we don't ask again every request
+        return []
+
+# ============================================
+# Change probes
+# ============================================
+
+def spreadsheet_modified_time(sheet_names):
+    """Change tokens from the spreadsheet's Drive modifiedTime: one request for any number of
+    sheets, but an edit to any sheet changes every sheet's token"""
+    modified = get_spreadsheet().get_lastUpdateTime()
+    return {name: modified for name in sheet_names}
+
+# Asked before refetching cached sheets: probe(sheet_names) -> {name: token}, where a
+# sheet's token changes whenever the sheet may have changed (missing or None: unknown).
+# Set with use_change_probe().
+_change_probe = spreadsheet_modified_time
+
+def use_change_probe(probe):
+    """Check sheets with `probe` before refetching them (None: always refetch)"""
+    global _change_probe
+    _change_probe = probe
+
+def _probe_changes(sheet_names):
+    """Current change tokens for the sheets that have one ({} if probing is off or failed).
+
+    Incremental sheets are left out: their tail read is as cheap as a probe.
+    """
+    sheet_names = [name for name in sheet_names if name not in INCREMENTAL_SHEETS]
+    if _change_probe is None or not sheet_names:
+        return {}
+    try:
+        return _change_probe(sheet_names)
+    except Exception as e:
+        print(f"Change probe for {sheet_names} failed: {e}")
+        return {}
+
+def _keep_if_unchanged(sheet_name, token, generation):
+    """Extend the cached copy's lifetime if the probe says the sheet hasn't changed; its data, else None"""
+    if token is None:
+        return None
+    with _inflight_lock:
+        entry = CACHE.get(sheet_name)
+        if (entry is None or entry.get('change_token') != token
+                or _cache_generation.get(sheet_name, 0) != generation):
+            return None
+        # Same version: nothing derived from it needs rebuilding
+        CACHE[sheet_name] = {**entry, 'timestamp': time.time()}
+        return entry['data']
+
+# ============================================
+# Column projections
+# ============================================
+
+# Subsets of a sheet's columns cached under their own key, for hot lookups that need
+# only a few columns: {key: (sheet_name, columns)}
+PROJECTIONS = {}
+
+# Column layout each sheet is created with, used to place projected columns until the
+# sheet itself has been read
+SHEET_HEADERS = {
+    "Users": USERS_HEADERS,
+    "OTP_Codes": OTP_HEADERS,
+    "User_Wishlist": WISHLIST_HEADERS,
+    "Orders": ORDERS_HEADERS,
+    "Subscribers": SUBSCRIBERS_HEADERS,
+}
+# Headers found by a full read made because projected columns weren't where expected
+_known_headers = {}
+
+def register_projection(sheet_name, columns):
+    """Declare a cached column subset of a sheet; returns its cache key.
+
+    The key works like a sheet name with get_sheet_data, register_index and get_index.
+    Its records hold just `columns`, and write-through keeps them in step with the sheet.
+    """
+    key = f"{sheet_name}[{','.join(columns)}]"
+    PROJECTIONS[key] = (sheet_name, tuple(columns))
+    return key
+
+def _sheet_headers(sheet_name):
+    """The sheet's headers as last seen: its cached rows, a previous full read, or its created layout"""
+    entry = CACHE.get(sheet_name)
+    if entry and entry['data']:
+        return list(entry['data'][0].keys())
+    return list(_known_headers.get(sheet_name) or SHEET_HEADERS.get(sheet_name, ()))
+
+def _project(records, columns):
+    return [{column: record.get(column, "") for column in columns} for record in records]
+
+def _projection_ranges(key):
+    """One A1 range per projected column (header cell included), or None if a column isn't known"""
+    sheet_name, columns = PROJECTIONS[key]
+    headers = _sheet_headers(sheet_name)
+    if any(column not in headers for column in columns):
+        return None
+    ranges = []
+    for column in columns:
+        letter = gspread.utils.rowcol_to_a1(1, headers.index(column) + 1)[:-1]
+        ranges.append(gspread.utils.absolute_range_name(sheet_name, f"{letter}:{letter}"))
+    return ranges
+
+def _records_from_columns(columns, column_values):
+    """Projected records from each column range's values, or None if a range's header isn't its column"""
+    cells = [[row[0] if row else "" for row in values] for values in column_values]
+    if [column_cells[0] if column_cells else "" for column_cells in cells] != list(columns):
+        return None
+    height = max(len(column_cells) for column_cells in cells)
+    return [
+        dict(zip(columns, gspread.utils.numericise_all(
+            [column_cells[i] if i < len(column_cells) else "" for column_cells in cells],
+            default_blank="")))
+        for i in range(1, height)
+    ]
+
+def _read_projection(key):
+    """Projected records: from the sheet's cached rows if recent enough, else by reading only those columns"""
+    sheet_name, columns = PROJECTIONS[key]
+    source = _get_fresh(sheet_name, get_cache_policy(key)['ttl'])
+    if source is not None:
+        return _project(source, columns)
+
+    ranges = _projection_ranges(key)
+    records = None
+    if ranges is not None:
+        try:
+            records = _records_from_columns(columns, _batch_get(ranges))
+        except gspread.exceptions.APIError as e:
+            # 400: no such sheet (yet); the full read below deals with that
+            if e.response.status_code != 400:
+                raise
+    if records is None:
+        # The columns aren't where the headers we know put them: read the whole sheet once
+        data = _read_sheet(sheet_name)
+        if data:
+            _known_headers[sheet_name] = list(data[0].keys())
+        records = _project(data, columns)
+    return records
+
+# ============================================
+# Batch reads
+# ============================================
+
+def _records_from_values(values):
+    """Records from a sheet's raw values (header row first), exactly as get_all_records builds them"""
+    if not values:
+        return []
+    values = gspread.utils.fill_gaps(values)
+    headers = values[0]
+    return [
+        dict(zip(headers, gspread.utils.numericise_all(row, default_blank="")))
+        for row in values[1:]
+    ]
+
+def _batch_get(ranges):
+    """Raw values of several A1 ranges in one values:batchGet round trip"""
+    response = get_spreadsheet().values_batch_get(ranges)
+    return [value_range.get("values", []) for value_range in response["valueRanges"]]
+
+def _tail_range(sheet_name):
+    """(entry, headers, cells) to read only the rows past the cached copy, or None if a full read is due.
+
+    The range starts at the last cached row, so the read also shows whether that row is
+    still where the cache thinks it is.
+    """
+    reconcile_interval = INCREMENTAL_SHEETS.get(sheet_name)
+    entry = CACHE.get(sheet_name)
+    if reconcile_interval is None or entry is None or not entry['data']:
+        return None
+    if time.time() - entry.get('reconciled_at', 0) >= reconcile_interval:
+        return None
+    headers = list(entry['data'][0].keys())
+    last_row = len(entry['data']) + 1  # row 1 holds the headers
+    last_column = gspread.utils.rowcol_to_a1(1, len(headers))[:-1]
+    return entry, headers, f"A{last_row}:{last_column}"
+
+def _apply_tail(sheet_name, tail, values, generation):
+    """Append the rows read past the cached copy; None if the sheet changed some other way"""
+    entry, headers, _ = tail
+    rows = [
+        dict(zip(headers, gspread.utils.numericise_all(row, default_blank="")))
+        for row in gspread.utils.fill_gaps(values, cols=len(headers))
+    ]
+    if not rows or rows[0] != entry['data'][-1]:
+        # Rows were deleted or edited above the tail: only a full read can tell what changed
+        return None
+    added = rows[1:]
+    with _inflight_lock:
+        current = CACHE.get(sheet_name)
+        if _cache_generation.get(sheet_name, 0) != generation or current is not entry:
+            # A write replaced the entry meanwhile; it is at least as new as this read
+            return current['data'] if current else entry['data']
+        if not added:
+            # Unchanged: same version, so nothing derived from it needs rebuilding
+            CACHE[sheet_name] = {**entry, 'timestamp': time.time()}
+            return entry['data']
+        for index in entry['indexes'].values():
+            for record in added:
+                index.replace(None, record)
+        _cache_reads[sheet_name] = _cache_reads.get(sheet_name, 0) + 1
+        data = entry['data'] + added
         CACHE[sheet_name] = {
+            **entry,
             'data': data,
-            'timestamp': current_time
+            'timestamp': time.time(),
+            'version': next(_version_counter)
         }
         return data
+
+def _load_sheets(sheet_names, generations):
+    """Read and cache several sheets in one values:batchGet round trip; returns {name: records}.
+
+    Cached sheets the change probe reports unchanged are kept without reading them, and
+    incremental sheets read only their new rows when the cached copy allows it.
+    """
+    results = {}
+    tokens = _probe_changes([name for name in sheet_names if name in CACHE])
+    for name, token in tokens.items():
+        data = _keep_if_unchanged(name, token, generations[name])
+        if data is not None:
+            results[name] = data
+    # Projections are read last: they can come straight from a sheet read in this batch
+    projections = [name for name in sheet_names if name in PROJECTIONS and name not in results]
+    sheet_names = [name for name in sheet_names if name not in results and name not in PROJECTIONS]
+    if sheet_names:
+        results.update(_load_ranges(sheet_names, generations, tokens))
+    for name in projections:
+        results[name] = _read_projection(name)
+        _store_cache(name, results[name], generations[name], tokens.get(name))
+    return results
+
+def _load_ranges(sheet_names, generations, tokens):
+    """The values:batchGet part of _load_sheets, for plain sheets"""
+    tails = {}
+    for name in sheet_names:
+        tail = _tail_range(name)
+        if tail is not None:
+            tails[name] = tail
+    ranges = [gspread.utils.absolute_range_name(name, tails[name][2] if name in tails else None)
+              for name in sheet_names]
+    try:
+        values = _batch_get(ranges)
+    except gspread.exceptions.APIError as e:
+        # One missing sheet fails the whole batch (400); read them one by one instead
+        if e.response.status_code != 400:
+            raise
+        values = [None] * len(sheet_names)
+
+    results = {}
+    full_reads = []
+    for name, sheet_values in zip(sheet_names, values):
+        if sheet_values is None:
+            results[name] = _read_sheet(name)
+            _store_cache(name, results[name], generations[name], tokens.get(name))
+        elif name in tails:
+            data = _apply_tail(name, tails[name], sheet_values, generations[name])
+            if data is None:
+                full_reads.append(name)
+            else:
+                results[name] = data
+        else:
+            results[name] = _records_from_values(sheet_values)
+            _store_cache(name, results[name], generations[name], tokens.get(name))
+
+    if full_reads:
+        ranges = [gspread.utils.absolute_range_name(name) for name in full_reads]
+        for name, sheet_values in zip(full_reads, _batch_get(ranges)):
+            results[name] = _records_from_values(sheet_values)
+            _store_cache(name, results[name], generations[name])
+    return results
+
+def _fetch_sheets(sheet_names):
+    """Fetch and cache several sheets in one round trip.
+
+    Sheets another caller is already fetching are waited for rather than read twice;
+    for the rest this call is the in-flight fetch that concurrent readers join.
+    """
+    own, joined = {}, {}
+    with _inflight_lock:
+        for name in sheet_names:
+            flight = _inflight.get(name)
+            if flight is None:
+                own[name] = _inflight[name] = _Flight()
+            else:
+                joined[name] = flight
+        generations = {name: _cache_generation.get(name, 0) for name in own}
+
+    results = {}
+    try:
+        if own:
+            for name, data in _load_sheets(list(own), generations).items():
+                own[name].result = results[name] = data
+            _schedule_snapshot()
     except Exception as e:
+        for flight in own.values():
+            flight.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            for name, flight in own.items():
+                if _inflight.get(name) is flight:
+                    del _inflight[name]
+        for flight in own.values():
+            flight.done.set()
+
+    for name, flight in joined.items():
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        results[name] = flight.result
+    return results
+
+def _refresh_sheets_in_background(sheet_names):
+    """Refetch several stale sheets together, off the request path"""
+    sheet_names = [name for name in sheet_names if name not in _inflight]
+    if len(sheet_names) == 1:
+        _refresh_in_background(sheet_names[0])
+    if len(sheet_names) < 2:
+        return
+
+    def refresh():
+        try:
+            _fetch_sheets(sheet_names)
+        except Exception as e:
+            for name in sheet_names:
+                forget_worksheet(name)
+            print(f"Error refreshing sheets {sheet_names}: {e}")
+
+    _refresh_executor.submit(refresh)
+
+def get_sheets_data(sheet_names, silent=False):
+    """get_sheet_data for several sheets at once: {name: records}.
+
+    Whatever has to be fetched comes back in a single round trip, and stale sheets are
+    refreshed together in the background.
+    """
+    results, missing, stale = {}, [], []
+    for name in sheet_names:
+        state, entry = _cache_state(name)
+        if state == "miss":
+            missing.append(name)
+        else:
+            results[name] = entry['data']
+            if state == "stale":
+                stale.append(name)
+    _refresh_sheets_in_background(stale)
+    if missing:
+        try:
+            results.update(_fetch_sheets(missing))
+        except Exception as e:
+            for name in missing:
+                forget_worksheet(name)
+                entry = CACHE.get(name)
+                results[name] = entry['data'] if entry else []
+            if not silent:
+                print(f"Error fetching sheets {missing}: {e}")
+    return results
+
+def _refresh_in_background(sheet_name):
+    """Refetch a stale sheet off the request path unless a fetch is already running"""
+    if sheet_name in _inflight:
+        return
+
+    def refresh():
+        try:
+            _single_flight(sheet_name, lambda: _fetch_sheet(sheet_name))
+        except Exception as e:
+            forget_worksheet(sheet_name)
+            print(f"Error refreshing sheet '{sheet_name}': {e}")
+
+    _refresh_executor.submit(refresh)
+
+def refresh_sheet(sheet_name, min_age):
+    """Refetch a sheet now, unless the cached copy is less than min_age seconds old"""
+    return _single_flight(sheet_name, lambda: _fetch_sheet(sheet_name, min_age))
+
+def _cache_state(sheet_name):
+    """("hit" | "stale" | "miss", entry) for a sheet under its cache policy, counted in metrics"""
+    entry = CACHE.get(sheet_name)
+    state = "miss"
+    if entry:
+        age = time.time() - entry['timestamp']
+        policy = get_cache_policy(sheet_name)
+        if age < policy['ttl']:
+            state = "hit"
+        elif age < policy['max_age']:
+            # Stale but usable: answer now, refresh behind the scenes
+            state = "stale"
+    metrics.CACHE_REQUESTS.inc(sheet=sheet_name, result=state)
+    return state, entry
+
+def get_sheet_data(sheet_name, silent=False):
+    # Check cache first
+    state, entry = _cache_state(sheet_name)
+    if state == "hit":
+        return entry['data']
+    if state == "stale":
+        _refresh_in_background(sheet_name)
+        return entry['data']
+
+    try:
+        return _single_flight(sheet_name, lambda: _fetch_sheet(sheet_name))
+    except Exception as e:
+        forget_worksheet(sheet_name)
         if not silent:
             print(f"Error fetching sheet '{sheet_name}': {e}")
-        return []
+        # Too old to serve normally, but better than nothing while Sheets is failing
+        return entry['data'] if entry else []
 
-def get_categories():
-    global CACHE
-    current_time = time.time()
-    # Cache key for derived categories from Master
-    cache_key = "categories_derived_master"
+# ============================================
+# Warm-start snapshot
+# ============================================
+# Cached sheets are saved to a local file after refreshes and on shutdown, and read back at
+# startup, so a restarted worker answers from the last known data while Sheets revalidates
+# it in the background. The file is plain JSON (records only; indexes are rebuilt on load),
+# so reading it can never run code. It holds user records (password hashes included): it is
+# written owner-only and must stay on the server.
+
+SNAPSHOT_PATH = os.getenv("CACHE_SNAPSHOT_PATH", os.path.join(os.path.dirname(__file__), "cache_snapshot.json"))
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_INTERVAL = 30  # at most one save per this many seconds after refreshes
+SNAPSHOT_MAX_AGE = 24 * 3600  # older snapshots are ignored
 
-    # Check cache
-    if cache_key in CACHE:
-        if current_time - CACHE[cache_key]['timestamp'] < CACHE_DURATION:
-            return CACHE[cache_key]['data']
+_snapshot_path = None  # set by load_snapshot(); until then nothing is saved
+_snapshot_lock = threading.Lock()
+# Saves come from the refresh timer and from shutdown; one at a time, so the newest wins
+_snapshot_write_lock = threading.Lock()
+_snapshot_timer = None
+_last_snapshot = 0.0
 
+def save_snapshot(path=None):
+    """Write every cached sheet to the snapshot file; returns how many were saved"""
+    path = path or _snapshot_path
+    if not path:
+        return 0
+    with _snapshot_write_lock:
+        return _write_snapshot(path)
+
+def _write_snapshot(path):
+    global _last_snapshot
+    with _inflight_lock:
+        entries = [(key, entry['data'], entry['timestamp']) for key, entry in CACHE.items()]
+    snapshot_sheets = {}
+    for key, records, fetched_at in entries:
+        # Header list + row lists: much smaller than repeating every key in every record
+        headers = list(records[0].keys()) if records else []
+        snapshot_sheets[key] = {
+            "fetched_at": fetched_at,
+            "headers": headers,
+            "rows": [[record.get(h, "") for h in headers] for record in records]
+        }
+    payload = {"format": SNAPSHOT_FORMAT, "sheet_id": SHEET_ID, "saved_at": time.time(), "sheets": snapshot_sheets}
+    # A temp file of our own next to the target, swapped in whole once written
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".cache_snapshot-")
     try:
-        # Source all data from "Master" sheet now
-        master_data = get_sheet_data("Master")
-        if not master_data:
-            return []
+        os.chmod(tmp_path, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _last_snapshot = time.time()
+    return len(snapshot_sheets)
 
-        categories_map = {}
-        
-        for row in master_data:
-            # Normalize keys just in case
-            safe_row = {str(k).strip(): v for k, v in row.items()}
-            
-            # Extract category (handles 'Category', 'category', 'Categories', 'categories')
-            cat_name = safe_row.get("Category", safe_row.get("category", safe_row.get("Categories", safe_row.get("categories", "")))).strip()
-            prod_name = safe_row.get("Product Name", safe_row.get("product name", "")).strip()
-            
-            if not cat_name:
+def load_snapshot(path=None):
+    """Fill the cache from the snapshot file and revalidate it in the background.
+
+    Also turns on saving to that file. Returns the names of the sheets loaded.
+    """
+    global _snapshot_path
+    path = path or SNAPSHOT_PATH
+    _snapshot_path = path
+    try:
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        if not isinstance(payload, dict):
+            raise ValueError("not a snapshot")
+    except (OSError, ValueError) as e:
+        if os.path.exists(path):
+            print(f"Ignoring unreadable cache snapshot {path}: {e}")
+        return []
+    if (payload.get("format") != SNAPSHOT_FORMAT or payload.get("sheet_id") != SHEET_ID
+            or time.time() - payload.get("saved_at", 0) > SNAPSHOT_MAX_AGE):
+        return []
+
+    loaded = []
+    now = time.time()
+    for key, sheet in payload["sheets"].items():
+        headers = sheet["headers"]
+        records = [dict(zip(headers, row)) for row in sheet["rows"]]
+        indexes = {name: build().build(records) for name, build in INDEX_BUILDERS.get(key, {}).items()}
+        with _inflight_lock:
+            if key in CACHE:
                 continue
-                
-            # Initialize category if not present
-            if cat_name not in categories_map:
-                categories_map[cat_name] = {
-                    "id": cat_name.lower().replace(" ", "-"),
-                    "name": cat_name,
-                    "subcategories": []
-                }
-            
-            # Add product name to subcategories if present
-            if prod_name and prod_name not in categories_map[cat_name]["subcategories"]:
-                categories_map[cat_name]["subcategories"].append(prod_name)
-        
-        # Convert map values to list
-        categories_data = list(categories_map.values())
-
-        # Update cache
-        if categories_data:
-            CACHE[cache_key] = {
-                'data': categories_data,
-                'timestamp': current_time
+            CACHE[key] = {
+                'data': records,
+                # Just past its ttl: served while the refresh started below runs, never treated as fresh
+                'timestamp': now - get_cache_policy(key)['ttl'],
+                'version': next(_version_counter),
+                'indexes': indexes
             }
-            return categories_data
+        loaded.append(key)
+    _refresh_sheets_in_background(loaded)
+    return loaded
 
+def _schedule_snapshot():
+    """Save the snapshot soon, at most once per SNAPSHOT_INTERVAL"""
+    global _snapshot_timer
+    if _snapshot_path is None:
+        return
+    with _snapshot_lock:
+        if _snapshot_timer is not None:
+            return
+        delay = max(0.0, _last_snapshot + SNAPSHOT_INTERVAL - time.time())
+        _snapshot_timer = threading.Timer(delay, _save_scheduled_snapshot)
+        _snapshot_timer.daemon = True
+        _snapshot_timer.start()
+
+def _save_scheduled_snapshot():
+    global _snapshot_timer
+    with _snapshot_lock:
+        _snapshot_timer = None
+    try:
+        save_snapshot()
     except Exception as e:
-        print(f"Error fetching categories from Master: {e}")
-        return []
+        print(f"Error saving cache snapshot: {e}")
 
-    return []
+# ============================================
+# Startup prewarm
+# ============================================
 
-def get_products():
-    # Fetch from "Master" sheet
+# Sheets the first requests after a start need: storefront, login, cart and orders
+PREWARM_SHEETS = ("Master", "Users", "Brands", "User_Wishlist", "Orders")
+
+def prewarm(sheet_names=PREWARM_SHEETS):
+    """Load the given sheets in one batch read, then build the catalog and their indexes.
+
+    Sheets already cached (e.g. from the snapshot) count as warm. Returns the names
+    of the sheets that could not be fetched.
+    """
+    failed = []
+    missing = [name for name in sheet_names if name not in CACHE]
+    if missing:
+        try:
+            _fetch_sheets(missing)
+        except Exception as e:
+            for name in missing:
+                forget_worksheet(name)
+            print(f"Prewarm of {missing} failed: {e}")
+            failed = missing
+
+    if "Master" in sheet_names and "Master" not in failed:
+        get_catalog()
+    warm = [name for name in sheet_names if name not in failed]
+    # Projections of the loaded sheets are cut from their rows, without further reads
+    warm += [key for key, (source, _) in PROJECTIONS.items() if source in warm]
+    for sheet_name in warm:
+        for index_name in INDEX_BUILDERS.get(sheet_name, {}):
+            get_index(sheet_name, index_name, silent=True)
+    return failed
+
+# ============================================
+# Catalog snapshot
+# ============================================
+
+class CatalogSnapshot(NamedTuple):
+    """Everything the storefront reads, derived once from one version of Master.
+
+    Treat it as read-only: it is shared by every request until Master changes.
+    """
+    version: Optional[int]  # version of the Master cache entry it was built from
+    products: tuple  # normalized product dicts, in sheet order
+    categories: tuple
+    products_by_id: Mapping[str, dict]
+    products_by_category: Mapping[str, tuple]
+
+CATALOG_KEY = "catalog_snapshot"
+_catalog = None
+
+_NON_DIGITS = re.compile(r"\D")
+
+def _parse_price(val):
+    """Parse a price cell safely (handle '100', 100, '$100', etc)"""
+    if not val: return 0
+    if isinstance(val, (int, float)): return val
+    digits = _NON_DIGITS.sub("", str(val))
+    return int(digits) if digits else 0
+
+def _normalize_product(raw_row):
     # Columns expected: 
     # Product Name (id/sub-cat reference), Category, Header Product Name (display name), 
     # 100g, 250g, 500g, 1000g (prices)
+
+    # Robust key handling
+    row = {str(k).strip(): v for k, v in raw_row.items()}
     
-    data = get_sheet_data("Master")
-    if not data:
-        return []
+    # Core fields
+    p_name = row.get("Product Name", row.get("product name", ""))
+    p_header_name = row.get("Header Product Name", row.get("header product name", p_name))
+    cat = row.get("Category", row.get("category", row.get("Categories", row.get("categories", ""))))
+
+    # Pricing
+    price_100g = _parse_price(row.get("Price_100g")) or _parse_price(row.get("100g"))
+    price_250g = _parse_price(row.get("Price_250g")) or _parse_price(row.get("250g"))
+    price_500g = _parse_price(row.get("Price_500g")) or _parse_price(row.get("500g"))
+    price_1kg = _parse_price(row.get("Price_1kg")) or _parse_price(row.get("1000g")) or _parse_price(row.get("1kg"))
+
+    # Determine a "base" price for listing (e.g., lowest available or 250g)
+    display_price = price_250g if price_250g > 0 else (price_100g or price_500g or price_1kg)
+
+    return {
+        "id": p_name, # unique identifier (assumed unique in Master)
+        "name": p_name, # Internal name / Sub-category link
+        "displayName": p_header_name, # The "Add Card Header Name"
+        "category": cat,
+        "price": display_price,
+        "prices": {
+            "100g": price_100g,
+            "250g": price_250g,
+            "500g": price_500g,
+            "1kg": price_1kg, 
+            "1000g": price_1kg # Alias
+        },
+        # Map other potential fields if present, else default
+        "image": row.get("Image", row.get("image", "/logo-clean.png")),
+        "description": row.get("Description", row.get("description", "Premium quality nuts.")),
+        "benefits": row.get("Benefits", row.get("benefits", ""))
+    }
 
-    normalized = []
-    for raw_row in data:
-        # Robust key handling
-        row = {str(k).strip(): v for k, v in raw_row.items()}
-        
-        # Core fields
-        p_name = row.get("Product Name", row.get("product name", ""))
-        p_header_name = row.get("Header Product Name", row.get("header product name", p_name))
-        p_header_name = row.get("Header Product Name", row.get("header product name", p_name))
-        cat = row.get("Category", row.get("category", row.get("Categories", row.get("categories", ""))))
-        
-        # Pricing
-        # Helper to parse price safely (handle '100', 100, '$100', etc)
-        def parse_price(val):
-            if not val: return 0
-            if isinstance(val, (int, float)): return val
-            try:
-                return int(''.join(filter(str.isdigit, str(val))))
-            except:
-                return 0
-
-        price_100g = parse_price(row.get("Price_100g")) or parse_price(row.get("100g"))
-        price_250g = parse_price(row.get("Price_250g")) or parse_price(row.get("250g"))
-        price_500g = parse_price(row.get("Price_500g")) or parse_price(row.get("500g"))
-        price_1kg = parse_price(row.get("Price_1kg")) or parse_price(row.get("1000g")) or parse_price(row.get("1kg"))
-
-        # Determine a "base" price for listing (e.g., lowest available or 250g)
-        display_price = price_250g if price_250g > 0 else (price_100g or price_500g or price_1kg)
-
-        normalized.append({
-            "id": p_name, # unique identifier (assumed unique in Master)
-            "name": p_name, # Internal name / Sub-category link
-            "displayName": p_header_name, # The "Add Card Header Name"
-            "category": cat,
-            "price": display_price,
-            "prices": {
-                "100g": price_100g,
-                "250g": price_250g,
-                "500g": price_500g,
-                "1kg": price_1kg, 
-                "1000g": price_1kg # Alias
-            },
-            # Map other potential fields if present, else default
-            "image": row.get("Image", row.get("image", "/logo-clean.png")),
-            "description": row.get("Description", row.get("description", "Premium quality nuts.")),
-            "benefits": row.get("Benefits", row.get("benefits", ""))
-        })
-        
-    return normalized
+def build_catalog(master_data, version=None):
+    """Build the catalog snapshot for one version of the Master rows"""
+    products = []
+    products_by_id = {}
+    products_by_category = {}
+    categories_map = {}
+    subcategory_sets = {}
+
+    for raw_row in master_data:
+        product = _normalize_product(raw_row)
+        products.append(product)
+        # First row wins, matching the old linear lookups
+        products_by_id.setdefault(product["id"], product)
+
+        # Categories come from the same rows, with names stripped
+        cat_name = str(product["category"]).strip()
+        prod_name = str(product["name"]).strip()
+        if not cat_name:
+            continue
+
+        # Initialize category if not present
+        if cat_name not in categories_map:
+            categories_map[cat_name] = {
+                "id": cat_name.lower().replace(" ", "-"),
+                "name": cat_name,
+                "subcategories": []
+            }
+            subcategory_sets[cat_name] = set()
+            products_by_category[cat_name] = []
+        products_by_category[cat_name].append(product)
+
+        # Add product name to subcategories if present
+        if prod_name and prod_name not in subcategory_sets[cat_name]:
+            subcategory_sets[cat_name].add(prod_name)
+            categories_map[cat_name]["subcategories"].append(prod_name)
+
+    return CatalogSnapshot(
+        version=version,
+        products=tuple(products),
+        categories=tuple(categories_map.values()),
+        products_by_id=MappingProxyType(products_by_id),
+        products_by_category=MappingProxyType({k: tuple(v) for k, v in products_by_category.items()})
+    )
+
+def get_catalog():
+    """Return the catalog snapshot for the current Master data, rebuilding it once per change"""
+    # Source all data from "Master" sheet (stale-while-revalidate, so usually no wait)
+    get_sheet_data("Master")
+    snapshot = _catalog
+    if snapshot is not None and snapshot.version == get_cache_version("Master"):
+        return snapshot
+    return _single_flight(CATALOG_KEY, _rebuild_catalog)
+
+def _rebuild_catalog():
+    global _catalog
+    entry = CACHE.get("Master")
+    version = entry['version'] if entry else None
+    snapshot = _catalog
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    try:
+        snapshot = build_catalog(entry['data'] if entry else [], version)
+    except Exception as e:
+        print(f"Error building catalog from Master: {e}")
+        snapshot = build_catalog([], version)
+    # Swap in the new snapshot in one assignment; readers see the old or the new, never a mix
+    _catalog = snapshot
+    return snapshot
+
+def get_categories():
+    return get_catalog().categories
+
+def get_products():
+    return get_catalog().products
+
+def get_product_by_id(product_id):
+    """Get a normalized product by its id"""
+    return get_catalog().products_by_id.get(product_id)
+
+def get_products_by_category(category):
+    """Get the normalized products in a category"""
+    return get_catalog().products_by_category.get(category, ())
+
+# Shown when there is no Brands data so the UI doesn't look empty
+FALLBACK_BRANDS = [
+    {"name": "Nutraj", "image": "/logo-clean.png"},
+    {"name": "The Wild Nuts", "image": "/logo-clean.png"},
+    {"name": "Bacture", "image": "/logo-clean.png"}
+]
 
 def get_brands():
     brands = get_sheet_data("Brands", silent=True)
     if not brands:
-        # Return fallback brands so the UI doesn't look empty
-        return [
-            {"name": "Nutraj", "image": "/logo-clean.png"},
-            {"name": "The Wild Nuts", "image": "/logo-clean.png"},
-            {"name": "Bacture", "image": "/logo-clean.png"}
-        ]
+        return FALLBACK_BRANDS
     return brands
 
-import datetime
-
-import datetime
-
 def get_users_sheet():
-    client = get_sheets_client()
-    spreadsheet = client.open_by_key(SHEET_ID)
     try:
-        return spreadsheet.worksheet("Users")
-    except:
-        # Try to create it
-        try:
-            print("Creating missing 'Users' sheet...")
-            sheet = spreadsheet.add_worksheet(title="Users", rows=100, cols=10)
-            sheet.append_row(['Email', 'Password', 'Name', 'Phone', 'JoinedAt', 'LastLogin'])
-            return sheet
-        except Exception as e:
-            print(f"Failed to create Users sheet: {e}")
-            return None
+        return get_worksheet("Users", headers=['Email', 'Password', 'Name', 'Phone', 'JoinedAt', 'LastLogin'], rows=100, cols=10)
+    except Exception as e:
+        print(f"Failed to open or create Users sheet: {e}")
+        return None
 
 def authenticate_user(email, password):
     # Use Cached Data
-    records = get_sheet_data("Users")
-    if not records: return {"error": "User not found"}
+    users_by_email = get_index("Users", "email")
+    user = users_by_email.get(_normalize_email(email)) if users_by_email else None
+    if not user:
+        return {"error": "User not found"}
     
-    for user in records:
-        # Check email (case insensitive) and password (exact)
-        if str(user.get("Email", "")).lower().strip() == email.lower().strip():
-            stored_pass = str(user.get("Password", ""))
-            if stored_pass == password:
-                return user
-            else:
-                return {"error": "Invalid Password"}
-    
-    return {"error": "User not found"}
+    # Check email (case insensitive) and password (exact)
+    stored_pass = str(user.get("Password", ""))
+    if stored_pass == password:
+        return user
+    return {"error": "Invalid Password"}
 
 def register_user(email, password):
     sheet = get_users_sheet()
     if not sheet: return {"error": "Users sheet missing"}
     
-    records = sheet.get_all_records()
-    for user in records:
-        if str(user.get("Email", "")).lower().strip() == email.lower().strip():
-             return {"error": "User already exists"}
+    users_by_email = get_index("Users", "email")
+    if users_by_email and users_by_email.get(_normalize_email(email)):
+        return {"error": "User already exists"}
     
     # Columns: Email, Password, Name, Phone, Address, Gender, Age, JoinedAt, LastLogin
     # Ensure we match the sheet columns order if possible, or just append generic
@@ -245,7 +1332,9 @@ def register_user(email, password):
     # A: Email, B: Password, C: Name, D: Phone, E: Address, F: Gender, G: Age, H: JoinedAt, I: LastLogin
     now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     new_row = [email, password, "", "", "", "", "", now_str, now_str]
+    reads = _reads_before_write("Users")
     sheet.append_row(new_row)
+    _cache_append("Users", new_row, USERS_HEADERS, reads)
     
     return {
         "Email": email,
@@ -312,65 +1401,89 @@ def update_user_profile(email, profile_data):
 # Authentication & User Management Functions
 # ============================================
 
+def _normalize_email(email):
+    return str(email).lower().strip() or None
+
+def _normalize_username(username):
+    return str(username).lower() or None
+
+# Users are looked up by normalized email and username, not scanned
+register_index("Users", "email", lambda record: _normalize_email(record.get("Email", "")))
+register_index("Users", "username", lambda record: _normalize_username(record.get("Username", "")))
+
+# Sign-in and sign-up need only these columns: a narrow copy of Users, cheap to refresh
+# and hold, with the same lookups. Login answers from it alone, never from Users.
+USER_CREDENTIAL_COLUMNS = ("Email", "Username", "Password_Hash", "Full_Name", "Profile_Complete")
+USER_CREDENTIALS = register_projection("Users", USER_CREDENTIAL_COLUMNS)
+# New sign-ups made elsewhere show up sooner than in Users
+CACHE_POLICIES[USER_CREDENTIALS] = {"ttl": 60, "max_age": 1800}
+register_index(USER_CREDENTIALS, "email", lambda record: _normalize_email(record.get("Email", "")))
+register_index(USER_CREDENTIALS, "username", lambda record: _normalize_username(record.get("Username", "")))
+
+def _user_from_record(record):
+    return {
+        "email": record.get("Email", ""),
+        "username": record.get("Username"),
+        "password_hash": record.get("Password_Hash", ""),
+        "full_name": record.get("Full_Name", ""),
+        "phone": record.get("Phone", ""),
+        "address": record.get("Address", ""),
+        "city": record.get("City", ""),
+        "state": record.get("State", ""),
+        "pincode": record.get("Pincode", ""),
+        "created_at": record.get("Created_At", ""),
+        "last_login": record.get("Last_Login", ""),
+        "session_token": record.get("Session_Token", ""),
+        "profile_complete": str(record.get("Profile_Complete", "false")).lower()
+    }
+
 def get_user_by_email(email):
     """Get user by email address"""
     try:
         # Use Cached Data
-        records = get_sheet_data("Users")
-        
-        target_email = email.lower().strip()
-        
-        for record in records:
-            # Check email (handle potential missing key safely)
-            raw_email = str(record.get('Email', ''))
-            current_email = raw_email.lower().strip()
-            
-            if current_email == target_email:
-                return {
-                    "email": record.get("Email", ""),
-                    "username": record.get("Username"),
-                    "password_hash": record.get("Password_Hash", ""),
-                    "full_name": record.get("Full_Name", ""),
-                    "phone": record.get("Phone", ""),
-                    "address": record.get("Address", ""),
-                    "city": record.get("City", ""),
-                    "state": record.get("State", ""),
-                    "pincode": record.get("Pincode", ""),
-                    "created_at": record.get("Created_At", ""),
-                    "last_login": record.get("Last_Login", ""),
-                    "session_token": record.get("Session_Token", ""),
-                    "profile_complete": str(record.get("Profile_Complete", "false")).lower()
-                }
-                
-        return None
+        users_by_email = get_index("Users", "email")
+        record = users_by_email.get(_normalize_email(email)) if users_by_email else None
+        return _user_from_record(record) if record else None
     except Exception as e:
         print(f"Error getting user by email: {e}")
         return None
 
+def _credentials_from_record(record):
+    return {
+        "email": record.get("Email", ""),
+        "username": record.get("Username"),
+        "password_hash": record.get("Password_Hash", ""),
+        "full_name": record.get("Full_Name", ""),
+        "profile_complete": str(record.get("Profile_Complete", "false")).lower()
+    }
+
+def get_credentials_by_email(email):
+    """Sign-in fields (email, username, password hash, name, profile state) of a user, or None"""
+    try:
+        by_email = get_index(USER_CREDENTIALS, "email")
+        record = by_email.get(_normalize_email(email)) if by_email else None
+        return _credentials_from_record(record) if record else None
+    except Exception as e:
+        print(f"Error getting credentials by email: {e}")
+        return None
+
+def get_credentials_by_username(username):
+    """Sign-in fields of the user with this username, or None"""
+    try:
+        by_username = get_index(USER_CREDENTIALS, "username")
+        record = by_username.get(_normalize_username(username)) if by_username else None
+        return _credentials_from_record(record) if record else None
+    except Exception as e:
+        print(f"Error getting credentials by username: {e}")
+        return None
+
 def get_user_by_username(username):
     """Get user by username"""
     try:
         # Use Cached Data
-        records = get_sheet_data("Users")
-        
-        for record in records:
-            if str(record.get('Username', '')).lower() == username.lower():
-                return {
-                    "email": record.get("Email", ""),
-                    "username": record.get("Username"),
-                    "password_hash": record.get("Password_Hash", ""),
-                    "full_name": record.get("Full_Name", ""),
-                    "phone": record.get("Phone", ""),
-                    "address": record.get("Address", ""),
-                    "city": record.get("City", ""),
-                    "state": record.get("State", ""),
-                    "pincode": record.get("Pincode", ""),
-                    "created_at": record.get("Created_At", ""),
-                    "last_login": record.get("Last_Login", ""),
-                    "session_token": record.get("Session_Token", ""),
-                    "profile_complete": str(record.get("Profile_Complete", "false")).lower()
-                }
-        return None
+        users_by_username = get_index("Users", "username")
+        record = users_by_username.get(_normalize_username(username)) if users_by_username else None
+        return _user_from_record(record) if record else None
     except Exception as e:
         print(f"Error getting user by username: {e}")
         return None
@@ -379,26 +1492,13 @@ def create_user(email, password_hash):
     """Create a new user"""
     import datetime
     try:
-        client = get_sheets_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        
         # Get or create Users sheet
-        try:
-            sheet = spreadsheet.worksheet("Users")
-        except:
-            # Create the sheet if it doesn't exist
-            sheet = spreadsheet.add_worksheet(title="Users", rows="1000", cols="13")
-            # Add headers
-            sheet.append_row([
-                "Email", "Username", "Password_Hash", "Full_Name", "Phone",
-                "Address", "City", "State", "Pincode", "Created_At",
-                "Last_Login", "Session_Token", "Profile_Complete"
-            ])
+        sheet = get_worksheet("Users", headers=USERS_HEADERS)
         
         now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         # Add new user
-        sheet.append_row([
+        new_row = [
             email,
             "",  # Username (to be set later)
             password_hash,
@@ -412,9 +1512,11 @@ def create_user(email, password_hash):
             now_str,  # Last_Login
             "",  # Session_Token
             "false"  # Profile_Complete
-        ])
+        ]
+        reads = _reads_before_write("Users")
+        sheet.append_row(new_row)
         
-        invalidate_cache("Users")  # <--- Invalidate Cache
+        _cache_append("Users", new_row, USERS_HEADERS, reads)
         
         return {"success": True, "email": email}
     except Exception as e:
@@ -425,9 +1527,7 @@ def update_user_profile_auth(email, username=None, full_name=None, phone=None,
                              address=None, city=None, state=None, pincode=None):
     """Update user profile information"""
     try:
-        client = get_sheets_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        sheet = spreadsheet.worksheet("Users")
+        sheet = get_worksheet("Users")
         
         cell = sheet.find(email)
         if not cell:
@@ -435,27 +1535,31 @@ def update_user_profile_auth(email, username=None, full_name=None, phone=None,
         
         row = cell.row
         
-        # Update fields if provided
+        # Update fields if provided (column number -> value)
+        changes = {}
         if username is not None:
-            sheet.update_cell(row, 2, username)
+            changes[2] = username
         if full_name is not None:
-            sheet.update_cell(row, 4, full_name)
+            changes[4] = full_name
         if phone is not None:
-            sheet.update_cell(row, 5, phone)
+            changes[5] = phone
         if address is not None:
-            sheet.update_cell(row, 6, address)
+            changes[6] = address
         if city is not None:
-            sheet.update_cell(row, 7, city)
+            changes[7] = city
         if state is not None:
-            sheet.update_cell(row, 8, state)
+            changes[8] = state
         if pincode is not None:
-            sheet.update_cell(row, 9, pincode)
+            changes[9] = pincode
         
         # Mark profile as complete if username is set
         if username:
-            sheet.update_cell(row, 13, "true")
+            changes[13] = "true"
+        
+        for col, value in changes.items():
+            sheet.update_cell(row, col, value)
             
-        invalidate_cache("Users")  # <--- Invalidate Cache
+        _cache_update("Users", lambda r: str(r.get("Email", "")) == email, changes)
         
         return {"success": True}
     except Exception as e:
@@ -465,9 +1569,7 @@ def update_user_profile_auth(email, username=None, full_name=None, phone=None,
 def update_password_hash(email, new_password_hash):
     """Update user password"""
     try:
-        client = get_sheets_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        sheet = spreadsheet.worksheet("Users")
+        sheet = get_worksheet("Users")
         
         cell = sheet.find(email)
         if not cell:
@@ -475,7 +1577,7 @@ def update_password_hash(email, new_password_hash):
         
         sheet.update_cell(cell.row, 3, new_password_hash)
         
-        invalidate_cache("Users")  # <--- Invalidate Cache
+        _cache_update("Users", lambda r: str(r.get("Email", "")) == email, {3: new_password_hash})
         
         return {"success": True}
     except Exception as e:
@@ -486,9 +1588,7 @@ def update_session_token(email, session_token):
     """Update user session token"""
     import datetime
     try:
-        client = get_sheets_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        sheet = spreadsheet.worksheet("Users")
+        sheet = get_worksheet("Users")
         
         cell = sheet.find(email)
         if not cell:
@@ -500,7 +1600,7 @@ def update_session_token(email, session_token):
         sheet.update_cell(row, 11, now_str)  # Last_Login
         sheet.update_cell(row, 12, session_token)  # Session_Token
         
-        invalidate_cache("Users")  # <--- Invalidate Cache
+        _cache_update("Users", lambda r: str(r.get("Email", "")) == email, {11: now_str, 12: session_token})
         
         return {"success": True}
     except Exception as e:
@@ -511,26 +1611,22 @@ def store_otp(email, otp):
     """Store OTP for password reset"""
     import datetime
     try:
-        client = get_sheets_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        
         # Get or create OTP_Codes sheet
-        try:
-            sheet = spreadsheet.worksheet("OTP_Codes")
-        except:
-            sheet = spreadsheet.add_worksheet(title="OTP_Codes", rows="1000", cols="5")
-            sheet.append_row(["Email", "OTP_Code", "Created_At", "Expires_At", "Used"])
+        sheet = get_worksheet("OTP_Codes", headers=OTP_HEADERS)
         
         now = datetime.datetime.now()
         expires = now + datetime.timedelta(minutes=10)
         
-        sheet.append_row([
+        new_row = [
             email,
             otp,
             now.strftime("%Y-%m-%d %H:%M:%S"),
             expires.strftime("%Y-%m-%d %H:%M:%S"),
             "false"
-        ])
+        ]
+        reads = _reads_before_write("OTP_Codes")
+        sheet.append_row(new_row)
+        _cache_append("OTP_Codes", new_row, OTP_HEADERS, reads)
         
         return {"success": True}
     except Exception as e:
@@ -541,12 +1637,9 @@ def verify_otp(email, otp):
     """Verify OTP for password reset"""
     import datetime
     try:
-        client = get_sheets_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        sheet = spreadsheet.worksheet("OTP_Codes")
-        
-        # Get all records
-        records = sheet.get_all_records()
+        # The code may have been issued by another worker: always pick up the rows
+        # appended since the cached copy (only those are read, not the whole sheet)
+        records = refresh_sheet("OTP_Codes", 0)
         now = datetime.datetime.now()
         
         # Find matching OTP (search from bottom to top for most recent)
@@ -565,7 +1658,8 @@ def verify_otp(email, otp):
                 
                 # Mark as used
                 row_num = idx + 2
-                sheet.update_cell(row_num, 5, "true")
+                get_worksheet("OTP_Codes").update_cell(row_num, 5, "true")
+                _cache_update("OTP_Codes", lambda r: r is record, {5: "true"})
                 
                 return {"success": True}
         
@@ -574,22 +1668,29 @@ def verify_otp(email, otp):
         print(f"Error verifying OTP: {e}")
         return {"error": str(e)}
 
+# Wishlist and cart-history rows grouped by user, in sheet order
+register_index("User_Wishlist", "email", lambda record: record.get('Email'))
+
+# Deletes find their row in a fresh read and then remove it by number; another delete in
+# between would shift the rows, so within this process they run one at a time
+_wishlist_delete_lock = threading.Lock()
+
+def _user_wishlist_records(email):
+    index = get_index("User_Wishlist", "email")
+    return index.get_all(email) if index else []
+
 def get_user_wishlist(email):
     """Get user's wishlist"""
     try:
-        # Use Cached Data
-        records = get_sheet_data("User_Wishlist")
-        
         wishlist = []
         
-        for record in records:
-            if record.get('Email') == email:
-                p_id = record.get('Product_ID')
-                if p_id: # Only add if Product_ID is present (filters out Cart items)
-                    wishlist.append({
-                        "product_id": p_id,
-                        "added_at": record.get('Added_At')
-                    })
+        for record in _user_wishlist_records(email):
+            p_id = record.get('Product_ID')
+            if p_id: # Only add if Product_ID is present (filters out Cart items)
+                wishlist.append({
+                    "product_id": p_id,
+                    "added_at": record.get('Added_At')
+                })
         
         return wishlist
     except Exception as e:
@@ -600,15 +1701,8 @@ def add_to_wishlist(email, product_id):
     """Add product to user's wishlist"""
     import datetime
     try:
-        client = get_sheets_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        
         # Get or create User_Wishlist sheet
-        try:
-            sheet = spreadsheet.worksheet("User_Wishlist")
-        except:
-            sheet = spreadsheet.add_worksheet(title="User_Wishlist", rows="1000", cols="4")
-            sheet.append_row(["Email", "Product_ID", "Added_At", "Add_Card_Product"])
+        sheet = get_worksheet("User_Wishlist", headers=WISHLIST_HEADERS)
         
         # Check if already in wishlist
         records = sheet.get_all_records()
@@ -625,9 +1719,11 @@ def add_to_wishlist(email, product_id):
         # Add to wishlist (Col 2)
         # Structure: Email, Product_ID, Added_At, Add_Card_Product
         now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        sheet.append_row([email, product_id, now_str, ""])
+        new_row = [email, product_id, now_str, ""]
+        reads = _reads_before_write("User_Wishlist")
+        sheet.append_row(new_row)
         
-        invalidate_cache("User_Wishlist")  # <--- Invalidate Cache
+        _cache_append("User_Wishlist", new_row, WISHLIST_HEADERS, reads)
         
         return {"success": True}
     except Exception as e:
@@ -638,15 +1734,8 @@ def add_to_cart_history(email, product_id):
     """Add product to user's cart history (Add_Card_Product column)"""
     import datetime
     try:
-        client = get_sheets_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        
         # Get or create User_Wishlist sheet (reusing the same sheet as requested)
-        try:
-            sheet = spreadsheet.worksheet("User_Wishlist")
-        except:
-            sheet = spreadsheet.add_worksheet(title="User_Wishlist", rows="1000", cols="4")
-            sheet.append_row(["Email", "Product_ID", "Added_At", "Add_Card_Product"])
+        sheet = get_worksheet("User_Wishlist", headers=WISHLIST_HEADERS)
         
         # Add to cart history (Col 4)
         now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -654,9 +1743,11 @@ def add_to_cart_history(email, product_id):
         # We append a new row for every cart action as it's a history
         # Structure: Email, Product_ID, Added_At, Add_Card_Product
         # Leave Product_ID empty for cart items to distinguish
-        sheet.append_row([email, "", now_str, product_id])
+        new_row = [email, "", now_str, product_id]
+        reads = _reads_before_write("User_Wishlist")
+        sheet.append_row(new_row)
         
-        invalidate_cache("User_Wishlist")
+        _cache_append("User_Wishlist", new_row, WISHLIST_HEADERS, reads)
         
         return {"success": True}
     except Exception as e:
@@ -666,20 +1757,26 @@ def add_to_cart_history(email, product_id):
 def remove_from_wishlist(email, product_id):
     """Remove product from user's wishlist"""
     try:
-        client = get_sheets_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        sheet = spreadsheet.worksheet("User_Wishlist")
-        
-        # Find and delete the row
-        records = sheet.get_all_records()
-        for idx, record in enumerate(records):
-            if record.get('Email') == email and record.get('Product_ID') == product_id:
-                row_num = idx + 2
-                sheet.delete_rows(row_num)
-                
-                invalidate_cache("User_Wishlist")  # <--- Invalidate Cache
-                
-                return {"success": True}
+        sheet = get_worksheet("User_Wishlist")
+        
+        with _wishlist_delete_lock:
+            # Find and delete the row
+            records = sheet.get_all_records()
+            for idx, record in enumerate(records):
+                # Numeric IDs come back as numbers; compare as text, like add_to_wishlist
+                if record.get('Email') == email and str(record.get('Product_ID', '')) == product_id:
+                    row_num = idx + 2
+                    reads = _reads_before_write("User_Wishlist")
+                    sheet.delete_rows(row_num)
+                    
+                    _cache_delete(
+                        "User_Wishlist",
+                        lambda r: r.get('Email') == email and str(r.get('Product_ID', '')) == product_id,
+                        first_only=True,
+                        reads=reads
+                    )
+                    
+                    return {"success": True}
         
         return {"error": "Item not found in wishlist"}
     except Exception as e:
@@ -689,23 +1786,21 @@ def remove_from_wishlist(email, product_id):
 def get_user_cart(email):
     """Get user's cart history"""
     try:
-        # Use Cached Data
-        records = get_sheet_data("User_Wishlist")
-        
         cart_items = []
-        
-        for record in records:
-            if record.get('Email') == email:
-                p_id = record.get('Add_Card_Product')
-                if p_id:
-                    cart_items.append({
-                        "product_id": p_id,
-                        "added_at": record.get('Added_At'),
-                        "id": p_id, # Frontend expects 'id'
-                        # We might need to fetch full details (name, price) here or frontend handles it?
-                        # Usually frontend needs full product object. 
-                        # For now, we return ID and let frontend/API hydrate it.
-                    })
+        # The cart is hydrated from Master next: fetch both in one round trip when cold
+        get_sheets_data(("User_Wishlist", "Master"))
+        
+        for record in _user_wishlist_records(email):
+            p_id = record.get('Add_Card_Product')
+            if p_id:
+                cart_items.append({
+                    "product_id": p_id,
+                    "added_at": record.get('Added_At'),
+                    "id": p_id, # Frontend expects 'id'
+                    # We might need to fetch full details (name, price) here or frontend handles it?
+                    # Usually frontend needs full product object. 
+                    # For now, we return ID and let frontend/API hydrate it.
+                })
         
         return cart_items
     except Exception as e:
@@ -715,91 +1810,89 @@ def get_user_cart(email):
 def remove_from_cart_history(email, product_id):
     """Remove product from user's cart history"""
     try:
-        client = get_sheets_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        sheet = spreadsheet.worksheet("User_Wishlist")
+        sheet = get_worksheet("User_Wishlist")
         
-        # Find and delete the row
-        # Warning: This is O(N) scan.
-        records = sheet.get_all_records()
+        with _wishlist_delete_lock:
+            # Find and delete the row
+            # Warning: This is O(N) scan.
+            records = sheet.get_all_records()
         
-        rows_to_delete = []
+            rows_to_delete = []
         
-        for idx, record in enumerate(records):
-            r_email = str(record.get('Email', ''))
-            r_pid = str(record.get('Add_Card_Product', ''))
+            for idx, record in enumerate(records):
+                r_email = str(record.get('Email', ''))
+                r_pid = str(record.get('Add_Card_Product', ''))
             
-            if r_email == email and r_pid == product_id:
-                rows_to_delete.append(idx + 2)
+                if r_email == email and r_pid == product_id:
+                    rows_to_delete.append(idx + 2)
         
-        # Delete in reverse order to keep indices valid
-        for row_num in reversed(rows_to_delete):
-            sheet.delete_rows(row_num)
+            # Delete in reverse order to keep indices valid
+            for row_num in reversed(rows_to_delete):
+                sheet.delete_rows(row_num)
             
-        if rows_to_delete:
-            invalidate_cache("User_Wishlist")
-            return {"success": True}
+            if rows_to_delete:
+                _cache_delete(
+                    "User_Wishlist",
+                    lambda r: str(r.get('Email', '')) == email and str(r.get('Add_Card_Product', '')) == product_id
+                )
+                return {"success": True}
         
         return {"error": "Item not found in cart history"}
     except Exception as e:
         print(f"Error removing from cart history: {e}")
         return {"error": str(e)}
 
+register_index("Orders", "email", lambda record: record.get('User_Email'))
+
 def get_user_orders(email):
     """Get user's order history"""
     try:
         # This assumes you have an Orders sheet
         # Adjust based on your actual orders structure
-        data = get_sheet_data("Orders", silent=True)
-        user_orders = [order for order in data if order.get('User_Email') == email]
-        return user_orders
+        orders_by_email = get_index("Orders", "email", silent=True)
+        return orders_by_email.get_all(email) if orders_by_email else []
     except Exception as e:
         print(f"Error getting user orders: {e}")
         return []
 
+def new_order_row(order_data):
+    """Build a new order's ID and its row in ORDERS_HEADERS order"""
+    import uuid
+
+    # Generate Order ID
+    order_id = f"ORD-{int(time.time())}-{str(uuid.uuid4())[:4].upper()}"
+    
+    # Parse items to string/JSON for sheet storage
+    items_str = json.dumps(order_data.get("items", []))
+    
+    now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    # Default tracking stage
+    tracking_stage = "Order Placed"
+    
+    return order_id, [
+        order_id,
+        order_data.get("email"),
+        order_data.get("user_name", ""),
+        items_str,
+        order_data.get("total_amount"),
+        "Pending", # Status
+        "WhatsApp/COD", # Payment Mode
+        now_str,
+        tracking_stage
+    ]
+
 def create_order(order_data):
     """Create a new order"""
-    import datetime
-    import uuid
-    import time
     try:
-        client = get_sheets_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        
         # Get or create Orders sheet
-        try:
-            sheet = spreadsheet.worksheet("Orders")
-        except:
-             # Columns: OrderID, Email, User_Name, Items_JSON, Total_Amount, Status, Payment_Mode, Created_At, Tracking_Stage
-            sheet = spreadsheet.add_worksheet(title="Orders", rows="1000", cols="10")
-            sheet.append_row(["Order_ID", "User_Email", "User_Name", "Items", "Total_Amount", "Status", "Payment_Mode", "Created_At", "Tracking_Stage"])
-            
-        # Generate Order ID
-        order_id = f"ORD-{int(time.time())}-{str(uuid.uuid4())[:4].upper()}"
-        
-        # Parse items to string/JSON for sheet storage
-        items_str = json.dumps(order_data.get("items", []))
-        
-        now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Default tracking stage
-        tracking_stage = "Order Placed"
-        
-        new_row = [
-            order_id,
-            order_data.get("email"),
-            order_data.get("user_name", ""),
-            items_str,
-            order_data.get("total_amount"),
-            "Pending", # Status
-            "WhatsApp/COD", # Payment Mode
-            now_str,
-            tracking_stage
-        ]
+        sheet = get_worksheet("Orders", headers=ORDERS_HEADERS, cols="10")
         
+        order_id, new_row = new_order_row(order_data)
+        reads = _reads_before_write("Orders")
         sheet.append_row(new_row)
         
-        invalidate_cache("Orders")
+        _cache_append("Orders", new_row, ORDERS_HEADERS, reads)
         
         return {"success": True, "order_id": order_id}
     except Exception as e:
@@ -818,14 +1911,54 @@ def get_all_orders():
         print(f"Error getting all orders: {e}")
         return []
 
+register_index("Orders", "order_id", lambda record: str(record.get('Order_ID', '')) or None)
+
+# Order IDs recently looked up and not found: {order_id: time}, least recently seen first.
+# Bounded so bots cycling through guessed IDs can't grow it without limit.
+MISSING_ORDER_CACHE_SIZE = 10000
+MISSING_ORDER_TTL = 60
+# On a miss, Orders is refetched (the order may have been placed through another
+# worker) unless our copy is younger than this, so misses cost at most one fetch per interval
+ORDER_MISS_REFETCH_INTERVAL = 5
+_missing_orders = OrderedDict()
+_missing_orders_lock = threading.Lock()
+
+def _is_known_missing_order(order_id):
+    with _missing_orders_lock:
+        seen = _missing_orders.get(order_id)
+        if seen is None:
+            return False
+        if time.time() - seen > MISSING_ORDER_TTL:
+            del _missing_orders[order_id]
+            return False
+        _missing_orders.move_to_end(order_id)
+        return True
+
+def _remember_missing_order(order_id):
+    with _missing_orders_lock:
+        _missing_orders[order_id] = time.time()
+        _missing_orders.move_to_end(order_id)
+        while len(_missing_orders) > MISSING_ORDER_CACHE_SIZE:
+            _missing_orders.popitem(last=False)
+
+def _lookup_order(order_id):
+    index = get_index("Orders", "order_id")
+    return index.get(order_id) if index else None
+
 def get_order_by_id(order_id):
     """Get a specific order by ID"""
     try:
-        orders = get_sheet_data("Orders")
-        for order in orders:
-            if order.get('Order_ID') == order_id:
-                return order
-        return None
+        order_id = str(order_id)
+        # The index is checked first, so a negative entry never hides an order that now exists
+        order = _lookup_order(order_id)
+        if order is not None or _is_known_missing_order(order_id):
+            return order
+
+        refresh_sheet("Orders", ORDER_MISS_REFETCH_INTERVAL)
+        order = _lookup_order(order_id)
+        if order is None:
+            _remember_missing_order(order_id)
+        return order
     except Exception as e:
         print(f"Error getting order by ID: {e}")
         return None
@@ -838,12 +1971,22 @@ def get_all_users():
         print(f"Error getting all users: {e}")
         return []
 
+def order_status_changes(new_status):
+    """Cells a status change writes: {column number: value} (Tracking_Stage is 9, Status is 6)"""
+    changes = {9: new_status}
+    # Also update Status to "Completed" if Delivered, or "Cancelled" if Cancelled
+    if new_status == "Delivered":
+        changes[6] = "Completed"
+    elif new_status == "Cancelled":
+        changes[6] = "Cancelled"
+    elif new_status != "Order Placed":
+        changes[6] = "In Progress"
+    return changes
+
 def update_order_status(order_id, new_status):
     """Update order status/tracking stage"""
     try:
-        client = get_sheets_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        sheet = spreadsheet.worksheet("Orders")
+        sheet = get_worksheet("Orders")
         
         # Find order row
         cell = sheet.find(order_id)
@@ -856,16 +1999,11 @@ def update_order_status(order_id, new_status):
         # We usually update both to keep them in sync or just tracking stage
         
         sheet.update_cell(cell.row, 9, new_status) # Update Tracking Stage
-        
-        # Also update Status to "Completed" if Delivered, or "Cancelled" if Cancelled
-        if new_status == "Delivered":
-            sheet.update_cell(cell.row, 6, "Completed")
-        elif new_status == "Cancelled":
-             sheet.update_cell(cell.row, 6, "Cancelled")
-        elif new_status != "Order Placed":
-             sheet.update_cell(cell.row, 6, "In Progress")
+        changes = order_status_changes(new_status)
+        if 6 in changes:
+            sheet.update_cell(cell.row, 6, changes[6])
 
-        invalidate_cache("Orders")
+        _cache_update("Orders", lambda r: r.get('Order_ID') == order_id, changes)
         return {"success": True}
     except Exception as e:
         print(f"Error updating order status: {e}")
@@ -875,14 +2013,7 @@ def store_subscriber(email):
     """Store newsletter subscriber"""
     import datetime
     try:
-        client = get_sheets_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        
-        try:
-            sheet = spreadsheet.worksheet("Subscribers")
-        except:
-            sheet = spreadsheet.add_worksheet(title="Subscribers", rows="1000", cols="2")
-            sheet.append_row(["Email", "Joined_At"])
+        sheet = get_worksheet("Subscribers", headers=SUBSCRIBERS_HEADERS)
             
         # Check if exists
         records = sheet.get_all_records()
@@ -891,7 +2022,11 @@ def store_subscriber(email):
                 return {"success": True, "message": "Already subscribed"}
         
         now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        sheet.append_row([email, now_str])
+        new_row = [email, now_str]
+        reads = _reads_before_write("Subscribers")
+        sheet.append_row(new_row)
+        
+        _cache_append("Subscribers", new_row, SUBSCRIBERS_HEADERS, reads)
         
         return {"success": True}
     except Exception as e:
@@ -906,12 +2041,187 @@ def get_all_subscribers():
          print(f"Error getting subscribers: {e}")
          return []
 
+# ============================================
+# Admin list queries (cursor pagination)
+# ============================================
+
+# Largest page the admin list endpoints hand out
+MAX_PAGE_SIZE = 200
+
+def _order_sort_key(record):
+    # Created_At is "%Y-%m-%d %H:%M:%S", which sorts chronologically as text; the id breaks ties
+    return (str(record.get('Created_At', '')), str(record.get('Order_ID', '')))
+
+def _stage_key(record):
+    return str(record.get('Tracking_Stage', '')).strip().lower()
+
+register_index("Orders", "by_created", _order_sort_key, index_class=SortedIndex)
+register_index("Orders", "by_stage_created", _order_sort_key, index_class=SortedIndex, group_key=_stage_key)
+register_index("Orders", "by_email_created", _order_sort_key, index_class=SortedIndex,
+               group_key=lambda record: _normalize_email(record.get('User_Email', '')))
+register_index("Subscribers", "by_joined",
+               lambda record: (str(record.get('Joined_At', '')), str(record.get('Email', ''))),
+               index_class=SortedIndex)
+
+# ============================================
+# Admin dashboard aggregates
+# ============================================
+
+def _order_amount(record):
+    # "₹ 1,200" -> 1200
+    digits = _NON_DIGITS.sub("", str(record.get('Total_Amount', 0)))
+    return int(digits) if digits else 0
+
+class OrderStats:
+    """Running dashboard totals over the Orders sheet, grouped by `stage_key(record)`.
+
+    Maintained through the same add/remove/replace calls as the record indexes, so writes
+    update it in place and it is only rebuilt from scratch when Orders is refetched.
+    """
+
+    def __init__(self, stage_key):
+        self.stage_key = stage_key
+        self.orders_count = 0
+        self.stage_counts = {}
+        self.revenue = 0  # from delivered orders only
+
+    def build(self, records):
+        for record in records:
+            self.add(record)
+        return self
+
+    def _apply(self, record, sign):
+        stage = self.stage_key(record)
+        self.orders_count += sign
+        self.stage_counts[stage] = self.stage_counts.get(stage, 0) + sign
+        if not self.stage_counts[stage]:
+            del self.stage_counts[stage]
+        if stage == 'delivered':
+            self.revenue += sign * _order_amount(record)
+
+    def add(self, record):
+        self._apply(record, 1)
+
+    def remove(self, record):
+        self._apply(record, -1)
+
+    def replace(self, old, new):
+        if old is not None:
+            self.remove(old)
+        if new is not None:
+            self.add(new)
+
+register_index("Orders", "stats", _stage_key, index_class=OrderStats)
+
+def get_admin_stats():
+    """Dashboard figures read off the maintained Orders aggregate; O(1) while the caches are warm"""
+    try:
+        # Both sheets in one round trip when neither is cached
+        users = get_sheets_data(("Orders", "Users"))["Users"]
+        with _inflight_lock:
+            # Writes update the aggregate and swap the cached rows under this lock: take both
+            # from the same entry so the figures and recent orders describe the same rows
+            entry = CACHE.get("Orders")
+            orders = entry['data'] if entry else []
+            stats = entry['indexes'].get("stats") if entry else OrderStats(_stage_key)
+            if stats is None:
+                stats = entry['indexes']["stats"] = INDEX_BUILDERS["Orders"]["stats"]().build(orders)
+            orders_count = stats.orders_count
+            completed = stats.stage_counts.get('delivered', 0)
+            revenue = stats.revenue
+            stage_counts = dict(stats.stage_counts)
+        return {
+            "revenue": revenue,
+            "orders_count": orders_count,  # Total orders (including all statuses)
+            "completed_orders": completed,  # Only delivered orders
+            "stage_counts": stage_counts,
+            "customers_count": len(users),
+            "conversion_rate": round((orders_count / len(users) * 100), 1) if users else 0,
+            "recent_orders": orders[-5:]  # Last 5 orders
+        }
+    except Exception as e:
+        print(f"Error getting admin stats: {e}")
+        return {"error": str(e)}
+
+def encode_cursor(key):
+    """Opaque, URL-safe cursor for a sort key"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for anything that isn't one of ours"""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, list) or not all(isinstance(k, str) for k in key):
+        raise ValueError("Invalid cursor")
+    return tuple(key)
+
+def _query_page(sheet_name, index_name, group=None, predicate=None, date_from=None, date_to=None,
+                order="desc", limit=50, cursor=None):
+    """One page of a sheet through one of its sorted indexes, as {"items", "next_cursor", "total"}.
+
+    `date_from`/`date_to` are inclusive "YYYY-MM-DD" bounds on the first sort key field.
+    `total` counts every match across all pages, or is None when a predicate makes that a scan.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return {"error": str(e)}
+
+    index = get_index(sheet_name, index_name)
+    if index is None:
+        return {"items": [], "next_cursor": None, "total": 0}
+
+    # Every timestamp on date_to sorts below date_to + "\uffff"
+    lower = (date_from,) if date_from else None
+    upper = (date_to + "\uffff",) if date_to else None
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    with _inflight_lock:
+        # Writes update indexes in place under this lock
+        items, next_key = index.page(group, limit, after, order == "desc", lower, upper, predicate)
+        total = None if predicate else index.count(group, lower, upper)
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(next_key) if next_key else None,
+        "total": total
+    }
+
+def query_orders(stage=None, email=None, date_from=None, date_to=None, order="desc", limit=50, cursor=None):
+    """Page through orders by Created_At, optionally filtered by tracking stage, customer email and date"""
+    try:
+        stage = stage.strip().lower() if stage else None
+        if email:
+            index_name, group = "by_email_created", _normalize_email(email)
+            predicate = (lambda record: _stage_key(record) == stage) if stage else None
+        elif stage:
+            index_name, group, predicate = "by_stage_created", stage, None
+        else:
+            index_name, group, predicate = "by_created", None, None
+
+        result = _query_page("Orders", index_name, group, predicate, date_from, date_to, order, limit, cursor)
+        if "error" in result:
+            return result
+        return {"orders": result["items"], "next_cursor": result["next_cursor"], "total": result["total"]}
+    except Exception as e:
+        print(f"Error querying orders: {e}")
+        return {"error": str(e)}
+
+def query_subscribers(date_from=None, date_to=None, order="desc", limit=50, cursor=None):
+    """Page through subscribers by Joined_At"""
+    try:
+        result = _query_page("Subscribers", "by_joined", None, None, date_from, date_to, order, limit, cursor)
+        if "error" in result:
+            return result
+        return {"subscribers": result["items"], "next_cursor": result["next_cursor"], "total": result["total"]}
+    except Exception as e:
+        print(f"Error querying subscribers: {e}")
+        return {"error": str(e)}
+
 def update_product_offer(product_id, is_offer):
     """Toggle Special Offer status for a product"""
     try:
-        client = get_sheets_client()
-        spreadsheet = client.open_by_key(SHEET_ID)
-        sheet = spreadsheet.worksheet("Master")
+        sheet = get_worksheet("Master")
         
         # Find product row
         cell = sheet.find(product_id)
@@ -933,7 +2243,12 @@ def update_product_offer(product_id, is_offer):
         
         sheet.update_cell(cell.row, col_idx,str(is_offer).lower())
         
-        invalidate_cache("Master")
+        # find() matched the first cell holding product_id, so patch the first record holding it
+        _cache_update(
+            "Master",
+            lambda r: any(str(v) == product_id for v in r.values()),
+            {"Special_Offer": str(is_offer).lower()}
+        )
         return {"success": True}
     except Exception as e:
          print(f"Error updating product offer: {e}")
@@ -0,0 +1,160 @@
+"""
+Async access layer for the storage backends.
+
+gspread (and sqlite3) are synchronous, so every call runs on a small dedicated thread
+pool instead of the event loop. The pool size bounds how many storage calls are in
+flight at once, and each read gets a timeout so one slow request can't hold up the rest
+of the worker. Writes get none: giving up on one doesn't stop it, so a client told to
+retry could apply it twice (e.g. place the same order again). Data operations go to the
+backend configured in storage.py.
+
+Password hashing (bcrypt, deliberately slow) has its own pool, so a burst of logins
+can't take the slots Sheets calls run in.
+"""
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import auth
+import sheets
+import storage
+
+# At most this many Sheets calls run at the same time; the rest wait their turn
+MAX_CONCURRENT_CALLS = int(os.getenv("SHEETS_MAX_CONCURRENCY", "8"))
+# Seconds an endpoint waits for a Sheets call (including queueing) before giving up
+CALL_TIMEOUT = float(os.getenv("SHEETS_CALL_TIMEOUT", "20"))
+
+# bcrypt hashes/checks running at once; each keeps a core busy for a few hundred ms
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CALLS, thread_name_prefix="sheets")
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+
+class SheetsTimeoutError(Exception):
+    """Raised when a Sheets call does not finish within its timeout"""
+
+
+async def run(func, *args, timeout=None, **kwargs):
+    """Run a blocking sheets function on the Sheets pool and await its result"""
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+    try:
+        return await asyncio.wait_for(future, timeout or CALL_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise SheetsTimeoutError(f"{func.__name__} timed out after {timeout or CALL_TIMEOUT}s")
+
+
+async def run_write(func, *args, **kwargs):
+    """Run a blocking write on the Sheets pool and wait for it, however long it takes"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+def _async(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run(func, *args, **kwargs)
+    return wrapper
+
+
+def _backend(name, write=False):
+    """Async wrapper calling the configured storage backend's `name` operation"""
+    runner = run_write if write else run
+
+    async def wrapper(*args, **kwargs):
+        return await runner(getattr(storage.get_storage(), name), *args, **kwargs)
+    wrapper.__name__ = wrapper.__qualname__ = name
+    return wrapper
+
+# ============================================
+# Low-level worksheet access
+# ============================================
+
+get_sheet_data = _async(sheets.get_sheet_data)
+
+# ============================================
+# Password hashing
+# ============================================
+
+
+async def hash_password(password):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, auth.hash_password, password)
+
+
+async def verify_password(password, hashed):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, auth.verify_password, password, hashed)
+
+# ============================================
+# Lifecycle
+# ============================================
+
+start_storage = _backend("start")
+stop_storage = _backend("stop")
+
+
+async def prewarm_storage(timeout=None):
+    """Warm the backend's caches; returns what failed to load"""
+    return await run(storage.get_storage().prewarm, timeout=timeout)
+
+# ============================================
+# Catalog
+# ============================================
+
+get_catalog = _backend("get_catalog")
+get_categories = _backend("get_categories")
+get_products = _backend("get_products")
+get_product_by_id = _backend("get_product_by_id")
+get_products_by_category = _backend("get_products_by_category")
+get_brands = _backend("get_brands")
+get_data_version = _backend("get_data_version")
+update_product_offer = _backend("update_product_offer", write=True)
+
+# ============================================
+# Users & Authentication
+# ============================================
+
+authenticate_user = _backend("authenticate_user")
+register_user = _backend("register_user", write=True)
+reset_password = _backend("reset_password", write=True)
+update_user_profile = _backend("update_user_profile", write=True)
+get_user_by_email = _backend("get_user_by_email")
+get_user_by_username = _backend("get_user_by_username")
+get_credentials_by_email = _backend("get_credentials_by_email")
+get_credentials_by_username = _backend("get_credentials_by_username")
+create_user = _backend("create_user", write=True)
+update_user_profile_auth = _backend("update_user_profile_auth", write=True)
+update_password_hash = _backend("update_password_hash", write=True)
+update_session_token = _backend("update_session_token", write=True)
+store_otp = _backend("store_otp", write=True)
+verify_otp = _backend("verify_otp", write=True)
+get_all_users = _backend("get_all_users")
+
+# ============================================
+# Wishlist & Cart
+# ============================================
+
+get_user_wishlist = _backend("get_user_wishlist")
+add_to_wishlist = _backend("add_to_wishlist", write=True)
+remove_from_wishlist = _backend("remove_from_wishlist", write=True)
+get_user_cart = _backend("get_user_cart")
+add_to_cart_history = _backend("add_to_cart_history", write=True)
+remove_from_cart_history = _backend("remove_from_cart_history", write=True)
+
+# ============================================
+# Orders & Subscribers
+# ============================================
+
+get_user_orders = _backend("get_user_orders")
+create_order = _backend("create_order", write=True)
+get_all_orders = _backend("get_all_orders")
+get_order_by_id = _backend("get_order_by_id")
+update_order_status = _backend("update_order_status", write=True)
+store_subscriber = _backend("store_subscriber", write=True)
+get_all_subscribers = _backend("get_all_subscribers")
+query_orders = _backend("query_orders")
+get_admin_stats = _backend("get_admin_stats")
+query_subscribers = _backend("query_subscribers")
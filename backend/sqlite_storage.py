@@ -0,0 +1,730 @@
+"""
+SQLite storage backend.
+
+Each worksheet becomes a table with the same column names, so records come back exactly
+as they do from Sheets, with `_row` (the rowid) standing in for the sheet row order.
+The database runs in WAL mode so readers never wait on the writer. Lookups by email,
+username and Order_ID go through indexes, and every write runs in its own transaction.
+
+Fill it from the spreadsheet with migrate_to_sqlite.py, then run the API with
+STORAGE_BACKEND=sqlite (SQLITE_PATH picks the file).
+"""
+import datetime
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import auth
+import sheets
+from storage import Storage
+
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(os.path.dirname(__file__), "wildnuts.db"))
+# Seconds a writer waits for another process's write lock before giving up
+BUSY_TIMEOUT = 5
+
+# Worksheets with a fixed layout; Master and Brands take whatever columns the sheet has
+TABLE_HEADERS = {
+    "Users": sheets.USERS_HEADERS,
+    "OTP_Codes": sheets.OTP_HEADERS,
+    "User_Wishlist": sheets.WISHLIST_HEADERS,
+    "Orders": sheets.ORDERS_HEADERS,
+    "Subscribers": sheets.SUBSCRIBERS_HEADERS,
+}
+# Every worksheet the migration copies
+TABLES = list(TABLE_HEADERS) + ["Master", "Brands"]
+# Columns behind get_credentials_by_* (the sheets backend's USER_CREDENTIALS projection)
+CREDENTIAL_COLUMNS = ", ".join(f'"{column}"' for column in sheets.USER_CREDENTIAL_COLUMNS)
+
+# Expressions match the Python-side normalization (sheets._normalize_email etc.)
+INDEXES = [
+    'CREATE INDEX IF NOT EXISTS users_email ON "Users" (lower(trim("Email")))',
+    'CREATE INDEX IF NOT EXISTS users_email_exact ON "Users" ("Email")',
+    'CREATE INDEX IF NOT EXISTS users_username ON "Users" (lower("Username"))',
+    'CREATE INDEX IF NOT EXISTS otp_email ON "OTP_Codes" ("Email")',
+    'CREATE INDEX IF NOT EXISTS wishlist_email ON "User_Wishlist" ("Email")',
+    'CREATE INDEX IF NOT EXISTS orders_id ON "Orders" ("Order_ID")',
+    'CREATE INDEX IF NOT EXISTS orders_email ON "Orders" ("User_Email")',
+    'CREATE INDEX IF NOT EXISTS orders_created ON "Orders" ("Created_At", "Order_ID")',
+    'CREATE INDEX IF NOT EXISTS orders_stage_created ON "Orders" '
+    '(lower(trim("Tracking_Stage")), "Created_At", "Order_ID")',
+    'CREATE INDEX IF NOT EXISTS orders_email_created ON "Orders" '
+    '(lower(trim("User_Email")), "Created_At", "Order_ID")',
+    'CREATE INDEX IF NOT EXISTS subscribers_email ON "Subscribers" ("Email")',
+    'CREATE INDEX IF NOT EXISTS subscribers_joined ON "Subscribers" ("Joined_At", "Email")',
+]
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class SQLiteStorage(Storage):
+    """Storage on a local SQLite database"""
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        # Every connection opened, whichever thread opened it, so close() can reach them all
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._catalog = None
+        self._catalog_lock = threading.Lock()
+        self._create_schema()
+
+    # ============================================
+    # Connections, schema and transactions
+    # ============================================
+
+    def _conn(self):
+        """This thread's connection (sqlite3 connections can't be shared across threads)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode: transactions are opened explicitly in _write
+            # Closed from whichever thread calls close(), hence check_same_thread=False
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.create_function("order_amount", 1, lambda v: sheets._order_amount({"Total_Amount": v}),
+                                 deterministic=True)
+            with self._connections_lock:
+                self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """Close the connections of every thread; only call once the storage is no longer in use"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        # Threads that kept a closed connection reconnect on their next call
+        self._local = threading.local()
+
+    def stop(self):
+        self.close()
+
+    @contextmanager
+    def _write(self):
+        """Run the block in one transaction, taking the write lock up front"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _create_schema(self):
+        with self._write() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS "_meta" (name TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+            for table, headers in TABLE_HEADERS.items():
+                self._ensure_table(conn, table, headers)
+            for statement in INDEXES:
+                conn.execute(statement)
+
+    def _columns(self, conn, table):
+        return [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(table)})") if row[1] != "_row"]
+
+    def _ensure_table(self, conn, table, headers):
+        """Create the table, or add any of `headers` it lacks.
+
+        Columns are untyped, so values keep the type they were written with (as numericised by gspread).
+        """
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {_quote(table)} (_row INTEGER PRIMARY KEY)")
+        existing = self._columns(conn, table)
+        for header in headers:
+            if header and header not in existing:
+                # Blank like an empty cell, for rows that predate the column
+                conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(header)} DEFAULT ''")
+                existing.append(header)
+        return existing
+
+    def _bump_version(self, conn, name):
+        conn.execute(
+            'INSERT INTO "_meta" (name, version) VALUES (?, 1) '
+            'ON CONFLICT(name) DO UPDATE SET version = version + 1',
+            (name,)
+        )
+
+    def get_data_version(self, name):
+        row = self._conn().execute('SELECT version FROM "_meta" WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else 0
+
+    def _records(self, sql, params=()):
+        """Rows of a SELECT as dicts keyed by column name, without _row"""
+        cursor = self._conn().execute(sql, params)
+        names = [d[0] for d in cursor.description]
+        keep = [i for i, name in enumerate(names) if name != "_row"]
+        return [{names[i]: row[i] for i in keep} for row in cursor]
+
+    def _table_exists(self, table):
+        return self._conn().execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone() is not None
+
+    def _insert(self, conn, table, headers, row):
+        columns = ", ".join(_quote(h) for h in headers)
+        placeholders = ", ".join("?" for _ in headers)
+        conn.execute(f"INSERT INTO {_quote(table)} ({columns}) VALUES ({placeholders})", list(row))
+
+    def _update_first(self, conn, table, where, params, changes):
+        """Apply {column: value} to the first row (in sheet order) matching `where`; False if none"""
+        row = conn.execute(
+            f"SELECT _row FROM {_quote(table)} WHERE {where} ORDER BY _row LIMIT 1", params
+        ).fetchone()
+        if row is None:
+            return False
+        if not changes:
+            return True
+        assignments = ", ".join(f"{_quote(column)} = ?" for column in changes)
+        conn.execute(f"UPDATE {_quote(table)} SET {assignments} WHERE _row = ?", [*changes.values(), row[0]])
+        return True
+
+    def import_rows(self, table, headers, records):
+        """Replace a table's rows with `records` (dicts keyed by `headers`) in one transaction"""
+        with self._write() as conn:
+            columns = self._ensure_table(conn, table, headers)
+            conn.execute(f"DELETE FROM {_quote(table)}")
+            conn.executemany(
+                f"INSERT INTO {_quote(table)} ({', '.join(_quote(c) for c in columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                ([record.get(c, "") for c in columns] for record in records)
+            )
+            self._bump_version(conn, table)
+        return len(records)
+
+    # ============================================
+    # Catalog
+    # ============================================
+
+    def get_catalog(self):
+        version = self.get_data_version("Master")
+        catalog = self._catalog
+        if catalog is not None and catalog.version == version:
+            return catalog
+        with self._catalog_lock:
+            if self._catalog is None or self._catalog.version != version:
+                rows = self._records('SELECT * FROM "Master" ORDER BY _row') if self._table_exists("Master") else []
+                self._catalog = sheets.build_catalog(rows, version)
+            return self._catalog
+
+    def get_brands(self):
+        brands = self._records('SELECT * FROM "Brands" ORDER BY _row') if self._table_exists("Brands") else []
+        return brands or sheets.FALLBACK_BRANDS
+
+    def update_product_offer(self, product_id, is_offer):
+        """Toggle Special Offer status for a product"""
+        try:
+            if not self._table_exists("Master"):
+                return {"error": "Product not found"}
+            with self._write() as conn:
+                columns = self._ensure_table(conn, "Master", ["Special_Offer"])
+                # Like the Sheets find(): the first row with product_id in any cell
+                where = " OR ".join(f"CAST({_quote(c)} AS TEXT) = ?" for c in columns)
+                if not self._update_first(conn, "Master", where, [str(product_id)] * len(columns),
+                                          {"Special_Offer": str(is_offer).lower()}):
+                    return {"error": "Product not found"}
+                self._bump_version(conn, "Master")
+            return {"success": True}
+        except Exception as e:
+            print(f"Error updating product offer: {e}")
+            return {"error": str(e)}
+
+    # ============================================
+    # Users & Authentication
+    # ============================================
+
+    # The legacy /api/login-password endpoints, on the hashed Users schema: the Sheets backend
+    # keeps their plaintext column, SQLite stores them like every other account
+    def _legacy_user(self, email):
+        records = self._records(
+            'SELECT * FROM "Users" WHERE lower(trim("Email")) = ? ORDER BY _row LIMIT 1',
+            (sheets._normalize_email(email),)
+        )
+        if not records:
+            return None
+        record = records[0]
+        return {
+            "Email": record.get("Email", ""),
+            "Name": record.get("Full_Name", ""),
+            "Phone": record.get("Phone", ""),
+            "Address": record.get("Address", ""),
+            "Gender": "",
+            "Age": "",
+            "JoinedAt": record.get("Created_At", ""),
+            "LastLogin": record.get("Last_Login", ""),
+        }
+
+    def authenticate_user(self, email, password):
+        try:
+            credentials = self.get_credentials_by_email(email)
+            if not credentials:
+                return {"error": "User not found"}
+            if not auth.verify_password(password, credentials["password_hash"]):
+                return {"error": "Invalid Password"}
+            self._update_user(credentials["email"], {"Last_Login": _now()})
+            return self._legacy_user(email)
+        except Exception as e:
+            print(f"Error authenticating user: {e}")
+            return {"error": str(e)}
+
+    def register_user(self, email, password):
+        try:
+            if self.get_credentials_by_email(email):
+                return {"error": "User already exists"}
+            result = self.create_user(email, auth.hash_password(password))
+            return result if "error" in result else self._legacy_user(email)
+        except Exception as e:
+            print(f"Error registering user: {e}")
+            return {"error": str(e)}
+
+    def reset_password(self, email, new_password):
+        try:
+            credentials = self.get_credentials_by_email(email)
+            if not credentials:
+                return {"error": "User not found"}
+            return self.update_password_hash(credentials["email"], auth.hash_password(new_password))
+        except Exception as e:
+            print(f"Error resetting password: {e}")
+            return {"error": str(e)}
+
+    def update_user_profile(self, email, profile_data):
+        try:
+            credentials = self.get_credentials_by_email(email)
+            if not credentials:
+                return {"error": "User not found"}
+            # Gender and Age have no column in the Users schema
+            result = self.update_user_profile_auth(
+                credentials["email"], full_name=profile_data.get("Name"),
+                phone=profile_data.get("Phone"), address=profile_data.get("Address")
+            )
+            return result if "error" in result else self._legacy_user(email)
+        except Exception as e:
+            print(f"Error updating user profile: {e}")
+            return {"error": str(e)}
+
+    def get_user_by_email(self, email):
+        """Get user by email address"""
+        try:
+            key = sheets._normalize_email(email)
+            records = self._records(
+                'SELECT * FROM "Users" WHERE lower(trim("Email")) = ? ORDER BY _row LIMIT 1', (key,)
+            )
+            return sheets._user_from_record(records[0]) if records else None
+        except Exception as e:
+            print(f"Error getting user by email: {e}")
+            return None
+
+    def get_user_by_username(self, username):
+        """Get user by username"""
+        try:
+            key = sheets._normalize_username(username)
+            if key is None:
+                return None
+            records = self._records(
+                'SELECT * FROM "Users" WHERE lower("Username") = ? ORDER BY _row LIMIT 1', (key,)
+            )
+            return sheets._user_from_record(records[0]) if records else None
+        except Exception as e:
+            print(f"Error getting user by username: {e}")
+            return None
+
+    def get_credentials_by_email(self, email):
+        """Sign-in fields (email, username, password hash, name, profile state) of a user, or None"""
+        try:
+            records = self._records(
+                f'SELECT {CREDENTIAL_COLUMNS} FROM "Users" '
+                'WHERE lower(trim("Email")) = ? ORDER BY _row LIMIT 1', (sheets._normalize_email(email),)
+            )
+            return sheets._credentials_from_record(records[0]) if records else None
+        except Exception as e:
+            print(f"Error getting credentials by email: {e}")
+            return None
+
+    def get_credentials_by_username(self, username):
+        """Sign-in fields of the user with this username, or None"""
+        try:
+            key = sheets._normalize_username(username)
+            if key is None:
+                return None
+            records = self._records(
+                f'SELECT {CREDENTIAL_COLUMNS} FROM "Users" '
+                'WHERE lower("Username") = ? ORDER BY _row LIMIT 1', (key,)
+            )
+            return sheets._credentials_from_record(records[0]) if records else None
+        except Exception as e:
+            print(f"Error getting credentials by username: {e}")
+            return None
+
+    def create_user(self, email, password_hash):
+        """Create a new user"""
+        try:
+            now_str = _now()
+            row = [email, "", password_hash, "", "", "", "", "", "", now_str, now_str, "", "false"]
+            with self._write() as conn:
+                self._insert(conn, "Users", sheets.USERS_HEADERS, row)
+            return {"success": True, "email": email}
+        except Exception as e:
+            print(f"Error creating user: {e}")
+            return {"error": str(e)}
+
+    def _update_user(self, email, changes):
+        with self._write() as conn:
+            if not self._update_first(conn, "Users", '"Email" = ?', (email,), changes):
+                return {"error": "User not found"}
+        return {"success": True}
+
+    def update_user_profile_auth(self, email, username=None, full_name=None, phone=None,
+                                 address=None, city=None, state=None, pincode=None):
+        """Update user profile information"""
+        try:
+            fields = {
+                "Username": username, "Full_Name": full_name, "Phone": phone, "Address": address,
+                "City": city, "State": state, "Pincode": pincode
+            }
+            changes = {column: value for column, value in fields.items() if value is not None}
+            # Mark profile as complete if username is set
+            if username:
+                changes["Profile_Complete"] = "true"
+            return self._update_user(email, changes)
+        except Exception as e:
+            print(f"Error updating user profile: {e}")
+            return {"error": str(e)}
+
+    def update_password_hash(self, email, new_password_hash):
+        """Update user password"""
+        try:
+            return self._update_user(email, {"Password_Hash": new_password_hash})
+        except Exception as e:
+            print(f"Error updating password: {e}")
+            return {"error": str(e)}
+
+    def update_session_token(self, email, session_token):
+        """Update user session token"""
+        try:
+            return self._update_user(email, {"Last_Login": _now(), "Session_Token": session_token})
+        except Exception as e:
+            print(f"Error updating session token: {e}")
+            return {"error": str(e)}
+
+    def store_otp(self, email, otp):
+        """Store OTP for password reset"""
+        try:
+            now = datetime.datetime.now()
+            expires = now + datetime.timedelta(minutes=10)
+            with self._write() as conn:
+                self._insert(conn, "OTP_Codes", sheets.OTP_HEADERS, [
+                    email,
+                    otp,
+                    now.strftime("%Y-%m-%d %H:%M:%S"),
+                    expires.strftime("%Y-%m-%d %H:%M:%S"),
+                    "false"
+                ])
+            return {"success": True}
+        except Exception as e:
+            print(f"Error storing OTP: {e}")
+            return {"error": str(e)}
+
+    def verify_otp(self, email, otp):
+        """Verify OTP for password reset"""
+        try:
+            # Checking and marking the code in one transaction means it can only be used once
+            with self._write() as conn:
+                row = conn.execute(
+                    'SELECT _row, "Expires_At" FROM "OTP_Codes" '
+                    'WHERE "Email" = ? AND "OTP_Code" = ? AND "Used" = \'false\' ORDER BY _row DESC LIMIT 1',
+                    (email, otp)
+                ).fetchone()
+                if row is None:
+                    return {"error": "Invalid OTP"}
+                expires = datetime.datetime.strptime(row[1], "%Y-%m-%d %H:%M:%S")
+                if datetime.datetime.now() > expires:
+                    return {"error": "OTP expired"}
+                conn.execute('UPDATE "OTP_Codes" SET "Used" = \'true\' WHERE _row = ?', (row[0],))
+            return {"success": True}
+        except Exception as e:
+            print(f"Error verifying OTP: {e}")
+            return {"error": str(e)}
+
+    def get_all_users(self):
+        """Get all users for admin"""
+        try:
+            return self._records('SELECT * FROM "Users" ORDER BY _row')
+        except Exception as e:
+            print(f"Error getting all users: {e}")
+            return []
+
+    # ============================================
+    # Wishlist & Cart
+    # ============================================
+
+    def get_user_wishlist(self, email):
+        """Get user's wishlist"""
+        try:
+            records = self._records(
+                'SELECT "Product_ID", "Added_At" FROM "User_Wishlist" WHERE "Email" = ? ORDER BY _row', (email,)
+            )
+            return [
+                {"product_id": r["Product_ID"], "added_at": r["Added_At"]}
+                for r in records if r["Product_ID"]
+            ]
+        except Exception as e:
+            print(f"Error getting wishlist: {e}")
+            return []
+
+    def add_to_wishlist(self, email, product_id):
+        """Add product to user's wishlist"""
+        try:
+            with self._write() as conn:
+                exists = conn.execute(
+                    'SELECT 1 FROM "User_Wishlist" WHERE "Email" = ? AND CAST("Product_ID" AS TEXT) = ? LIMIT 1',
+                    (email, str(product_id))
+                ).fetchone()
+                if exists:
+                    return {"success": True, "message": "Already in wishlist"}
+                self._insert(conn, "User_Wishlist", sheets.WISHLIST_HEADERS, [email, product_id, _now(), ""])
+            return {"success": True}
+        except Exception as e:
+            print(f"Error adding to wishlist: {e}")
+            return {"error": str(e)}
+
+    def remove_from_wishlist(self, email, product_id):
+        """Remove product from user's wishlist"""
+        try:
+            with self._write() as conn:
+                deleted = conn.execute(
+                    'DELETE FROM "User_Wishlist" WHERE _row = ('
+                    'SELECT _row FROM "User_Wishlist" WHERE "Email" = ? AND CAST("Product_ID" AS TEXT) = ? ORDER BY _row LIMIT 1)',
+                    (email, product_id)
+                ).rowcount
+            if deleted:
+                return {"success": True}
+            return {"error": "Item not found in wishlist"}
+        except Exception as e:
+            print(f"Error removing from wishlist: {e}")
+            return {"error": str(e)}
+
+    def get_user_cart(self, email):
+        """Get user's cart history"""
+        try:
+            records = self._records(
+                'SELECT "Add_Card_Product", "Added_At" FROM "User_Wishlist" WHERE "Email" = ? ORDER BY _row', (email,)
+            )
+            return [
+                {"product_id": r["Add_Card_Product"], "added_at": r["Added_At"], "id": r["Add_Card_Product"]}
+                for r in records if r["Add_Card_Product"]
+            ]
+        except Exception as e:
+            print(f"Error getting cart: {e}")
+            return []
+
+    def add_to_cart_history(self, email, product_id):
+        """Add product to user's cart history (Add_Card_Product column)"""
+        try:
+            with self._write() as conn:
+                self._insert(conn, "User_Wishlist", sheets.WISHLIST_HEADERS, [email, "", _now(), product_id])
+            return {"success": True}
+        except Exception as e:
+            print(f"Error adding to cart history: {e}")
+            return {"error": str(e)}
+
+    def remove_from_cart_history(self, email, product_id):
+        """Remove product from user's cart history"""
+        try:
+            with self._write() as conn:
+                deleted = conn.execute(
+                    'DELETE FROM "User_Wishlist" WHERE "Email" = ? AND CAST("Add_Card_Product" AS TEXT) = ?',
+                    (email, str(product_id))
+                ).rowcount
+            if deleted:
+                return {"success": True}
+            return {"error": "Item not found in cart history"}
+        except Exception as e:
+            print(f"Error removing from cart history: {e}")
+            return {"error": str(e)}
+
+    # ============================================
+    # Orders & Subscribers
+    # ============================================
+
+    def get_user_orders(self, email):
+        """Get user's order history"""
+        try:
+            return self._records('SELECT * FROM "Orders" WHERE "User_Email" = ? ORDER BY _row', (email,))
+        except Exception as e:
+            print(f"Error getting user orders: {e}")
+            return []
+
+    def create_order(self, order_data):
+        """Create a new order"""
+        try:
+            order_id, row = sheets.new_order_row(order_data)
+            with self._write() as conn:
+                self._insert(conn, "Orders", sheets.ORDERS_HEADERS, row)
+            return {"success": True, "order_id": order_id}
+        except Exception as e:
+            print(f"Error creating order: {e}")
+            return {"error": str(e)}
+
+    def get_all_orders(self):
+        """Get all orders for admin"""
+        try:
+            return self._records('SELECT * FROM "Orders" ORDER BY _row')
+        except Exception as e:
+            print(f"Error getting all orders: {e}")
+            return []
+
+    def get_order_by_id(self, order_id):
+        """Get a specific order by ID"""
+        try:
+            records = self._records(
+                'SELECT * FROM "Orders" WHERE "Order_ID" = ? ORDER BY _row LIMIT 1', (str(order_id),)
+            )
+            return records[0] if records else None
+        except Exception as e:
+            print(f"Error getting order by ID: {e}")
+            return None
+
+    def update_order_status(self, order_id, new_status):
+        """Update order status/tracking stage"""
+        try:
+            changes = {
+                sheets.ORDERS_HEADERS[col - 1]: value
+                for col, value in sheets.order_status_changes(new_status).items()
+            }
+            with self._write() as conn:
+                if not self._update_first(conn, "Orders", '"Order_ID" = ?', (order_id,), changes):
+                    return {"error": "Order not found"}
+            return {"success": True}
+        except Exception as e:
+            print(f"Error updating order status: {e}")
+            return {"error": str(e)}
+
+    def _query_page(self, table, sort_columns, filters, date_from, date_to, order, limit, cursor):
+        """Keyset-paginated SELECT, shaped like sheets._query_page: {"items", "next_cursor", "total"}.
+
+        `filters` are (sql expression, value) equality pairs; the first sort column is the date.
+        """
+        try:
+            after = sheets.decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return {"error": str(e)}
+        if after is not None and len(after) != len(sort_columns):
+            return {"error": "Invalid cursor"}
+
+        where = [f"{expr} = ?" for expr, _ in filters]
+        params = [value for _, value in filters]
+        if date_from:
+            where.append(f"{sort_columns[0]} >= ?")
+            params.append(date_from)
+        if date_to:
+            # Every timestamp on date_to sorts below date_to + "\uffff"
+            where.append(f"{sort_columns[0]} <= ?")
+            params.append(date_to + "\uffff")
+        total_where, total_params = list(where), list(params)
+
+        descending = order == "desc"
+        key = f"({', '.join(sort_columns)})"
+        if after is not None:
+            where.append(f"{key} {'<' if descending else '>'} ({', '.join('?' for _ in after)})")
+            params.extend(after)
+        direction = "DESC" if descending else "ASC"
+        limit = max(1, min(int(limit), sheets.MAX_PAGE_SIZE))
+
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        rows = self._records(
+            f"SELECT * FROM {_quote(table)} {clause} "
+            f"ORDER BY {', '.join(f'{c} {direction}' for c in sort_columns)} LIMIT ?",
+            [*params, limit + 1]
+        )
+        total_clause = f"WHERE {' AND '.join(total_where)}" if total_where else ""
+        total = self._conn().execute(f"SELECT COUNT(*) FROM {_quote(table)} {total_clause}", total_params).fetchone()[0]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = sheets.encode_cursor([str(last[c.strip('"')]) for c in sort_columns])
+        return {"items": rows, "next_cursor": next_cursor, "total": total}
+
+    def query_orders(self, stage=None, email=None, date_from=None, date_to=None, order="desc", limit=50, cursor=None):
+        """Page through orders by Created_At, optionally filtered by tracking stage, customer email and date"""
+        try:
+            filters = []
+            if email:
+                filters.append(('lower(trim("User_Email"))', sheets._normalize_email(email)))
+            if stage:
+                filters.append(('lower(trim("Tracking_Stage"))', stage.strip().lower()))
+            result = self._query_page("Orders", ['"Created_At"', '"Order_ID"'], filters,
+                                      date_from, date_to, order, limit, cursor)
+            if "error" in result:
+                return result
+            return {"orders": result["items"], "next_cursor": result["next_cursor"], "total": result["total"]}
+        except Exception as e:
+            print(f"Error querying orders: {e}")
+            return {"error": str(e)}
+
+    def get_admin_stats(self):
+        """Dashboard figures as indexed SQL aggregates"""
+        try:
+            conn = self._conn()
+            stage_counts = dict(conn.execute(
+                'SELECT lower(trim("Tracking_Stage")) AS stage, COUNT(*) FROM "Orders" GROUP BY stage'
+            ).fetchall())
+            revenue = conn.execute(
+                'SELECT COALESCE(SUM(order_amount("Total_Amount")), 0) FROM "Orders" '
+                'WHERE lower(trim("Tracking_Stage")) = \'delivered\''
+            ).fetchone()[0]
+            customers = conn.execute('SELECT COUNT(*) FROM "Users"').fetchone()[0]
+            recent = self._records('SELECT * FROM "Orders" ORDER BY _row DESC LIMIT 5')[::-1]
+            orders_count = sum(stage_counts.values())
+            return {
+                "revenue": revenue,
+                "orders_count": orders_count,  # Total orders (including all statuses)
+                "completed_orders": stage_counts.get('delivered', 0),  # Only delivered orders
+                "stage_counts": stage_counts,
+                "customers_count": customers,
+                "conversion_rate": round((orders_count / customers * 100), 1) if customers else 0,
+                "recent_orders": recent  # Last 5 orders
+            }
+        except Exception as e:
+            print(f"Error getting admin stats: {e}")
+            return {"error": str(e)}
+
+    def store_subscriber(self, email):
+        """Store newsletter subscriber"""
+        try:
+            with self._write() as conn:
+                if conn.execute('SELECT 1 FROM "Subscribers" WHERE "Email" = ? LIMIT 1', (email,)).fetchone():
+                    return {"success": True, "message": "Already subscribed"}
+                self._insert(conn, "Subscribers", sheets.SUBSCRIBERS_HEADERS, [email, _now()])
+            return {"success": True}
+        except Exception as e:
+            print(f"Error storing subscriber: {e}")
+            return {"error": str(e)}
+
+    def get_all_subscribers(self):
+        """Get all subscribers"""
+        try:
+            return self._records('SELECT * FROM "Subscribers" ORDER BY _row')
+        except Exception as e:
+            print(f"Error getting subscribers: {e}")
+            return []
+
+    def query_subscribers(self, date_from=None, date_to=None, order="desc", limit=50, cursor=None):
+        """Page through subscribers by Joined_At"""
+        try:
+            result = self._query_page("Subscribers", ['"Joined_At"', '"Email"'], [],
+                                      date_from, date_to, order, limit, cursor)
+            if "error" in result:
+                return result
+            return {"subscribers": result["items"], "next_cursor": result["next_cursor"], "total": result["total"]}
+        except Exception as e:
+            print(f"Error querying subscribers: {e}")
+            return {"error": str(e)}
@@ -0,0 +1,291 @@
+"""
+Storage backends.
+
+Everything main.py reads or writes goes through one of these, via sheets_async:
+- SheetsStorage (default) keeps the data in the Google Sheets spreadsheet (sheets.py)
+- SQLiteStorage keeps it in a local SQLite database (sqlite_storage.py), free of Sheets
+  quota and round trips; migrate_to_sqlite.py copies the spreadsheet into it
+
+Pick one with STORAGE_BACKEND=sheets|sqlite.
+"""
+import os
+import threading
+from abc import ABC, abstractmethod
+
+import sheets
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sheets")
+# Fields returned by get_credentials_by_*: all that login needs
+CREDENTIAL_FIELDS = ("email", "username", "password_hash", "full_name", "profile_complete")
+
+
+class Storage(ABC):
+    """Operations the API needs from a backend.
+
+    Every abstract method must be provided: a backend missing one fails when it is created.
+
+    Return values follow sheets.py: records are dicts keyed by the sheet headers, and
+    failures come back as {"error": message} rather than raising.
+    """
+
+    # ============================================
+    # Lifecycle
+    # ============================================
+
+    def start(self):
+        """Called once when the API starts, before it serves requests"""
+
+    def stop(self):
+        """Called once when the API shuts down"""
+
+    def prewarm(self):
+        """Load what the first requests will need; returns the parts that failed to load"""
+        return []
+
+    # ============================================
+    # Catalog
+    # ============================================
+
+    @abstractmethod
+    def get_catalog(self):
+        """Current sheets.CatalogSnapshot of the Master data"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_brands(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_data_version(self, name):
+        """Version of a dataset ("Master", "Brands", ...); changes whenever its data does"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_product_offer(self, product_id, is_offer):
+        raise NotImplementedError
+
+    def get_categories(self):
+        return self.get_catalog().categories
+
+    def get_products(self):
+        return self.get_catalog().products
+
+    def get_product_by_id(self, product_id):
+        return self.get_catalog().products_by_id.get(product_id)
+
+    def get_products_by_category(self, category):
+        return self.get_catalog().products_by_category.get(category, ())
+
+    # ============================================
+    # Users & Authentication
+    # ============================================
+
+    @abstractmethod
+    def authenticate_user(self, email, password):
+        raise NotImplementedError
+
+    @abstractmethod
+    def register_user(self, email, password):
+        raise NotImplementedError
+
+    @abstractmethod
+    def reset_password(self, email, new_password):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_user_profile(self, email, profile_data):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_user_by_email(self, email):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_user_by_username(self, username):
+        raise NotImplementedError
+
+    def get_credentials_by_email(self, email):
+        """Just the sign-in fields of a user, or None"""
+        user = self.get_user_by_email(email)
+        return {k: user[k] for k in CREDENTIAL_FIELDS} if user else None
+
+    def get_credentials_by_username(self, username):
+        user = self.get_user_by_username(username)
+        return {k: user[k] for k in CREDENTIAL_FIELDS} if user else None
+
+    @abstractmethod
+    def create_user(self, email, password_hash):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_user_profile_auth(self, email, username=None, full_name=None, phone=None,
+                                 address=None, city=None, state=None, pincode=None):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_password_hash(self, email, new_password_hash):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_session_token(self, email, session_token):
+        raise NotImplementedError
+
+    @abstractmethod
+    def store_otp(self, email, otp):
+        raise NotImplementedError
+
+    @abstractmethod
+    def verify_otp(self, email, otp):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_all_users(self):
+        raise NotImplementedError
+
+    # ============================================
+    # Wishlist & Cart
+    # ============================================
+
+    @abstractmethod
+    def get_user_wishlist(self, email):
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_to_wishlist(self, email, product_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove_from_wishlist(self, email, product_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_user_cart(self, email):
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_to_cart_history(self, email, product_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove_from_cart_history(self, email, product_id):
+        raise NotImplementedError
+
+    # ============================================
+    # Orders & Subscribers
+    # ============================================
+
+    @abstractmethod
+    def get_user_orders(self, email):
+        raise NotImplementedError
+
+    @abstractmethod
+    def create_order(self, order_data):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_all_orders(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_order_by_id(self, order_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_order_status(self, order_id, new_status):
+        raise NotImplementedError
+
+    @abstractmethod
+    def query_orders(self, stage=None, email=None, date_from=None, date_to=None, order="desc", limit=50, cursor=None):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_admin_stats(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def store_subscriber(self, email):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_all_subscribers(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def query_subscribers(self, date_from=None, date_to=None, order="desc", limit=50, cursor=None):
+        raise NotImplementedError
+
+
+class SheetsStorage(Storage):
+    """Google Sheets backend: each operation is the sheets.py function of the same name"""
+
+    # Warm start from the on-disk cache snapshot, and save it again on the way out
+    start = staticmethod(sheets.load_snapshot)
+    stop = staticmethod(sheets.save_snapshot)
+    prewarm = staticmethod(sheets.prewarm)
+
+    get_catalog = staticmethod(sheets.get_catalog)
+    get_brands = staticmethod(sheets.get_brands)
+    get_data_version = staticmethod(sheets.get_cache_version)
+    update_product_offer = staticmethod(sheets.update_product_offer)
+
+    authenticate_user = staticmethod(sheets.authenticate_user)
+    register_user = staticmethod(sheets.register_user)
+    reset_password = staticmethod(sheets.reset_password)
+    update_user_profile = staticmethod(sheets.update_user_profile)
+    get_user_by_email = staticmethod(sheets.get_user_by_email)
+    get_user_by_username = staticmethod(sheets.get_user_by_username)
+    get_credentials_by_email = staticmethod(sheets.get_credentials_by_email)
+    get_credentials_by_username = staticmethod(sheets.get_credentials_by_username)
+    create_user = staticmethod(sheets.create_user)
+    update_user_profile_auth = staticmethod(sheets.update_user_profile_auth)
+    update_password_hash = staticmethod(sheets.update_password_hash)
+    update_session_token = staticmethod(sheets.update_session_token)
+    store_otp = staticmethod(sheets.store_otp)
+    verify_otp = staticmethod(sheets.verify_otp)
+    get_all_users = staticmethod(sheets.get_all_users)
+
+    get_user_wishlist = staticmethod(sheets.get_user_wishlist)
+    add_to_wishlist = staticmethod(sheets.add_to_wishlist)
+    remove_from_wishlist = staticmethod(sheets.remove_from_wishlist)
+    get_user_cart = staticmethod(sheets.get_user_cart)
+    add_to_cart_history = staticmethod(sheets.add_to_cart_history)
+    remove_from_cart_history = staticmethod(sheets.remove_from_cart_history)
+
+    get_user_orders = staticmethod(sheets.get_user_orders)
+    create_order = staticmethod(sheets.create_order)
+    get_all_orders = staticmethod(sheets.get_all_orders)
+    get_order_by_id = staticmethod(sheets.get_order_by_id)
+    update_order_status = staticmethod(sheets.update_order_status)
+    query_orders = staticmethod(sheets.query_orders)
+    get_admin_stats = staticmethod(sheets.get_admin_stats)
+    store_subscriber = staticmethod(sheets.store_subscriber)
+    get_all_subscribers = staticmethod(sheets.get_all_subscribers)
+    query_subscribers = staticmethod(sheets.query_subscribers)
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    """The configured backend, created on first use"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                if STORAGE_BACKEND == "sqlite":
+                    from sqlite_storage import SQLiteStorage
+                    _storage = SQLiteStorage()
+                elif STORAGE_BACKEND == "sheets":
+                    _storage = SheetsStorage()
+                else:
+                    raise ValueError(f"Unknown STORAGE_BACKEND '{STORAGE_BACKEND}' (use 'sheets' or 'sqlite')")
+    return _storage
+
+
+def set_storage(backend):
+    """Swap the backend in use (tests, tools); returns the previous one"""
+    global _storage
+    with _storage_lock:
+        previous, _storage = _storage, backend
+    return previous
@@ -0,0 +1,141 @@
+"""
+Tests for cursor pagination of the admin order and subscriber lists.
+"""
+import time
+
+import sheets
+
+STAGES = ["Order Placed", "Shipped", "Delivered", "Cancelled"]
+
+
+def make_orders(count):
+    return [{
+        "Order_ID": f"ORD-{i:05d}",
+        "User_Email": f"user{i % 7}@example.com",
+        "User_Name": "",
+        "Items": "[]",
+        "Total_Amount": 100 + i,
+        "Status": "Pending",
+        "Payment_Mode": "WhatsApp/COD",
+        # Two orders per second, several per day, so ties and date bounds both get exercised
+        "Created_At": f"2024-01-{1 + i // 20:02d} 10:00:{(i // 2) % 10:02d}",
+        "Tracking_Stage": STAGES[i % len(STAGES)]
+    } for i in range(count)]
+
+
+def cache_sheet(sheet_name, records):
+    sheets.CACHE[sheet_name] = {
+        'data': records,
+        'timestamp': time.time(),
+        'version': next(sheets._version_counter),
+        'indexes': {}
+    }
+
+
+def expected_order(records, reverse=True):
+    return sorted(records, key=sheets._order_sort_key, reverse=reverse)
+
+
+def collect(query, **params):
+    """Follow next_cursor to the end, returning every item and the number of pages"""
+    items, pages, cursor = [], 0, None
+    while True:
+        result = query(cursor=cursor, **params)
+        key = "orders" if "orders" in result else "subscribers"
+        items += result[key]
+        pages += 1
+        cursor = result["next_cursor"]
+        if cursor is None:
+            return items, pages
+
+
+def test_pages_cover_every_order_once_in_order():
+    orders = make_orders(203)
+    sheets.CACHE.clear()
+    cache_sheet("Orders", orders)
+    try:
+        first = sheets.query_orders(limit=50)
+        assert first["total"] == 203
+        assert first["orders"] == expected_order(orders)[:50]
+
+        items, pages = collect(sheets.query_orders, limit=50)
+        assert items == expected_order(orders) and pages == 5
+
+        items, _ = collect(sheets.query_orders, limit=64, order="asc")
+        assert items == expected_order(orders, reverse=False)
+    finally:
+        sheets.CACHE.clear()
+
+
+def test_filters():
+    orders = make_orders(200)
+    sheets.CACHE.clear()
+    cache_sheet("Orders", orders)
+    try:
+        shipped, _ = collect(sheets.query_orders, stage="shipped", limit=7)
+        assert shipped == expected_order([o for o in orders if o["Tracking_Stage"] == "Shipped"])
+
+        mine, _ = collect(sheets.query_orders, email=" User3@Example.com", stage="Delivered", limit=5)
+        assert mine == expected_order([
+            o for o in orders if o["User_Email"] == "user3@example.com" and o["Tracking_Stage"] == "Delivered"
+        ])
+
+        ranged = sheets.query_orders(date_from="2024-01-03", date_to="2024-01-04", limit=200)
+        assert ranged["orders"] == expected_order([o for o in orders if "2024-01-03" <= o["Created_At"][:10] <= "2024-01-04"])
+        assert ranged["total"] == 40 and ranged["next_cursor"] is None
+    finally:
+        sheets.CACHE.clear()
+
+
+class UpdatableSheet:
+    """Accepts update_order_status's worksheet calls; the cached rows are what's under test"""
+
+    def find(self, query):
+        return type("Cell", (), {"row": 2})()
+
+    def update_cell(self, row, col, value):
+        pass
+
+
+def test_pages_follow_writes():
+    sheets.CACHE.clear()
+    cache_sheet("Orders", make_orders(10))
+    original = sheets.get_worksheet
+    sheets.get_worksheet = lambda sheet_name, **kwargs: UpdatableSheet()
+    try:
+        sheets.update_order_status("ORD-00001", "Cancelled")
+        cancelled = sheets.query_orders(stage="cancelled")["orders"]
+        assert "ORD-00001" in [o["Order_ID"] for o in cancelled]
+        assert "ORD-00001" not in [o["Order_ID"] for o in sheets.query_orders(stage="shipped")["orders"]]
+
+        sheets._cache_append("Orders", ["ORD-99999", "new@example.com", "", "[]", 1, "Pending", "", "2030-01-01 00:00:00", "Order Placed"], sheets.ORDERS_HEADERS,
+                             sheets._reads_before_write("Orders"))
+        assert sheets.query_orders(limit=1)["orders"][0]["Order_ID"] == "ORD-99999"
+    finally:
+        sheets.get_worksheet = original
+        sheets.CACHE.clear()
+
+
+def test_subscribers_and_bad_cursor():
+    sheets.CACHE.clear()
+    cache_sheet("Subscribers", [
+        {"Email": f"s{i}@example.com", "Joined_At": f"2024-02-{1 + i:02d} 09:00:00"} for i in range(25)
+    ])
+    try:
+        page = sheets.query_subscribers(limit=10)
+        assert page["total"] == 25
+        assert page["subscribers"][0]["Email"] == "s24@example.com"
+        items, pages = collect(sheets.query_subscribers, limit=10)
+        assert len(items) == 25 and pages == 3
+
+        assert "error" in sheets.query_subscribers(cursor="not-a-cursor")
+    finally:
+        sheets.CACHE.clear()
+
+
+if __name__ == "__main__":
+    test_pages_cover_every_order_once_in_order()
+    test_filters()
+    test_pages_follow_writes()
+    test_subscribers_and_bad_cursor()
+    print("Admin pagination tests passed")
@@ -0,0 +1,90 @@
+"""
+Tests for the incrementally maintained admin dashboard aggregate.
+"""
+import time
+
+import fake_sheets
+import sheets
+
+
+def recompute(orders, users):
+    """The dashboard figures computed the slow way, straight off the rows"""
+    delivered = [o for o in orders if str(o.get('Tracking_Stage', '')).strip().lower() == 'delivered']
+    return {
+        "revenue": sum(int(''.join(filter(str.isdigit, str(o.get('Total_Amount', 0)))) or 0) for o in delivered),
+        "orders_count": len(orders),
+        "completed_orders": len(delivered),
+        "customers_count": len(users),
+        "recent_orders": orders[-5:]
+    }
+
+
+def assert_stats_match(client, users):
+    stats = sheets.get_admin_stats()
+    expected = recompute(client.spreadsheet._worksheets["Orders"].records(), users)
+    for key, value in expected.items():
+        assert stats[key] == value, (key, stats[key], value)
+    return stats
+
+
+def test_stats_follow_order_writes_without_refetching(sheets_api):
+    client = sheets_api({"Orders": (sheets.ORDERS_HEADERS, [
+        ["ORD-1", "ana@example.com", "", "[]", "₹ 1,200", "Completed", "", "2024-01-01 10:00:00", "Delivered"],
+        ["ORD-2", "ben@example.com", "", "[]", 800, "Pending", "", "2024-01-02 10:00:00", "Order Placed"],
+        ["ORD-3", "ben@example.com", "", "[]", 500, "Cancelled", "", "2024-01-03 10:00:00", "Cancelled"],
+    ])})
+    users = [{"Email": "ana@example.com"}, {"Email": "ben@example.com"}]
+    sheets.CACHE["Users"] = {'data': users, 'timestamp': time.time(), 'version': 0, 'indexes': {}}
+    stats = assert_stats_match(client, users)
+    assert stats["revenue"] == 1200 and stats["stage_counts"] == {"delivered": 1, "order placed": 1, "cancelled": 1}
+
+    order_id = sheets.create_order({"email": "ana@example.com", "items": [], "total_amount": 300})["order_id"]
+    sheets.update_order_status("ORD-2", "Delivered")
+    sheets.update_order_status(order_id, "Delivered")
+    sheets.update_order_status("ORD-1", "Cancelled")
+
+    stats = assert_stats_match(client, users)
+    assert stats["revenue"] == 1100 and stats["completed_orders"] == 2
+    assert stats["conversion_rate"] == 200.0
+    assert client.reads() == 1, "writes should not force a rebuild"
+
+
+def test_stats_rebuilt_when_orders_reload(sheets_api):
+    client = sheets_api({"Orders": (sheets.ORDERS_HEADERS, [
+        ["ORD-1", "ana@example.com", "", "[]", 1200, "Completed", "", "2024-01-01 10:00:00", "Delivered"],
+    ])})
+    sheets.CACHE["Users"] = {'data': [], 'timestamp': time.time(), 'version': 0, 'indexes': {}}
+    assert sheets.get_admin_stats()["revenue"] == 1200
+    # Someone edits the sheet by hand; the next reload starts a fresh aggregate
+    client.spreadsheet._worksheets["Orders"].append_row(
+        ["ORD-2", "ben@example.com", "", "[]", 50, "Completed", "", "2024-01-02 10:00:00", "Delivered"])
+    sheets.invalidate_cache("Orders")
+    stats = assert_stats_match(client, [])
+    assert stats["revenue"] == 1250 and stats["conversion_rate"] == 0
+
+
+def test_stats_and_recent_orders_come_from_the_same_rows(sheets_api):
+    def order(n):
+        return [f"ORD-{n}", "ana@example.com", "", "[]", 100, "Pending", "", "2024-01-01 10:00:00", "Order Placed"]
+    client = sheets_api({"Orders": (sheets.ORDERS_HEADERS, [order(n) for n in range(1, 51)])})
+    sheets.CACHE["Users"] = {'data': [], 'timestamp': time.time(), 'version': 0, 'indexes': {}}
+    sheets.get_admin_stats()
+
+    # A full reload swaps in a new entry, without the aggregate
+    client.spreadsheet._worksheets["Orders"].append_row(order(51))
+    sheets.CACHE["Orders"]["reconciled_at"] = 0
+    sheets.refresh_sheet("Orders", 0)
+    entry = sheets.CACHE["Orders"]
+    assert "stats" not in entry["indexes"]
+
+    stats = sheets.get_admin_stats()
+    assert stats["orders_count"] == 51 and stats["recent_orders"][-1]["Order_ID"] == "ORD-51"
+    # Built on the entry the recent orders were read from
+    assert entry["indexes"]["stats"].orders_count == 51
+
+if __name__ == "__main__":
+    for test in (test_stats_follow_order_writes_without_refetching, test_stats_rebuilt_when_orders_reload,
+                 test_stats_and_recent_orders_come_from_the_same_rows):
+        with fake_sheets.installed() as install:
+            test(install)
+    print("Admin stats tests passed")
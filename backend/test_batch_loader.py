@@ -0,0 +1,94 @@
+"""
+Tests for multi-sheet batch reads (values:batchGet) behind get_sheets_data and the cold paths using it.
+"""
+import threading
+
+import fake_sheets
+import sheets
+
+FIXTURE = dict(products=20, users=30, orders=50, wishlist=40)
+
+
+def test_batch_records_match_get_all_records():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        names = ["Master", "Users", "Orders", "User_Wishlist", "Subscribers"]
+        expected = {name: client.spreadsheet._worksheets[name].get_all_records() for name in names}
+        client.reset_stats()
+
+        assert sheets.get_sheets_data(names) == expected
+        assert client.calls["values_batch_get"] == 1
+        assert client.calls["get_all_records"] == 0
+
+        # Now cached: no further reads
+        assert sheets.get_sheets_data(names) == expected
+        assert client.calls["values_batch_get"] == 1
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_missing_sheet_falls_back_to_single_reads():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        data = sheets.get_sheets_data(["Users", "No_Such_Sheet"])
+        assert len(data["Users"]) == 30 and data["No_Such_Sheet"] == []
+        assert client.calls["values_batch_get"] == 1
+        assert "No_Such_Sheet" in sheets.CACHE
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_failed_batch_serves_cache_or_empty():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        client.fail_next(1)
+        assert sheets.get_sheets_data(["Users", "Orders"], silent=True) == {"Users": [], "Orders": []}
+        assert "Users" not in sheets.CACHE
+        # The next call tries again
+        assert len(sheets.get_sheets_data(["Users", "Orders"])["Orders"]) == 50
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_concurrent_readers_join_the_batch():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE), latency=0.1)
+    try:
+        results = {}
+        batch = threading.Thread(target=lambda: results.update(batch=sheets.get_sheets_data(["Master", "Users"])))
+        batch.start()
+        threading.Event().wait(0.03)
+        single = threading.Thread(target=lambda: results.update(single=sheets.get_sheet_data("Users")))
+        single.start()
+        batch.join()
+        single.join()
+
+        assert results["single"] is results["batch"]["Users"]
+        assert client.calls["values_batch_get"] == 1
+        assert client.calls["get_all_records"] == 0
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_dashboard_and_cart_cold_paths_take_one_read():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        stats = sheets.get_admin_stats()
+        assert stats["orders_count"] == 50 and stats["customers_count"] == 30
+        assert client.calls["values_batch_get"] == 1
+
+        email = client.spreadsheet._worksheets["User_Wishlist"].rows[1][0]
+        sheets.get_user_cart(email)
+        sheets.get_catalog()
+        assert client.calls["values_batch_get"] == 2
+        assert client.calls["get_all_records"] == 0
+    finally:
+        fake_sheets.uninstall()
+
+
+if __name__ == "__main__":
+    test_batch_records_match_get_all_records()
+    test_missing_sheet_falls_back_to_single_reads()
+    test_failed_batch_serves_cache_or_empty()
+    test_concurrent_readers_join_the_batch()
+    test_dashboard_and_cart_cold_paths_take_one_read()
+    print("Batch loader tests passed")
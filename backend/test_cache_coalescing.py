@@ -0,0 +1,100 @@
+"""
+Concurrency tests for cache fills in sheets.py.
+
+Fires 100 simultaneous cold requests at a slow fake spreadsheet and checks that only
+one of them actually reaches the backend, and that stale entries are served
+without waiting while they refresh in the background.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fake_sheets
+import sheets
+
+CONCURRENT_REQUESTS = 100
+# Seconds per API call: slow enough for every caller to pile up
+DELAY = 0.2
+
+
+def fire_concurrently(func):
+    """Call func from CONCURRENT_REQUESTS threads released at the same instant"""
+    barrier = threading.Barrier(CONCURRENT_REQUESTS)
+
+    def call():
+        barrier.wait()
+        return func()
+
+    with ThreadPoolExecutor(max_workers=CONCURRENT_REQUESTS) as pool:
+        futures = [pool.submit(call) for _ in range(CONCURRENT_REQUESTS)]
+        return [f.result() for f in futures]
+
+
+def test_cold_sheet_misses_share_one_fetch(sheets_api):
+    client = sheets_api({"Users": (["Email"], [[f"user{i}@example.com"] for i in range(10)])}, latency=DELAY)
+    results = fire_concurrently(lambda: sheets.get_sheet_data("Users"))
+
+    assert client.reads() == 1, f"expected 1 backend fetch, got {client.reads()}"
+    assert all(len(r) == 10 for r in results)
+
+
+def test_cold_categories_share_one_fetch(sheets_api):
+    client = sheets_api({"Master": (["Product Name", "Category"], [
+        [f"Product {i}", f"Category {i % 3}"] for i in range(30)
+    ])}, latency=DELAY)
+    results = fire_concurrently(sheets.get_categories)
+
+    assert client.reads() == 1, f"expected 1 backend fetch, got {client.reads()}"
+    assert all(len(r) == 3 for r in results)
+
+
+def test_invalidation_starts_a_new_fetch(sheets_api):
+    client = sheets_api({"Users": (["Email"], [["a@example.com"]])})
+    # Open the worksheet first so the fetch below is a single slow read
+    sheets.get_worksheet("Users")
+    client.latency = 0.3
+
+    first = threading.Thread(target=sheets.get_sheet_data, args=("Users",))
+    first.start()
+    time.sleep(0.05)
+    # A write lands while the first fetch is still running
+    client.spreadsheet._worksheets["Users"].rows.append(["b@example.com"])
+    sheets.invalidate_cache("Users")
+    after_write = sheets.get_sheet_data("Users")
+    first.join()
+
+    assert client.calls["get_all_records"] == 2
+    assert len(after_write) == 2
+
+
+def test_stale_entry_served_while_refreshing(sheets_api):
+    client = sheets_api({"Master": (["Product Name"], [["New"]])})
+    sheets.get_worksheet("Master")
+    client.latency = 0.3
+    policy = sheets.get_cache_policy("Master")
+    sheets.CACHE["Master"] = {
+        'data': [{"Product Name": "Old"}],
+        'timestamp': time.time() - policy['ttl'] - 1,
+        'version': 0,
+        'indexes': {}
+    }
+    start = time.time()
+    results = fire_concurrently(lambda: sheets.get_sheet_data("Master"))
+    elapsed = time.time() - start
+
+    assert elapsed < client.latency, "stale reads waited for the refresh"
+    assert all(r[0]["Product Name"] == "Old" for r in results)
+    # The background refresh lands shortly after
+    deadline = time.time() + 5
+    while sheets.CACHE["Master"]["data"][0]["Product Name"] == "Old" and time.time() < deadline:
+        time.sleep(0.05)
+    assert sheets.get_sheet_data("Master")[0]["Product Name"] == "New"
+    assert client.calls["get_all_records"] == 1
+
+
+if __name__ == "__main__":
+    for test in (test_cold_sheet_misses_share_one_fetch, test_cold_categories_share_one_fetch,
+                 test_invalidation_starts_a_new_fetch, test_stale_entry_served_while_refreshing):
+        with fake_sheets.installed() as install:
+            test(install)
+    print("Cache concurrency tests passed")
@@ -0,0 +1,171 @@
+"""
+Tests for the warm-start cache snapshot: cached sheets saved to disk and loaded back at startup.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+
+import httpx
+
+import fake_sheets
+import main
+import sheets
+
+FIXTURE = dict(products=20, users=30, orders=50, wishlist=40)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def disable_snapshots():
+    """Undo load_snapshot(): stop saving and drop any save still waiting to run"""
+    with sheets._snapshot_lock:
+        if sheets._snapshot_timer is not None:
+            sheets._snapshot_timer.cancel()
+            sheets._snapshot_timer = None
+    sheets._snapshot_path = None
+
+
+def timed_get(path):
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            response = await client.get(path)
+            return response, time.perf_counter() - start
+    return asyncio.run(run())
+
+
+def test_restart_serves_snapshot_then_revalidates():
+    path = os.path.join(tempfile.mkdtemp(), "cache.json")
+    fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        products = sheets.get_products()
+        sheets.get_user_by_email("user3@example.com")
+        assert sheets.save_snapshot(path) == 2
+        assert os.stat(path).st_mode & 0o777 == 0o600
+
+        # "Restart": empty cache, and a slow Sheets API whose data has since changed
+        fixture = fake_sheets.make_fixture(**FIXTURE)
+        fixture["Users"][1][3][3] = "Renamed User"
+        client = fake_sheets.install(fixture, latency=0.2)
+        assert sorted(sheets.load_snapshot(path)) == ["Master", "Users"]
+        # Only records are stored; the indexes are rebuilt from them
+        assert {"email", "username"} <= set(sheets.CACHE["Users"]["indexes"])
+
+        response, elapsed = timed_get("/api/products")
+        assert response.status_code == 200 and elapsed < 0.2
+        assert [p["id"] for p in response.json()] == [p["id"] for p in products]
+        assert sheets.get_user_by_email("user3@example.com")["full_name"] == "User 3"
+
+        # The background revalidation replaces the snapshot data with what Sheets has now,
+        # both sheets in one batch read
+        wait_for(lambda: sheets.get_user_by_email("user3@example.com")["full_name"] == "Renamed User")
+        assert client.calls["values_batch_get"] == 1
+        assert client.calls["get_all_records"] == 0
+    finally:
+        disable_snapshots()
+        fake_sheets.uninstall()
+
+
+def test_unusable_snapshots_are_ignored():
+    path = os.path.join(tempfile.mkdtemp(), "cache.json")
+    fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        sheets.get_products()
+        sheets.save_snapshot(path)
+        with open(path) as f:
+            payload = json.load(f)
+
+        for broken in [{**payload, "sheet_id": "another-spreadsheet"},
+                       {**payload, "saved_at": time.time() - sheets.SNAPSHOT_MAX_AGE - 1},
+                       {**payload, "format": 0}]:
+            with open(path, "w") as f:
+                json.dump(broken, f)
+            sheets.CACHE.clear()
+            assert sheets.load_snapshot(path) == []
+
+        for garbage in ("not json", "[1, 2]"):
+            with open(path, "w") as f:
+                f.write(garbage)
+            assert sheets.load_snapshot(path) == []
+        assert sheets.load_snapshot(path + ".missing") == []
+        assert sheets.CACHE == {}
+    finally:
+        disable_snapshots()
+        fake_sheets.uninstall()
+
+
+def test_refreshes_and_shutdown_save_the_snapshot():
+    path = os.path.join(tempfile.mkdtemp(), "cache.json")
+    original_path = sheets.SNAPSHOT_PATH
+    sheets.SNAPSHOT_PATH = path
+    fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        async def lifespan():
+            async with main.app.router.lifespan_context(main.app):
+                # Startup enabled saving; a refresh schedules a save
+                sheets._last_snapshot = 0.0
+                await asyncio.to_thread(sheets.get_sheet_data, "Brands")
+                await asyncio.to_thread(wait_for, lambda: os.path.exists(path))
+                await asyncio.to_thread(sheets.get_sheet_data, "Users")
+                await asyncio.to_thread(sheets.create_user, "new@example.com", "hash")
+                await asyncio.to_thread(wait_for, lambda: main.readiness["ready"])
+        asyncio.run(lifespan())
+
+        # Shutdown saved the write made after the last refresh too
+        with open(path) as f:
+            saved = json.load(f)["sheets"]
+        assert "Brands" in saved
+        assert any(row[0] == "new@example.com" for row in saved["Users"]["rows"])
+    finally:
+        sheets.SNAPSHOT_PATH = original_path
+        disable_snapshots()
+        fake_sheets.uninstall()
+
+
+def test_concurrent_saves_leave_one_whole_snapshot():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "cache.json")
+    fake_sheets.install(fake_sheets.make_fixture(**dict(FIXTURE, users=2000)))
+    try:
+        sheets.get_products()
+        sheets.get_user_by_email("user3@example.com")
+        errors = []
+
+        def save():
+            try:
+                sheets.save_snapshot(path)
+            except Exception as e:
+                errors.append(e)
+
+        # Like the refresh timer and shutdown saving at the same moment
+        savers = [threading.Thread(target=save) for _ in range(4)]
+        for saver in savers:
+            saver.start()
+        for saver in savers:
+            saver.join()
+
+        assert errors == []
+        assert os.listdir(directory) == ["cache.json"]
+        assert os.stat(path).st_mode & 0o777 == 0o600
+        sheets.CACHE.clear()
+        assert sorted(sheets.load_snapshot(path)) == ["Master", "Users"]
+    finally:
+        disable_snapshots()
+        fake_sheets.uninstall()
+
+
+if __name__ == "__main__":
+    test_restart_serves_snapshot_then_revalidates()
+    test_unusable_snapshots_are_ignored()
+    test_refreshes_and_shutdown_save_the_snapshot()
+    test_concurrent_saves_leave_one_whole_snapshot()
+    print("Cache snapshot tests passed")
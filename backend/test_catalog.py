@@ -0,0 +1,58 @@
+"""
+Tests for the catalog snapshot built from the Master sheet.
+"""
+import time
+
+import sheets
+
+MASTER_ROWS = [
+    {"Product Name": "Almond", "Category": "Nuts ", "Header Product Name": "Almonds", "Price_250g": "₹ 1,200", "100g": 500},
+    {"Product Name": "Cashew", "Category": "Nuts", "Header Product Name": "Cashews", "Price_250g": "", "100g": "450"},
+    {"Product Name": "Almond", "Category": "Nuts", "Header Product Name": "Duplicate", "Price_250g": 999},
+    {"Product Name": "Fig", "Category": "Dried Fruits", "Image": "/fig.png", "1kg": "2,000"},
+    {"Product Name": "Loose", "Category": ""},
+]
+
+
+def test_build_catalog_normalizes_products_and_categories():
+    catalog = sheets.build_catalog(MASTER_ROWS, version=7)
+
+    assert catalog.version == 7
+    assert len(catalog.products) == 5
+
+    almond = catalog.products_by_id["Almond"]
+    assert almond["displayName"] == "Almonds"
+    assert almond["price"] == 1200 and almond["prices"]["100g"] == 500
+
+    cashew = catalog.products_by_id["Cashew"]
+    assert cashew["price"] == 450  # falls back to 100g when 250g is blank
+
+    fig = catalog.products_by_id["Fig"]
+    assert fig["prices"]["1kg"] == 2000 and fig["prices"]["1000g"] == 2000
+    assert fig["image"] == "/fig.png" and almond["image"] == "/logo-clean.png"
+
+    assert [c["name"] for c in catalog.categories] == ["Nuts", "Dried Fruits"]
+    assert catalog.categories[0]["id"] == "nuts"
+    assert catalog.categories[0]["subcategories"] == ["Almond", "Cashew"]
+    assert [p["displayName"] for p in catalog.products_by_category["Nuts"]] == ["Almonds", "Cashews", "Duplicate"]
+
+
+def test_catalog_rebuilt_only_when_master_changes():
+    sheets.CACHE["Master"] = {'data': MASTER_ROWS, 'timestamp': time.time(), 'version': 1, 'indexes': {}}
+    try:
+        first = sheets.get_catalog()
+        assert sheets.get_catalog() is first
+        assert sheets.get_products() is first.products
+
+        sheets._cache_update("Master", lambda r: r.get("Product Name") == "Fig", {"Special_Offer": "true"})
+        second = sheets.get_catalog()
+        assert second is not first
+        assert second.version == sheets.CACHE["Master"]['version']
+    finally:
+        sheets.CACHE.clear()
+
+
+if __name__ == "__main__":
+    test_build_catalog_normalizes_products_and_categories()
+    test_catalog_rebuilt_only_when_master_changes()
+    print("Catalog snapshot tests passed")
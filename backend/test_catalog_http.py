@@ -0,0 +1,116 @@
+"""
+Tests for conditional GET on the catalog endpoints (/api/products, /api/categories, /api/brands).
+"""
+import asyncio
+import gzip
+import json
+import time
+
+import brotli
+import httpx
+
+import main
+import sheets
+
+MASTER_ROWS = [
+    {"Product Name": "Almond", "Category": "Nuts", "Price_250g": 300},
+    {"Product Name": "Fig", "Category": "Dried Fruits", "Price_250g": 450},
+]
+
+
+def use_cached_sheets():
+    sheets.CACHE.clear()
+    cache_rows("Master", MASTER_ROWS)
+    cache_rows("Brands", [{"name": "Nutraj"}])
+
+
+def cache_rows(sheet_name, rows):
+    # Fresh version so catalog snapshots/payloads from earlier tests are never reused
+    sheets.CACHE[sheet_name] = {
+        'data': list(rows),
+        'timestamp': time.time(),
+        'version': next(sheets._version_counter),
+        'indexes': {}
+    }
+
+
+def get_all(requests):
+    """Issue GETs in order against the in-process app; requests are (path, headers) pairs"""
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get(path, headers=headers) for path, headers in requests]
+    return asyncio.run(run())
+
+
+def test_catalog_endpoints_send_etag_and_honor_if_none_match():
+    use_cached_sheets()
+    try:
+        for path in ["/api/products", "/api/categories", "/api/brands"]:
+            first, = get_all([(path, {})])
+            assert first.status_code == 200
+            assert first.headers["etag"].startswith('"')
+            assert "stale-while-revalidate" in first.headers["cache-control"]
+
+            etag = first.headers["etag"]
+            repeat, weak, other = get_all([
+                (path, {"If-None-Match": etag}),
+                (path, {"If-None-Match": f'"stale", W/{etag}'}),
+                (path, {"If-None-Match": '"stale"'}),
+            ])
+            assert repeat.status_code == 304 and repeat.content == b""
+            assert repeat.headers["etag"] == etag
+            assert weak.status_code == 304
+            assert other.status_code == 200 and other.json() == first.json()
+    finally:
+        sheets.CACHE.clear()
+
+
+def test_etag_changes_when_master_changes():
+    use_cached_sheets()
+    try:
+        before, = get_all([("/api/products", {})])
+        sheets._cache_update("Master", lambda r: r["Product Name"] == "Fig", {"Price_250g": 500})
+        after, = get_all([("/api/products", {"If-None-Match": before.headers["etag"]})])
+        assert after.status_code == 200
+        assert after.headers["etag"] != before.headers["etag"]
+        assert [p["price"] for p in after.json()] == [300, 500]
+    finally:
+        sheets.CACHE.clear()
+
+
+def test_compressed_variants_follow_accept_encoding():
+    # Enough products to cross the compression threshold
+    cache_rows("Master", [{"Product Name": f"Almond Grade {i}", "Category": "Nuts"} for i in range(50)])
+    try:
+        plain, gz, br, refused = get_all([
+            ("/api/products", {"Accept-Encoding": "identity"}),
+            ("/api/products", {"Accept-Encoding": "gzip"}),
+            ("/api/products", {"Accept-Encoding": "gzip, deflate, br"}),
+            ("/api/products", {"Accept-Encoding": "br;q=0, gzip;q=0"}),
+        ])
+        assert "content-encoding" not in plain.headers
+        assert "content-encoding" not in refused.headers
+        assert gz.headers["content-encoding"] == "gzip"
+        assert br.headers["content-encoding"] == "br"
+        assert all("Accept-Encoding" in r.headers["vary"] for r in (plain, gz, br))
+        assert len({plain.headers["etag"], gz.headers["etag"], br.headers["etag"]}) == 3
+
+        payload = main.http_cache.cached_payload("products", sheets.get_catalog().version)
+        assert json.loads(gzip.decompress(payload.gzip_body)) == plain.json()
+        assert json.loads(brotli.decompress(payload.br_body)) == plain.json()
+        assert len(payload.br_body) * 5 < len(payload.body)
+
+        # Revalidating with any variant's ETag is a 304
+        for etag in (plain.headers["etag"], gz.headers["etag"], br.headers["etag"]):
+            repeat, = get_all([("/api/products", {"Accept-Encoding": "br", "If-None-Match": etag})])
+            assert repeat.status_code == 304
+    finally:
+        sheets.CACHE.clear()
+
+
+if __name__ == "__main__":
+    test_catalog_endpoints_send_etag_and_honor_if_none_match()
+    test_etag_changes_when_master_changes()
+    test_compressed_variants_follow_accept_encoding()
+    print("Catalog HTTP cache tests passed")
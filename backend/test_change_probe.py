@@ -0,0 +1,97 @@
+"""
+Tests for the change probe run before refetching a cached sheet.
+"""
+import fake_sheets
+import sheets
+
+FIXTURE = dict(products=20, users=10, orders=10, wishlist=10)
+
+
+def test_quiet_sheet_costs_one_probe():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        sheets.get_products()
+        # The first refresh records the token along with a full read
+        sheets.refresh_sheet("Master", 0)
+        catalog = sheets.get_catalog()
+        client.reset_stats()
+
+        for _ in range(3):
+            sheets.refresh_sheet("Master", 0)
+        assert client.calls["get_lastUpdateTime"] == 3
+        assert client.calls["get_all_records"] == 0
+        # Same cache version, so the catalog isn't rebuilt
+        assert sheets.get_catalog() is catalog
+        assert sheets._get_fresh("Master") is not None
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_changed_sheet_is_refetched():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        sheets.refresh_sheet("Master", 0)
+        sheets.refresh_sheet("Master", 0)
+        client.spreadsheet._worksheets["Master"].update_cell(2, 3, "Renamed")
+        client.reset_stats()
+
+        data = sheets.refresh_sheet("Master", 0)
+        assert data[0]["Header Product Name"] == "Renamed"
+        assert client.calls["get_lastUpdateTime"] == 1 and client.calls["get_all_records"] == 1
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_batch_refresh_probes_once():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        sheets.get_sheets_data(["Master", "Users", "Brands"])
+        for _ in range(2):
+            for name in ("Master", "Users", "Brands"):
+                sheets.CACHE[name]["timestamp"] = 0
+            sheets.get_sheets_data(["Master", "Users", "Brands"])
+        # One full batch to record the tokens, then one probe and no read
+        assert client.calls["get_lastUpdateTime"] == 2
+        assert client.calls["values_batch_get"] == 2
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_custom_and_failing_probes():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    probed = []
+
+    def row_count_probe(sheet_names):
+        probed.extend(sheet_names)
+        return {name: len(client.spreadsheet._worksheets[name].rows) for name in sheet_names}
+
+    def failing_probe(sheet_names):
+        raise RuntimeError("drive unavailable")
+
+    try:
+        sheets.use_change_probe(row_count_probe)
+        sheets.refresh_sheet("Users", 0)
+        sheets.refresh_sheet("Users", 0)
+        # Incremental sheets are never probed: their tail read is as cheap
+        sheets.refresh_sheet("Orders", 0)
+        sheets.refresh_sheet("Orders", 0)
+        assert probed == ["Users"]
+        # Users: cold read, then a read that records the token; Orders: one full read
+        assert client.calls["get_all_records"] == 3
+
+        sheets.use_change_probe(failing_probe)
+        sheets.refresh_sheet("Users", 0)
+        sheets.use_change_probe(None)
+        sheets.refresh_sheet("Users", 0)
+        assert client.calls["get_all_records"] == 5
+    finally:
+        sheets.use_change_probe(sheets.spreadsheet_modified_time)
+        fake_sheets.uninstall()
+
+
+if __name__ == "__main__":
+    test_quiet_sheet_costs_one_probe()
+    test_changed_sheet_is_refetched()
+    test_batch_refresh_probes_once()
+    test_custom_and_failing_probes()
+    print("Change probe tests passed")
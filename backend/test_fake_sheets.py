@@ -0,0 +1,105 @@
+"""
+Tests for the in-process fake Google Sheets API (fake_sheets.py), and the app running on top of it.
+"""
+import asyncio
+import time
+
+import gspread
+import httpx
+
+import fake_sheets
+import main
+import sheets
+
+
+def get(path, **params):
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, params=params)
+    return asyncio.run(run())
+
+
+def test_app_runs_on_fake_sheets():
+    client = fake_sheets.install(fake_sheets.make_fixture(products=30, users=50, orders=200, wishlist=100))
+    try:
+        r = get("/api/products")
+        assert r.status_code == 200
+        assert len(r.json()) == 30
+
+        order_id = client.spreadsheet._worksheets["Orders"].rows[5][0]
+        assert sheets.get_order_by_id(order_id)["Order_ID"] == order_id
+        assert sheets.get_user_by_email("user7@example.com")["username"] == "user7"
+
+        # Writes land in the fake and in the write-through cache
+        created = sheets.create_order({"email": "new@example.com", "items": [], "total_amount": 10})
+        assert sheets.update_order_status(created["order_id"], "Shipped")["success"]
+        row = client.spreadsheet._worksheets["Orders"].find(created["order_id"]).row
+        assert client.spreadsheet._worksheets["Orders"].row_values(row)[8] == "Shipped"
+        assert sheets.get_order_by_id(created["order_id"])["Tracking_Stage"] == "Shipped"
+        assert client.calls["get_all_records"] >= 2
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_worksheet_calls():
+    client = fake_sheets.FakeClient({"Users": (["Email", "Name"], [["a@x.com", "A"], ["b@x.com", 7]])})
+    sheet = client.open_by_key(sheets.SHEET_ID).worksheet("Users")
+    assert sheet.get_all_records() == [{"Email": "a@x.com", "Name": "A"}, {"Email": "b@x.com", "Name": 7}]
+    assert sheet.row_values(1) == ["Email", "Name"]
+    assert sheet.find("b@x.com").row == 3
+    assert sheet.find("B@X.COM") is None
+    assert sheet.find("B@X.COM", case_sensitive=False).row == 3
+
+    sheet.append_row(["c@x.com", True])
+    sheet.update_cell(2, 2, "Ann")
+    sheet.batch_update([{"range": "A3:B3", "values": [["bee@x.com", "Bee"]]}])
+    sheet.delete_rows(4)
+    assert sheet.get_all_values() == [["Email", "Name"], ["a@x.com", "Ann"], ["bee@x.com", "Bee"]]
+
+    batch = client.spreadsheet.values_batch_get(["Users", "Users!A2:A"])
+    assert batch["valueRanges"][0]["values"][0] == ["Email", "Name"]
+    assert batch["valueRanges"][1]["values"] == [["a@x.com"], ["bee@x.com"]]
+
+    try:
+        client.spreadsheet.worksheet("Nope")
+        assert False, "expected WorksheetNotFound"
+    except gspread.exceptions.WorksheetNotFound:
+        pass
+
+
+def test_latency_quota_and_errors():
+    client = fake_sheets.FakeClient({"Users": (["Email"], [])}, latency=0.02, quota=3, seed=1)
+    spreadsheet = client.open_by_key(sheets.SHEET_ID)
+    start = time.perf_counter()
+    spreadsheet.worksheet("Users").get_all_records()
+    assert time.perf_counter() - start >= 0.04
+    try:
+        spreadsheet.get_lastUpdateTime()
+        assert False, "expected a 429"
+    except gspread.exceptions.APIError as e:
+        assert e.response.status_code == 429
+    assert client.throttled == 1
+
+    client = fake_sheets.FakeClient({"Users": (["Email"], [])})
+    client.fail_next(1, code=503, status="UNAVAILABLE")
+    try:
+        client.open_by_key(sheets.SHEET_ID)
+        assert False, "expected an injected failure"
+    except gspread.exceptions.APIError as e:
+        assert e.response.status_code == 503
+    assert client.open_by_key(sheets.SHEET_ID).worksheet("Users").get_all_records() == []
+
+    client = fake_sheets.FakeClient({}, error_rate=1.0)
+    try:
+        client.open_by_key(sheets.SHEET_ID)
+        assert False, "expected an injected failure"
+    except gspread.exceptions.APIError as e:
+        assert e.response.status_code == 500
+
+
+if __name__ == "__main__":
+    test_app_runs_on_fake_sheets()
+    test_worksheet_calls()
+    test_latency_quota_and_errors()
+    print("Fake Sheets tests passed")
@@ -0,0 +1,53 @@
+"""
+Smoke test for the load-test harness (loadtest.py): a very short run must produce a
+complete report, and the baseline comparison must flag slower endpoints.
+"""
+import copy
+import json
+import os
+import tempfile
+
+import loadtest
+
+
+def test_short_run_writes_report():
+    output = os.path.join(tempfile.mkdtemp(), "report.json")
+    code = loadtest.main_cli([
+        "--scenario", "browse", "--scenario", "cart", "--scenario", "checkout", "--scenario", "admin",
+        "--duration", "0.3", "--concurrency", "3", "--users", "20", "--orders", "120", "--products", "12",
+        "--output", output,
+    ])
+    assert code == 0
+    with open(output) as f:
+        report = json.load(f)
+
+    assert set(report["scenarios"]) == {"browse", "cart", "checkout", "admin"}
+    # Clients churn their own users' lists, so every delete finds its row
+    assert report["scenarios"]["cart"]["error_rate"] == 0
+    checkout = report["scenarios"]["checkout"]
+    assert checkout["iterations"] > 0
+    assert checkout["error_rate"] == 0
+    assert set(checkout["endpoints"]) == {
+        "GET /api/user/cart", "POST /api/orders", "GET /api/orders/{id}", "GET /api/user/orders"
+    }
+    for stats in checkout["endpoints"].values():
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+
+
+def test_compare_flags_regressions():
+    report = {"scenarios": {"browse": {"endpoints": {
+        "GET /api/products": {"p95_ms": 10.0, "error_rate": 0.0},
+        "GET /api/brands": {"p95_ms": 10.0, "error_rate": 0.0},
+    }}}}
+    baseline = copy.deepcopy(report)
+    assert loadtest.compare(report, baseline) == []
+
+    report["scenarios"]["browse"]["endpoints"]["GET /api/products"]["p95_ms"] = 20.0
+    report["scenarios"]["browse"]["endpoints"]["GET /api/brands"]["error_rate"] = 0.1
+    assert loadtest.compare(report, baseline) == ["browse GET /api/products", "browse GET /api/brands"]
+
+
+if __name__ == "__main__":
+    test_short_run_writes_report()
+    test_compare_flags_regressions()
+    print("Load test harness tests passed")
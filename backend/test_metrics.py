@@ -0,0 +1,123 @@
+"""
+Tests for the metrics endpoint (/api/admin/metrics) and the instrumentation behind it.
+"""
+import asyncio
+import smtplib
+from email.mime.text import MIMEText
+
+import httpx
+
+import auth
+import email_service
+import fake_sheets
+import main
+import metrics
+
+
+def admin_headers():
+    return {"Authorization": f"Bearer {auth.generate_jwt_token(main.ADMIN_IDENTIFIER, 'admin')}"}
+
+
+def get_all(requests):
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get(path, **kwargs) for path, kwargs in requests]
+    return asyncio.run(run())
+
+
+def sample(metric, **labels):
+    """Value (counters) or count (histograms) of the sample with these labels, 0 if none"""
+    for sample_labels, *values in metric.samples():
+        if all(sample_labels.get(k) == v for k, v in labels.items()):
+            return values[0]
+    return 0
+
+
+def test_requests_sheets_calls_and_cache_are_counted():
+    client = fake_sheets.install(fake_sheets.make_fixture(products=10, users=5, orders=20, wishlist=0))
+    metrics.reset()
+    try:
+        order_id = client.spreadsheet._worksheets["Orders"].rows[3][0]
+        responses = get_all([
+            ("/api/products", {}),
+            ("/api/products", {}),
+            (f"/api/orders/{order_id}", {}),
+            ("/api/orders/ORD-NOPE", {}),
+            ("/no/such/path", {}),
+        ])
+        assert [r.status_code for r in responses] == [200, 200, 200, 404, 404]
+
+        assert sample(metrics.HTTP_REQUESTS, route="/api/products", method="GET", status="200") == 2
+        assert sample(metrics.HTTP_REQUESTS, route="/api/orders/{order_id}", status="200") == 1
+        assert sample(metrics.HTTP_REQUESTS, route="/api/orders/{order_id}", status="404") == 1
+        assert sample(metrics.HTTP_REQUESTS, route="unmatched") == 1
+
+        # One fetch per sheet (the unknown order doesn't refetch a copy that was just read)
+        assert sample(metrics.SHEETS_CALLS, worksheet="Master", operation="get_all_records") == 1
+        assert sample(metrics.SHEETS_CALLS, worksheet="Orders", operation="get_all_records") == 1
+        assert sample(metrics.SHEETS_CALLS, worksheet="(spreadsheet)", operation="open_by_key") == 1
+        assert sample(metrics.CACHE_REQUESTS, sheet="Master", result="miss") == 1
+        assert sample(metrics.CACHE_REQUESTS, sheet="Master", result="hit") >= 1
+        assert 0 < metrics.cache_hit_ratios()["Master"] < 1
+
+        client.fail_next(1)
+        main.sheets.forget_worksheet("Users")
+        main.sheets.get_sheet_data("Users", silent=True)
+        assert sample(metrics.SHEETS_ERRORS, worksheet="(spreadsheet)", operation="worksheet", error="APIError") == 1
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_metrics_endpoint_formats_and_auth():
+    metrics.reset()
+    metrics.SHEETS_CALLS.observe(0.2, worksheet='Odd "name"', operation="find")
+    user_token = {"Authorization": f"Bearer {auth.generate_jwt_token('user@example.com')}"}
+    no_auth, not_admin, text, as_json, bad_format = get_all([
+        ("/api/admin/metrics", {}),
+        ("/api/admin/metrics", {"headers": user_token}),
+        ("/api/admin/metrics", {"headers": admin_headers()}),
+        ("/api/admin/metrics", {"headers": admin_headers(), "params": {"format": "json"}}),
+        ("/api/admin/metrics", {"headers": admin_headers(), "params": {"format": "xml"}}),
+    ])
+    assert (no_auth.status_code, not_admin.status_code, bad_format.status_code) == (401, 403, 422)
+
+    assert text.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = text.text
+    assert "# TYPE sheets_api_call_duration_seconds histogram" in body
+    assert 'sheets_api_call_duration_seconds_bucket{worksheet="Odd \\"name\\"",operation="find",le="0.25"} 1' in body
+    assert 'sheets_api_call_duration_seconds_bucket{worksheet="Odd \\"name\\"",operation="find",le="0.1"} 0' in body
+    assert 'sheets_api_call_duration_seconds_count{worksheet="Odd \\"name\\"",operation="find"} 1' in body
+
+    data = as_json.json()
+    [find] = data["sheets_api_call_duration_seconds"]
+    assert find["labels"] == {"worksheet": 'Odd "name"', "operation": "find"}
+    assert find["count"] == 1 and find["buckets"]["0.25"] == 1
+    assert "sheet_cache_hit_ratio" in data
+
+
+def test_smtp_sends_are_timed():
+    class FailingSMTP:
+        def __init__(self, *args):
+            raise smtplib.SMTPConnectError(421, "busy")
+
+    metrics.reset()
+    original = email_service.smtplib.SMTP
+    email_service.smtplib.SMTP = FailingSMTP
+    try:
+        try:
+            email_service._send_message(MIMEText("hi"), "welcome")
+            assert False, "expected the send to fail"
+        except smtplib.SMTPConnectError:
+            pass
+    finally:
+        email_service.smtplib.SMTP = original
+    assert sample(metrics.SMTP_SENDS, kind="welcome") == 1
+    assert sample(metrics.SMTP_ERRORS, kind="welcome", error="SMTPConnectError") == 1
+
+
+if __name__ == "__main__":
+    test_requests_sheets_calls_and_cache_are_counted()
+    test_metrics_endpoint_formats_and_auth()
+    test_smtp_sends_are_timed()
+    print("Metrics tests passed")
@@ -0,0 +1,30 @@
+"""
+Smoke test for the microbenchmark harness (microbench.py).
+"""
+import microbench
+import sheets
+
+
+def test_cases_run_and_leave_no_state():
+    for case in microbench.CASES:
+        result = microbench.measure(case, 200)
+        assert result["time_ms"] > 0
+        assert result["peak_kb"] >= 0
+    assert sheets.CACHE == {}
+
+
+def test_compare_applies_tolerances():
+    baseline = {"get_products": {"1000": {"time_ms": 10.0, "peak_kb": 1000.0}}}
+    assert microbench.compare({"get_products": {"1000": {"time_ms": 14.0, "peak_kb": 1200.0}}}, baseline) == []
+    assert microbench.compare({"get_products": {"1000": {"time_ms": 16.0, "peak_kb": 1300.0}}}, baseline) == [
+        "get_products@1000: time 10.000 -> 16.000 ms",
+        "get_products@1000: peak 1000.0 -> 1300.0 KB",
+    ]
+    # Sizes missing from the baseline are not compared
+    assert microbench.compare({"get_products": {"1000000": {"time_ms": 1e6, "peak_kb": 1e6}}}, baseline) == []
+
+
+if __name__ == "__main__":
+    test_cases_run_and_leave_no_state()
+    test_compare_applies_tolerances()
+    print("Microbenchmark harness tests passed")
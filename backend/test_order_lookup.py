@@ -0,0 +1,63 @@
+"""
+Tests for Order_ID lookups: the primary-key index and the negative cache for unknown IDs.
+"""
+import fake_sheets
+import sheets
+
+
+def order_row(order_id):
+    return [order_id, "ana@example.com", "", "[]", 500, "Pending", "WhatsApp/COD", "2024-01-01 10:00:00", "Order Placed"]
+
+
+def test_lookup_by_id_uses_index_and_follows_writes(sheets_api):
+    client = sheets_api({"Orders": (sheets.ORDERS_HEADERS, [order_row(f"ORD-{i}") for i in range(100)])})
+    assert sheets.get_order_by_id("ORD-42")["Order_ID"] == "ORD-42"
+    order_id = sheets.create_order({"email": "ben@example.com", "items": [], "total_amount": 1})["order_id"]
+    sheets.update_order_status("ORD-42", "Shipped")
+
+    assert sheets.get_order_by_id(order_id)["User_Email"] == "ben@example.com"
+    assert sheets.get_order_by_id("ORD-42")["Tracking_Stage"] == "Shipped"
+    assert client.reads() == 1
+
+
+def test_unknown_ids_are_negatively_cached(sheets_api):
+    client = sheets_api({"Orders": (sheets.ORDERS_HEADERS, [order_row("ORD-1")])})
+    interval = sheets.ORDER_MISS_REFETCH_INTERVAL
+    sheets.ORDER_MISS_REFETCH_INTERVAL = 0
+    try:
+        assert sheets.get_order_by_id("ORD-1") is not None
+        # First miss checks the sheet once in case another worker placed the order
+        assert sheets.get_order_by_id("ORD-GUESS") is None
+        assert client.reads() == 2
+        # Repeats are answered from the negative cache
+        for _ in range(50):
+            assert sheets.get_order_by_id("ORD-GUESS") is None
+        assert client.reads() == 2
+
+        # An order placed elsewhere is found on its first lookup
+        client.spreadsheet._worksheets["Orders"].append_row(order_row("ORD-2"))
+        assert sheets.get_order_by_id("ORD-2")["Order_ID"] == "ORD-2"
+        assert client.reads() == 3
+    finally:
+        sheets.ORDER_MISS_REFETCH_INTERVAL = interval
+
+
+def test_misses_refetch_at_most_once_per_interval(sheets_api):
+    client = sheets_api({"Orders": (sheets.ORDERS_HEADERS, [order_row("ORD-1")])})
+    size = sheets.MISSING_ORDER_CACHE_SIZE
+    sheets.MISSING_ORDER_CACHE_SIZE = 100
+    try:
+        for i in range(1000):
+            assert sheets.get_order_by_id(f"ORD-BOT-{i}") is None
+        assert client.reads() == 1, "a fresh cache should not be refetched for guessed IDs"
+        assert len(sheets._missing_orders) == 100
+    finally:
+        sheets.MISSING_ORDER_CACHE_SIZE = size
+
+
+if __name__ == "__main__":
+    for test in (test_lookup_by_id_uses_index_and_follows_writes, test_unknown_ids_are_negatively_cached,
+                 test_misses_refetch_at_most_once_per_interval):
+        with fake_sheets.installed() as install:
+            test(install)
+    print("Order lookup tests passed")
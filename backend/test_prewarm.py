@@ -0,0 +1,84 @@
+"""
+Tests for the startup prewarm (FastAPI lifespan) and the /api/ready readiness probe.
+"""
+import asyncio
+import time
+
+import httpx
+
+import fake_sheets
+import main
+import sheets
+
+
+async def get_ready(client):
+    response = await client.get("/api/ready")
+    return response.status_code, response.json()
+
+
+def run_lifespan(check):
+    """Start the app (lifespan included), run `check(client)` against it, then shut down"""
+    async def run():
+        async with main.app.router.lifespan_context(main.app):
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await check(client)
+    return asyncio.run(run())
+
+
+async def wait_until_ready(client, timeout=10.0):
+    deadline = time.time() + timeout
+    while True:
+        status, body = await get_ready(client)
+        if status == 200:
+            return body
+        assert time.time() < deadline, "never became ready"
+        await asyncio.sleep(0.02)
+
+
+def test_ready_once_sheets_catalog_and_indexes_are_warm():
+    client = fake_sheets.install(fake_sheets.make_fixture(products=20, users=30, orders=50, wishlist=40), latency=0.1)
+    original_path = sheets.SNAPSHOT_PATH
+    sheets.SNAPSHOT_PATH = "/nonexistent/cache.json"
+    try:
+        async def check(http):
+            assert await get_ready(http) == (503, {"ready": False})
+            start = time.perf_counter()
+            body = await wait_until_ready(http)
+            return body, time.perf_counter() - start
+
+        body, elapsed = run_lifespan(check)
+        assert body == {"ready": True, "degraded": []}
+        # One batch read for all five sheets, not a round trip each
+        assert elapsed < 0.8
+
+        for sheet_name in sheets.PREWARM_SHEETS:
+            entry = sheets.CACHE[sheet_name]
+            assert set(entry['indexes']) == set(sheets.INDEX_BUILDERS.get(sheet_name, {})), sheet_name
+        assert sheets._catalog.version == sheets.get_cache_version("Master")
+        assert client.calls["values_batch_get"] == 1
+        assert client.calls["get_all_records"] == 0
+    finally:
+        sheets.SNAPSHOT_PATH = original_path
+        sheets._snapshot_path = None
+        fake_sheets.uninstall()
+
+
+def test_ready_but_degraded_when_sheets_fail():
+    fake_sheets.install(fake_sheets.make_fixture(products=5, users=5, orders=5, wishlist=5), error_rate=1.0)
+    original_path, original_delay = sheets.SNAPSHOT_PATH, main.PREWARM_RETRY_DELAY
+    sheets.SNAPSHOT_PATH, main.PREWARM_RETRY_DELAY = "/nonexistent/cache.json", 0
+    try:
+        body = run_lifespan(wait_until_ready)
+        assert body["ready"] is True
+        assert sorted(body["degraded"]) == sorted(sheets.PREWARM_SHEETS)
+    finally:
+        sheets.SNAPSHOT_PATH, main.PREWARM_RETRY_DELAY = original_path, original_delay
+        sheets._snapshot_path = None
+        fake_sheets.uninstall()
+
+
+if __name__ == "__main__":
+    test_ready_once_sheets_catalog_and_indexes_are_warm()
+    test_ready_but_degraded_when_sheets_fail()
+    print("Prewarm tests passed")
@@ -0,0 +1,139 @@
+"""
+Tests for column-projected sheet reads: the narrow copy of Users behind sign-in.
+"""
+import asyncio
+
+import httpx
+
+import auth
+import fake_sheets
+import main
+import sheets
+
+FIXTURE = dict(products=5, users=50, orders=5, wishlist=5)
+
+
+def post(path, body):
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, json=body)
+    return asyncio.run(run())
+
+
+def test_cold_lookup_reads_only_projected_columns():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        assert sheets.get_credentials_by_email(" USER7@example.com") == {
+            "email": "user7@example.com", "username": "user7", "password_hash": "$2b$12$" + "x" * 53,
+            "full_name": "User 7", "profile_complete": "true"}
+        assert sheets.get_credentials_by_username("User8")["email"] == "user8@example.com"
+        assert sheets.get_credentials_by_email("nobody@example.com") is None
+
+        assert client.calls["values_batch_get"] == 1 and client.calls["get_all_records"] == 0
+        assert "Users" not in sheets.CACHE
+        records = sheets.CACHE[sheets.USER_CREDENTIALS]["data"]
+        assert len(records) == 50 and tuple(records[0]) == sheets.USER_CREDENTIAL_COLUMNS
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_cut_from_cached_users_and_kept_in_step_by_writes():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        sheets.get_sheet_data("Users")
+        assert sheets.get_credentials_by_email("user3@example.com")["username"] == "user3"
+        assert client.calls["values_batch_get"] == 0
+
+        sheets.create_user("new@example.com", "hash-1")
+        sheets.update_password_hash("new@example.com", "hash-2")
+        sheets.update_user_profile_auth("new@example.com", username="newbie", city="Pune")
+        sheets.update_session_token("new@example.com", "token")
+        assert sheets.get_credentials_by_username("newbie") == {
+            "email": "new@example.com", "username": "newbie", "password_hash": "hash-2",
+            "full_name": "", "profile_complete": "true"}
+
+        # Same as a fresh read of the sheet
+        projected = sheets.CACHE[sheets.USER_CREDENTIALS]["data"]
+        sheets.CACHE.clear()
+        assert sheets.get_sheet_data(sheets.USER_CREDENTIALS) == projected
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_moved_columns_fall_back_to_a_full_read_once():
+    fixture = fake_sheets.make_fixture(**FIXTURE)
+    headers, rows = fixture["Users"]
+    # Username and Password_Hash swapped
+    order = [0, 2, 1] + list(range(3, len(headers)))
+    fixture["Users"] = ([headers[i] for i in order], [[row[i] for i in order] for row in rows])
+    client = fake_sheets.install(fixture)
+    try:
+        assert sheets.get_credentials_by_email("user4@example.com")["username"] == "user4"
+        assert client.calls["get_all_records"] == 1
+
+        sheets.refresh_sheet(sheets.USER_CREDENTIALS, 0)
+        assert sheets.get_credentials_by_email("user4@example.com")["username"] == "user4"
+        # Placed by the headers learned from the full read
+        assert client.calls["get_all_records"] == 1 and client.calls["values_batch_get"] == 2
+    finally:
+        sheets._known_headers.clear()
+        fake_sheets.uninstall()
+
+
+def test_login_never_reads_full_users():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE, password_hash=auth.hash_password("Secret123")))
+    try:
+        assert post("/api/auth/login", {"identifier": "user5", "password": "wrong"}).status_code == 401
+        assert post("/api/auth/login", {"identifier": "nobody@example.com", "password": "x"}).status_code == 401
+
+        response = post("/api/auth/login", {"identifier": "user5@example.com", "password": "Secret123"})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["profile_complete"] is True
+        assert body["user"] == {"email": "user5@example.com", "username": "user5", "full_name": "User 5"}
+        assert "Users" not in sheets.CACHE
+        assert client.calls["values_batch_get"] == 1 and client.calls["get_all_records"] == 0
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_login_when_full_users_cache_is_behind():
+    password_hash = auth.hash_password("Secret123")
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE, password_hash=password_hash))
+    try:
+        sheets.get_sheet_data("Users")
+        # Still fresh as Users (ttl 300), but older than the projection's ttl
+        sheets.CACHE["Users"]["timestamp"] -= 120
+        # Signed up through another worker: the sheet and the projection have the user,
+        # this worker's full Users cache doesn't
+        client.spreadsheet._worksheets["Users"].append_row(
+            ["late@example.com", "late", password_hash, "Late Comer"] + [""] * 8 + ["true"])
+        sheets.CACHE.pop(sheets.USER_CREDENTIALS, None)
+        assert sheets.get_user_by_email("late@example.com") is None
+
+        response = post("/api/auth/login", {"identifier": "late", "password": "Secret123"})
+        assert response.status_code == 200
+        assert response.json()["user"]["full_name"] == "Late Comer"
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_prewarm_builds_projection_without_reads():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        assert sheets.prewarm(("Users",)) == []
+        assert set(sheets.CACHE[sheets.USER_CREDENTIALS]["indexes"]) == {"email", "username"}
+        assert client.calls["values_batch_get"] == 1
+    finally:
+        fake_sheets.uninstall()
+
+
+if __name__ == "__main__":
+    test_cold_lookup_reads_only_projected_columns()
+    test_cut_from_cached_users_and_kept_in_step_by_writes()
+    test_moved_columns_fall_back_to_a_full_read_once()
+    test_login_never_reads_full_users()
+    test_login_when_full_users_cache_is_behind()
+    test_prewarm_builds_projection_without_reads()
+    print("Projection tests passed")
@@ -0,0 +1,76 @@
+"""
+Tests for the async storage layer: read timeouts, writes that are never abandoned, and the
+separate password-hashing pool.
+"""
+import asyncio
+import threading
+import time
+
+import auth
+import sheets_async
+import storage
+
+
+class SlowStorage(storage.SheetsStorage):
+    """Sheets backend whose order calls take DELAY seconds"""
+    DELAY = 0.3
+
+    def __init__(self):
+        self.created = []
+
+    def get_order_by_id(self, order_id):
+        time.sleep(self.DELAY)
+        return None
+
+    def create_order(self, order_data):
+        time.sleep(self.DELAY)
+        self.created.append(order_data)
+        return {"success": True, "order_id": "ORD-1"}
+
+
+def test_reads_time_out_but_writes_finish():
+    backend = SlowStorage()
+    previous = storage.set_storage(backend)
+    timeout = sheets_async.CALL_TIMEOUT
+    sheets_async.CALL_TIMEOUT = 0.05
+
+    async def scenario():
+        try:
+            await sheets_async.get_order_by_id("ORD-1")
+            assert False, "read was not timed out"
+        except sheets_async.SheetsTimeoutError:
+            pass
+        # The order lands either way; the caller must hear that it did
+        return await sheets_async.create_order({"email": "ana@example.com"})
+
+    try:
+        assert asyncio.run(scenario())["order_id"] == "ORD-1"
+        assert len(backend.created) == 1
+    finally:
+        sheets_async.CALL_TIMEOUT = timeout
+        storage.set_storage(previous)
+
+
+def test_password_hashing_does_not_queue_behind_sheets_calls():
+    release = threading.Event()
+    hashed = auth.hash_password("Secret123")
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        # Every Sheets slot busy
+        blockers = [loop.run_in_executor(sheets_async._executor, release.wait)
+                    for _ in range(sheets_async.MAX_CONCURRENT_CALLS)]
+        try:
+            assert await asyncio.wait_for(sheets_async.verify_password("Secret123", hashed), 5)
+            assert await asyncio.wait_for(sheets_async.hash_password("Secret123"), 5)
+        finally:
+            release.set()
+            await asyncio.gather(*blockers)
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_reads_time_out_but_writes_finish()
+    test_password_hashing_does_not_queue_behind_sheets_calls()
+    print("Async storage layer tests passed")
@@ -0,0 +1,78 @@
+"""
+Tests for the shared Sheets client: credentials loading and the proactive token refresh.
+"""
+import datetime
+import json
+import os
+
+import gspread
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+import sheets
+
+
+def service_account_info():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                            serialization.NoEncryption()).decode()
+    return {
+        "type": "service_account",
+        "project_id": "test",
+        "private_key_id": "1",
+        "private_key": pem,
+        "client_email": "bot@test.iam.gserviceaccount.com",
+        "client_id": "1",
+        "token_uri": "https://oauth2.googleapis.com/token",
+    }
+
+
+def authorized_client():
+    """A real gspread client over real service-account credentials, with refresh() recorded"""
+    original = os.environ.get("GOOGLE_CREDENTIALS_JSON")
+    os.environ["GOOGLE_CREDENTIALS_JSON"] = json.dumps(service_account_info())
+    try:
+        client = gspread.authorize(sheets._load_credentials())
+    finally:
+        if original is None:
+            del os.environ["GOOGLE_CREDENTIALS_JSON"]
+        else:
+            os.environ["GOOGLE_CREDENTIALS_JSON"] = original
+
+    creds = client.http_client.auth
+    refreshes = []
+
+    def refresh(request):
+        refreshes.append(request)
+        creds.token = f"token-{len(refreshes)}"
+        creds.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    creds.refresh = refresh
+    return client, creds, refreshes
+
+
+def test_expiring_token_is_refreshed_before_use():
+    client, creds, refreshes = authorized_client()
+    sheets.use_sheets_client(client)
+    try:
+        # No token yet: left to the session's first request
+        sheets.get_sheets_client()
+        assert refreshes == []
+
+        creds.token = "token-0"
+        creds.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        sheets.get_sheets_client()
+        assert refreshes == []
+
+        # Inside the margin, and already expired
+        for seconds in (sheets.TOKEN_REFRESH_MARGIN - 10, -60):
+            creds.expiry = datetime.datetime.utcnow() + datetime.timedelta(seconds=seconds)
+            assert sheets.get_sheets_client() is client
+        assert len(refreshes) == 2
+        assert creds.token == "token-2" and not creds.expired
+    finally:
+        sheets.use_sheets_client(None)
+
+
+if __name__ == "__main__":
+    test_expiring_token_is_refreshed_before_use()
+    print("Sheets client tests passed")
@@ -0,0 +1,242 @@
+"""
+Tests for the SQLite storage backend.
+
+The same data is loaded into the Sheets backend (over a fake spreadsheet) and into SQLite
+through the migration tool; both backends must then answer every operation the same way.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+
+import auth
+import fake_sheets
+import sheets
+import storage
+from migrate_to_sqlite import migrate
+from sqlite_storage import SQLiteStorage
+from test_admin_pagination import make_orders
+
+USERS = [
+    ["Ana@Example.com ", "ana", "hash-a", "Ana", "", "", "", "", "", "2024-01-01 10:00:00", "", "", "true"],
+    ["ben@example.com", "", "hash-b", "", "", "", "", "", "", "2024-01-02 10:00:00", "", "", "false"],
+]
+WISHLIST = [
+    ["ana@example.com", "almond", "2024-01-01 10:00:00", ""],
+    ["ana@example.com", "", "2024-01-01 10:00:00", "walnut"],
+    ["ben@example.com", "fig", "2024-01-02 10:00:00", ""],
+]
+MASTER_HEADERS = ["Product Name", "Category", "Header Product Name", "Price_250g"]
+MASTER = [["Almond", "Nuts", "Almonds", "₹300"], ["Fig", "Dried Fruits", "Figs", 450]]
+
+
+def store_fixture(wishlist=WISHLIST):
+    orders = make_orders(120)
+    return {
+        "Users": (sheets.USERS_HEADERS, USERS),
+        "User_Wishlist": (sheets.WISHLIST_HEADERS, wishlist),
+        "Orders": (sheets.ORDERS_HEADERS, [[o[h] for h in sheets.ORDERS_HEADERS] for o in orders]),
+        "Subscribers": (sheets.SUBSCRIBERS_HEADERS, [
+            [f"s{i}@example.com", f"2024-02-{1 + i:02d} 09:00:00"] for i in range(12)
+        ]),
+        "OTP_Codes": (sheets.OTP_HEADERS, []),
+        "Master": (MASTER_HEADERS, MASTER),
+        "Brands": (["name", "image"], [["Nutraj", "/nutraj.png"]]),
+    }
+
+
+def both_backends(sheets_api, wishlist=WISHLIST):
+    """(sheets backend, sqlite backend) loaded with the same data; close the sqlite one after"""
+    client = sheets_api(store_fixture(wishlist))
+    db = SQLiteStorage(os.path.join(tempfile.mkdtemp(), "test.db"))
+    worksheets = client.spreadsheet._worksheets
+    migrate(db, lambda name: (worksheets[name].rows[0], worksheets[name].records()))
+    return storage.SheetsStorage(), db
+
+
+def test_reads_match_sheets_backend(sheets_api):
+    on_sheets, on_sqlite = both_backends(sheets_api)
+    try:
+        for backend in (on_sheets, on_sqlite):
+            assert backend.get_user_by_email("  ANA@example.com")["username"] == "ana"
+
+        calls = [
+            ("get_user_by_email", ("ben@example.com",)),
+            ("get_user_by_username", ("ANA",)),
+            ("get_user_by_username", ("",)),
+            ("get_credentials_by_email", ("ben@example.com",)),
+            ("get_credentials_by_username", ("ANA",)),
+            ("get_credentials_by_email", ("nobody@example.com",)),
+            ("get_user_wishlist", ("ana@example.com",)),
+            ("get_user_cart", ("ana@example.com",)),
+            ("get_user_orders", ("user3@example.com",)),
+            ("get_order_by_id", ("ORD-00042",)),
+            ("get_products", ()),
+            ("get_categories", ()),
+            ("get_brands", ()),
+            ("get_all_subscribers", ()),
+        ]
+        for name, args in calls:
+            assert getattr(on_sheets, name)(*args) == getattr(on_sqlite, name)(*args), name
+
+        for params in [{}, {"stage": "shipped"}, {"email": "User2@example.com", "stage": "Delivered"},
+                       {"date_from": "2024-01-02", "date_to": "2024-01-03", "order": "asc"}]:
+            sheets_pages, sqlite_pages = [], []
+            for backend, pages in ((on_sheets, sheets_pages), (on_sqlite, sqlite_pages)):
+                cursor = None
+                while True:
+                    page = backend.query_orders(limit=17, cursor=cursor, **params)
+                    pages.append(page["orders"])
+                    cursor = page["next_cursor"]
+                    if cursor is None:
+                        break
+            assert sheets_pages == sqlite_pages, params
+
+        assert on_sheets.query_subscribers(limit=5) == on_sqlite.query_subscribers(limit=5)
+        sheets_stats, sqlite_stats = on_sheets.get_admin_stats(), on_sqlite.get_admin_stats()
+        assert sheets_stats == sqlite_stats
+    finally:
+        on_sqlite.close()
+
+
+def test_writes_match_sheets_backend(sheets_api):
+    on_sheets, on_sqlite = both_backends(sheets_api)
+    try:
+        for backend in (on_sheets, on_sqlite):
+            backend.create_user("cat@example.com", "hash-c")
+            backend.update_user_profile_auth("cat@example.com", username="cat", city="Pune")
+            backend.update_password_hash("ben@example.com", "hash-b2")
+            assert backend.update_password_hash("nobody@example.com", "x") == {"error": "User not found"}
+            backend.add_to_wishlist("ben@example.com", "cashew")
+            assert backend.add_to_wishlist("ben@example.com", "cashew")["message"] == "Already in wishlist"
+            backend.add_to_cart_history("ben@example.com", "pista")
+            backend.remove_from_wishlist("ana@example.com", "almond")
+            backend.remove_from_cart_history("ana@example.com", "walnut")
+            backend.update_order_status("ORD-00007", "Delivered")
+            backend.update_product_offer("Fig", True)
+            backend.store_subscriber("new@example.com")
+
+        def without_times(value):
+            if isinstance(value, dict):
+                return {k: without_times(v) for k, v in value.items() if k not in ("created_at", "last_login", "added_at")}
+            if isinstance(value, list):
+                return [without_times(v) for v in value]
+            return value
+
+        for name, args in [
+            ("get_user_by_username", ("cat",)),
+            ("get_user_by_email", ("ben@example.com",)),
+            ("get_user_wishlist", ("ben@example.com",)),
+            ("get_user_cart", ("ben@example.com",)),
+            ("get_user_wishlist", ("ana@example.com",)),
+            ("get_user_cart", ("ana@example.com",)),
+            ("get_order_by_id", ("ORD-00007",)),
+            ("get_admin_stats", ()),
+        ]:
+            assert without_times(getattr(on_sheets, name)(*args)) == without_times(getattr(on_sqlite, name)(*args)), name
+
+        assert sheets.get_sheet_data("Master")[1]["Special_Offer"] == "true"
+        assert on_sqlite._records('SELECT "Special_Offer" FROM "Master" ORDER BY _row') == [
+            {"Special_Offer": ""}, {"Special_Offer": "true"}
+        ]
+        assert [p["id"] for p in on_sheets.get_products()] == [p["id"] for p in on_sqlite.get_products()]
+        assert on_sheets.query_subscribers(limit=1)["total"] == on_sqlite.query_subscribers(limit=1)["total"] == 13
+    finally:
+        on_sqlite.close()
+
+
+def test_orders_and_otp_on_sqlite(sheets_api):
+    _, db = both_backends(sheets_api)
+    try:
+        order_id = db.create_order({"email": "ana@example.com", "items": [{"id": "almond"}], "total_amount": 900})["order_id"]
+        assert db.get_order_by_id(order_id)["Total_Amount"] == 900
+        assert db.get_order_by_id("ORD-MISSING") is None
+        assert db.update_order_status("ORD-MISSING", "Shipped") == {"error": "Order not found"}
+
+        db.store_otp("ana@example.com", "123456")
+        assert db.verify_otp("ana@example.com", "000000") == {"error": "Invalid OTP"}
+        assert db.verify_otp("ana@example.com", "123456") == {"success": True}
+        # Codes are single-use
+        assert db.verify_otp("ana@example.com", "123456") == {"error": "Invalid OTP"}
+
+        assert "error" in db.query_orders(cursor="garbage")
+    finally:
+        db.close()
+
+
+def test_legacy_password_endpoints_on_sqlite(sheets_api):
+    _, db = both_backends(sheets_api)
+    try:
+        assert db.authenticate_user("new@example.com", "pw-1") == {"error": "User not found"}
+        assert db.register_user("new@example.com", "pw-1")["Email"] == "new@example.com"
+        assert db.register_user("NEW@example.com", "pw-1") == {"error": "User already exists"}
+        # Stored hashed, so the regular login sees the same account
+        assert auth.verify_password("pw-1", db.get_credentials_by_email("new@example.com")["password_hash"])
+
+        assert db.authenticate_user("new@example.com", "wrong") == {"error": "Invalid Password"}
+        assert db.reset_password("new@example.com", "pw-2") == {"success": True}
+        assert db.authenticate_user(" New@example.com", "pw-2")["Email"] == "new@example.com"
+
+        profile = db.update_user_profile("new@example.com", {"Name": "Newt", "Phone": "123", "Age": "30"})
+        assert profile["Name"] == "Newt" and profile["Phone"] == "123"
+        assert db.get_user_by_email("new@example.com")["full_name"] == "Newt"
+        assert db.update_user_profile("nobody@example.com", {"Name": "x"}) == {"error": "User not found"}
+    finally:
+        db.close()
+
+
+def test_numeric_product_ids_can_be_removed(sheets_api):
+    # The sheet hands a numeric product ID back as a number, and migrate keeps it one
+    on_sheets, on_sqlite = both_backends(sheets_api, WISHLIST + [["ben@example.com", "101", "2024-01-03 10:00:00", ""]])
+    try:
+        for backend in (on_sheets, on_sqlite):
+            assert backend.add_to_wishlist("ben@example.com", "101")["message"] == "Already in wishlist"
+            assert backend.remove_from_wishlist("ben@example.com", "101") == {"success": True}
+            assert [w["product_id"] for w in backend.get_user_wishlist("ben@example.com")] == ["fig"]
+    finally:
+        on_sqlite.close()
+
+
+def test_close_reaches_every_thread():
+    db = SQLiteStorage(os.path.join(tempfile.mkdtemp(), "test.db"))
+    opened = []
+    threads = [threading.Thread(target=lambda: opened.append(db._conn())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    opened.append(db._conn())
+
+    db.close()
+    for conn in opened:
+        try:
+            conn.execute("SELECT 1")
+            assert False, "connection left open"
+        except sqlite3.ProgrammingError:
+            pass
+    # Still usable afterwards, on a new connection
+    assert db.get_user_by_email("ana@example.com") is None
+    db.close()
+
+
+def test_incomplete_backend_fails_on_creation():
+    # The Sheets backend's operations, less one
+    operations = {name: value for name, value in vars(storage.SheetsStorage).items()
+                  if not name.startswith("__") and name != "get_brands"}
+    NoBrands = type("NoBrands", (storage.Storage,), operations)
+    try:
+        NoBrands()
+        assert False, "created a backend missing get_brands"
+    except TypeError as e:
+        assert "get_brands" in str(e)
+    storage.SheetsStorage()
+
+if __name__ == "__main__":
+    for test in (test_reads_match_sheets_backend, test_writes_match_sheets_backend,
+                 test_orders_and_otp_on_sqlite, test_legacy_password_endpoints_on_sqlite,
+                 test_numeric_product_ids_can_be_removed):
+        with fake_sheets.installed() as install:
+            test(install)
+    test_close_reaches_every_thread()
+    test_incomplete_backend_fails_on_creation()
+    print("SQLite storage tests passed")
@@ -0,0 +1,114 @@
+"""
+Tests for incremental (tail) refreshes of the append-only sheets and their periodic full reconcile.
+"""
+import json
+
+import fake_sheets
+import sheets
+
+FIXTURE = dict(products=10, users=10, orders=200, wishlist=20)
+
+
+def append_elsewhere(client, sheet_name, row):
+    """A row appended by another worker or by hand: the sheet changes, the cache doesn't"""
+    client.spreadsheet._worksheets[sheet_name].rows.append([str(v) for v in row])
+
+
+def new_order(order_id):
+    return [order_id, "user1@example.com", "User 1", json.dumps([{"id": "Product 1", "quantity": 1}]),
+            750, "Pending", "WhatsApp/COD", "2024-06-01 10:00:00", "Order Placed"]
+
+
+def test_refresh_reads_only_new_rows():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        sheets.get_order_by_id("ORD-NONE")
+        version = sheets.get_cache_version("Orders")
+
+        # Nothing new: one small read, same version, so derived data is kept
+        sheets.refresh_sheet("Orders", 0)
+        assert client.calls["get"] == 1 and client.calls["get_all_records"] == 1
+        assert sheets.get_cache_version("Orders") == version
+
+        append_elsewhere(client, "Orders", new_order("ORD-NEW-1"))
+        append_elsewhere(client, "Orders", new_order("ORD-NEW-2"))
+        data = sheets.refresh_sheet("Orders", 0)
+        assert client.calls["get"] == 2 and client.calls["get_all_records"] == 1
+        assert data == client.spreadsheet._worksheets["Orders"].get_all_records()
+        # Indexes take the new rows in too
+        assert sheets._lookup_order("ORD-NEW-2")["Total_Amount"] == 750
+        assert sheets.get_admin_stats()["orders_count"] == 202
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_deleted_or_edited_rows_force_a_full_read():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        worksheet = client.spreadsheet._worksheets["Orders"]
+        sheets.get_sheet_data("Orders")
+        del worksheet.rows[5]
+        assert sheets.refresh_sheet("Orders", 0) == worksheet.get_all_records()
+        assert len(sheets.get_sheet_data("Orders")) == 199
+
+        worksheet.rows[-1][5] = "Shipped"
+        assert sheets.refresh_sheet("Orders", 0)[-1]["Status"] == "Shipped"
+        assert client.calls["get"] == 2
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_full_reconcile_after_interval():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        sheets.get_sheet_data("Orders")
+        # An edit in the middle is invisible to a tail read...
+        client.spreadsheet._worksheets["Orders"].rows[10][5] = "Paid"
+        assert sheets.refresh_sheet("Orders", 0)[9]["Status"] == "Pending"
+
+        # ...until the periodic full read
+        sheets.CACHE["Orders"]["reconciled_at"] -= sheets.INCREMENTAL_SHEETS["Orders"]
+        assert sheets.refresh_sheet("Orders", 0)[9]["Status"] == "Paid"
+        assert client.calls["get_all_records"] == 2
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_batch_refresh_uses_tail_ranges():
+    client = fake_sheets.install(fake_sheets.make_fixture(**FIXTURE))
+    try:
+        sheets.get_sheets_data(["Orders", "Users"])
+        append_elsewhere(client, "Orders", new_order("ORD-NEW-3"))
+        sheets.CACHE["Orders"]["timestamp"] = 0
+        sheets.CACHE["Users"]["timestamp"] = 0
+
+        data = sheets.get_sheets_data(["Orders", "Users"])
+        assert data["Orders"][-1]["Order_ID"] == "ORD-NEW-3"
+        assert len(data["Users"]) == 10
+        assert client.calls["values_batch_get"] == 2
+    finally:
+        fake_sheets.uninstall()
+
+
+def test_verify_otp_sees_codes_from_other_workers():
+    client = fake_sheets.install({**fake_sheets.make_fixture(**FIXTURE), "OTP_Codes": (sheets.OTP_HEADERS, [])})
+    try:
+        sheets.store_otp("user1@example.com", "111111")
+        sheets.verify_otp("user1@example.com", "000000")
+        append_elsewhere(client, "OTP_Codes",
+                         ["user2@example.com", "222222", "2024-01-01 10:00:00", "2099-01-01 10:00:00", "false"])
+
+        assert sheets.verify_otp("user2@example.com", "000000") == {"error": "Invalid OTP"}
+        assert sheets.CACHE["OTP_Codes"]["data"][-1]["Email"] == "user2@example.com"
+        assert client.calls["get_all_records"] == 1 and client.calls["get"] == 1
+    finally:
+        fake_sheets.uninstall()
+
+
+if __name__ == "__main__":
+    test_refresh_reads_only_new_rows()
+    test_deleted_or_edited_rows_force_a_full_read()
+    test_full_reconcile_after_interval()
+    test_batch_refresh_uses_tail_ranges()
+    test_verify_otp_sees_codes_from_other_workers()
+    print("Tail fetch tests passed")
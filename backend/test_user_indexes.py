@@ -0,0 +1,42 @@
+"""
+Tests for the per-email indexes behind wishlist, cart history and order history reads.
+"""
+import fake_sheets
+import sheets
+
+EMAILS = [f"user{i}@example.com" for i in range(5)]
+
+
+def scan(records, column, email, field):
+    """What the old full-sheet filter returned"""
+    return [r[field] for r in records if r.get(column) == email and r.get(field)]
+
+
+def test_per_user_reads_match_a_full_scan_after_writes(sheets_api):
+    client = sheets_api({
+        "User_Wishlist": (sheets.WISHLIST_HEADERS, [
+            [EMAILS[i % 5], f"p{i}" if i % 2 else "", "2024-01-01 10:00:00", "" if i % 2 else f"c{i}"] for i in range(40)
+        ]),
+        "Orders": (sheets.ORDERS_HEADERS, [
+            [f"ORD-{i}", EMAILS[i % 3], "", "[]", 100, "Pending", "", "2024-01-01 10:00:00", "Order Placed"] for i in range(30)
+        ]),
+    })
+    sheets.add_to_wishlist(EMAILS[4], "new-wish")
+    sheets.add_to_cart_history(EMAILS[0], "new-cart")
+    sheets.remove_from_wishlist(EMAILS[1], "p1")
+    sheets.remove_from_cart_history(EMAILS[2], "c2")
+    sheets.create_order({"email": EMAILS[4], "items": [], "total_amount": 1})
+
+    wish_rows = client.spreadsheet._worksheets["User_Wishlist"].records()
+    order_rows = client.spreadsheet._worksheets["Orders"].records()
+    for email in EMAILS + ["nobody@example.com"]:
+        assert [w["product_id"] for w in sheets.get_user_wishlist(email)] == scan(wish_rows, "Email", email, "Product_ID")
+        assert [c["product_id"] for c in sheets.get_user_cart(email)] == scan(wish_rows, "Email", email, "Add_Card_Product")
+        assert sheets.get_user_orders(email) == [o for o in order_rows if o["User_Email"] == email]
+    assert len(sheets.get_user_orders(EMAILS[4])) == 1
+
+
+if __name__ == "__main__":
+    with fake_sheets.installed() as install:
+        test_per_user_reads_match_a_full_scan_after_writes(install)
+    print("Per-user index tests passed")
@@ -0,0 +1,111 @@
+"""
+Tests for write-through cache updates in sheets.py.
+
+Each mutation should leave the cached records exactly as a fresh
+get_all_records() would return them, without refetching the sheet.
+"""
+import fake_sheets
+import sheets
+
+
+def assert_cache_matches_sheet(client, sheet_name):
+    assert sheets.CACHE[sheet_name]['data'] == client.spreadsheet._worksheets[sheet_name].records()
+
+
+def test_user_writes_keep_users_warm(sheets_api):
+    client = sheets_api({"Users": (sheets.USERS_HEADERS, [
+        ["ana@example.com", "ana", "hash-a", "", "", "", "", "", "", "", "", "", "true"],
+    ])})
+    assert sheets.get_user_by_email("ana@example.com")["username"] == "ana"
+
+    sheets.create_user("ben@example.com", "hash-b")
+    sheets.update_session_token("ana@example.com", "token-1")
+    sheets.update_user_profile_auth("ben@example.com", username="ben", pincode="560001")
+    sheets.update_password_hash("ana@example.com", "hash-a2")
+
+    ben = sheets.get_user_by_email("ben@example.com")
+    assert ben["username"] == "ben" and ben["profile_complete"] == "true"
+    assert sheets.get_user_by_email("ana@example.com")["password_hash"] == "hash-a2"
+    # The email/username indexes follow the writes too
+    assert sheets.get_user_by_username("BEN")["email"] == "ben@example.com"
+    assert sheets.get_user_by_email("  Ben@Example.com ")["username"] == "ben"
+    assert client.reads() == 1, "writes should not force a refetch"
+    assert_cache_matches_sheet(client, "Users")
+
+
+def test_wishlist_and_cart_writes_keep_cache_warm(sheets_api):
+    client = sheets_api({"User_Wishlist": (sheets.WISHLIST_HEADERS, [["ana@example.com", "almond", "", ""]])})
+    sheets.get_user_wishlist("ana@example.com")
+
+    sheets.add_to_wishlist("ana@example.com", "cashew")
+    sheets.add_to_cart_history("ana@example.com", "walnut")
+    sheets.add_to_cart_history("ana@example.com", "walnut")
+    sheets.add_to_cart_history("ana@example.com", "pista")
+    sheets.remove_from_wishlist("ana@example.com", "almond")
+    sheets.remove_from_cart_history("ana@example.com", "walnut")
+
+    assert [w["product_id"] for w in sheets.get_user_wishlist("ana@example.com")] == ["cashew"]
+    assert [c["product_id"] for c in sheets.get_user_cart("ana@example.com")] == ["pista"]
+    # add_to_wishlist and remove_* still read the sheet directly; the cache is never refetched
+    # (the cart's batch read asks only for Master)
+    assert client.calls["get_all_records"] == 4
+    assert_cache_matches_sheet(client, "User_Wishlist")
+
+
+def test_order_writes_keep_orders_warm(sheets_api):
+    client = sheets_api({"Orders": (sheets.ORDERS_HEADERS, [])})
+    sheets.get_all_orders()
+
+    order_id = sheets.create_order({"email": "ana@example.com", "items": [], "total_amount": 1200})["order_id"]
+    sheets.update_order_status(order_id, "Delivered")
+
+    order = sheets.get_order_by_id(order_id)
+    assert order["Tracking_Stage"] == "Delivered" and order["Status"] == "Completed"
+    assert order["Total_Amount"] == 1200
+    assert client.reads() == 1
+    assert_cache_matches_sheet(client, "Orders")
+
+
+def refresh_right_after(client, sheet_name, method):
+    """Make the worksheet's `method` refresh the cache once the write has landed in the sheet,
+    as a refresh that overlaps the write would"""
+    worksheet = client.spreadsheet._worksheets[sheet_name]
+    write = getattr(worksheet, method)
+
+    def write_then_refresh(*args, **kwargs):
+        result = write(*args, **kwargs)
+        if sheet_name in sheets.CACHE:
+            sheets.CACHE[sheet_name] = {**sheets.CACHE[sheet_name], 'timestamp': 0}
+        sheets.get_sheet_data(sheet_name)
+        return result
+    setattr(worksheet, method, write_then_refresh)
+
+
+def test_refresh_during_a_write_is_not_applied_twice(sheets_api):
+    client = sheets_api({
+        "Users": (sheets.USERS_HEADERS, []),
+        "User_Wishlist": (sheets.WISHLIST_HEADERS, [["ana@example.com", "almond", "", ""]] * 2),
+    })
+    sheets.get_sheet_data("Users")
+    sheets.get_sheet_data("User_Wishlist")
+    # A full read for Users, a tail read for the wishlist
+    refresh_right_after(client, "Users", "append_row")
+    refresh_right_after(client, "User_Wishlist", "append_row")
+    refresh_right_after(client, "User_Wishlist", "delete_rows")
+
+    sheets.create_user("ben@example.com", "hash-b")
+    sheets.add_to_wishlist("ana@example.com", "cashew")
+    sheets.remove_from_wishlist("ana@example.com", "almond")
+
+    assert sheets.get_user_by_email("ben@example.com")["password_hash"] == "hash-b"
+    assert [w["product_id"] for w in sheets.get_user_wishlist("ana@example.com")] == ["almond", "cashew"]
+    assert_cache_matches_sheet(client, "Users")
+    assert_cache_matches_sheet(client, "User_Wishlist")
+
+
+if __name__ == "__main__":
+    for test in (test_user_writes_keep_users_warm, test_wishlist_and_cart_writes_keep_cache_warm,
+                 test_order_writes_keep_orders_warm, test_refresh_during_a_write_is_not_applied_twice):
+        with fake_sheets.installed() as install:
+            test(install)
+    print("Write-through cache tests passed")
@@ -13,7 +13,8 @@ const AdminInventory = () => {
         setIsLoading(true);
         try {
             // Using public endpoint for now, ideally an admin specific one
-            const response = await fetch(`${API_BASE_URL}/products`);
+            // 'no-cache' always revalidates (ETag -> 304 when unchanged) so offer toggles show up at once
+            const response = await fetch(`${API_BASE_URL}/products`, { cache: 'no-cache' });
             if (response.ok) {
                 const data = await response.json();
                 setProducts(data);
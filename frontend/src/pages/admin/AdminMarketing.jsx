@@ -4,6 +4,7 @@ import { Send, Users, CheckCircle, AlertCircle } from 'lucide-react';
 
 const AdminMarketing = () => {
     const [subscribers, setSubscribers] = useState([]);
+    const [subscriberCount, setSubscriberCount] = useState(0);
     const [subject, setSubject] = useState('');
     const [content, setContent] = useState('');
     const [isSending, setIsSending] = useState(false);
@@ -14,12 +15,14 @@ const AdminMarketing = () => {
         const fetchSubscribers = async () => {
             const token = localStorage.getItem('adminToken');
             try {
-                const res = await fetch(`${API_BASE_URL}/admin/subscribers`, {
+                // Newest 10 for the list; the total comes with the page
+                const res = await fetch(`${API_BASE_URL}/admin/subscribers?limit=10`, {
                     headers: { 'Authorization': `Bearer ${token}` }
                 });
                 if (res.ok) {
                     const data = await res.json();
-                    setSubscribers(data);
+                    setSubscribers(data.subscribers || []);
+                    setSubscriberCount(data.total || 0);
                 }
             } catch (err) {
                 console.error("Failed to fetch subscribers", err);
@@ -30,7 +33,7 @@ const AdminMarketing = () => {
 
     const handleSend = async (e) => {
         e.preventDefault();
-        if (!confirm(`Are you sure you want to send this email to ${subscribers.length} subscribers?`)) return;
+        if (!confirm(`Are you sure you want to send this email to ${subscriberCount} subscribers?`)) return;
 
         setIsSending(true);
         setStatus(null);
@@ -105,7 +108,7 @@ const AdminMarketing = () => {
                         )}
 
                         <div className="form-actions">
-                            <button type="submit" className="send-btn" disabled={isSending || subscribers.length === 0}>
+                            <button type="submit" className="send-btn" disabled={isSending || subscriberCount === 0}>
                                 {isSending ? 'Sending...' : (
                                     <>
                                         <Send size={18} /> Send Campaign
@@ -123,7 +126,7 @@ const AdminMarketing = () => {
                         </div>
                         <div>
                             <span className="audience-label">Total Subscribers</span>
-                            <span className="audience-count">{subscribers.length}</span>
+                            <span className="audience-count">{subscriberCount}</span>
                         </div>
                     </div>
                     <div className="subscribers-list">
@@ -132,7 +135,7 @@ const AdminMarketing = () => {
                             <p className="empty-text">No subscribers yet.</p>
                         ) : (
                             <ul>
-                                {subscribers.slice(-10).reverse().map((sub, i) => (
+                                {subscribers.map((sub, i) => (
                                     <li key={i}>
                                         <span className="sub-email">{sub.Email}</span>
                                         <span className="sub-date">{new Date(sub.Joined_At).toLocaleDateString()}</span>
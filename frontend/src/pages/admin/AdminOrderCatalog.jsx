@@ -20,16 +20,26 @@ const AdminOrderCatalog = () => {
 
     const fetchOrders = async () => {
         const token = localStorage.getItem('adminToken');
+        // Only the last 30 days are shown, so ask for just that range and follow the cursor through it
+        const since = new Date();
+        since.setDate(since.getDate() - 31);
+        const pad = (n) => String(n).padStart(2, '0');
+        const dateFrom = `${since.getFullYear()}-${pad(since.getMonth() + 1)}-${pad(since.getDate())}`;
         try {
-            const response = await fetch(`${API_BASE_URL}/admin/orders`, {
-                headers: { 'Authorization': `Bearer ${token}` }
-            });
-            if (response.ok) {
+            const ordersArray = [];
+            let cursor = null;
+            do {
+                const params = new URLSearchParams({ date_from: dateFrom, limit: 200 });
+                if (cursor) params.set('cursor', cursor);
+                const response = await fetch(`${API_BASE_URL}/admin/orders?${params}`, {
+                    headers: { 'Authorization': `Bearer ${token}` }
+                });
+                if (!response.ok) return;
                 const data = await response.json();
-                // Extract orders array from response
-                const ordersArray = data.orders || data || [];
-                groupOrdersByTime(ordersArray);
-            }
+                ordersArray.push(...(data.orders || []));
+                cursor = data.next_cursor;
+            } while (cursor);
+            groupOrdersByTime(ordersArray);
         } catch (error) {
             console.error('Failed to fetch orders', error);
         }
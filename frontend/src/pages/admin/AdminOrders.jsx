@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import AdminLayout from './AdminLayout';
 import { Search, ChevronDown, ChevronUp, Copy, Truck, CheckCircle, Package, AlertCircle, XCircle } from 'lucide-react';
 import AdminOrderCatalog from './AdminOrderCatalog';
@@ -8,29 +8,57 @@ const AdminOrders = () => {
     const [isLoading, setIsLoading] = useState(true);
     const [expandedRow, setExpandedRow] = useState(null);
     const [searchTerm, setSearchTerm] = useState('');
+    const [stageFilter, setStageFilter] = useState('');
+    const [nextCursor, setNextCursor] = useState(null);
     const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000/api';
+    const PAGE_SIZE = 50;
 
-    const fetchOrders = async () => {
+    // Only the latest request may fill the table (typing fires several)
+    const latestRequest = useRef(0);
+
+    // Orders come newest first, one page at a time; pass a cursor to append the next page.
+    // The search runs on the server: an email goes in as the `email` filter, anything else
+    // is looked up as an order ID.
+    const fetchOrders = async (cursor = null) => {
+        const requestId = ++latestRequest.current;
         setIsLoading(true);
         const token = localStorage.getItem('adminToken');
+        const term = searchTerm.trim();
         try {
-            const response = await fetch(`${API_BASE_URL}/admin/orders`, {
+            if (term && !term.includes('@')) {
+                const response = await fetch(`${API_BASE_URL}/orders/${encodeURIComponent(term.toUpperCase())}`);
+                const order = response.ok ? (await response.json()).order : null;
+                if (requestId !== latestRequest.current) return;
+                setOrders(order && (!stageFilter || order.Tracking_Stage === stageFilter) ? [order] : []);
+                setNextCursor(null);
+                return;
+            }
+
+            const params = new URLSearchParams({ limit: PAGE_SIZE });
+            if (stageFilter) params.set('stage', stageFilter);
+            if (term) params.set('email', term);
+            if (cursor) params.set('cursor', cursor);
+            const response = await fetch(`${API_BASE_URL}/admin/orders?${params}`, {
                 headers: { 'Authorization': `Bearer ${token}` }
             });
-            if (response.ok) {
+            if (response.ok && requestId === latestRequest.current) {
                 const data = await response.json();
-                setOrders(data.orders || []);
+                const page = data.orders || [];
+                setOrders(prev => cursor ? [...prev, ...page] : page);
+                setNextCursor(data.next_cursor || null);
             }
         } catch (error) {
             console.error(error);
         } finally {
-            setIsLoading(false);
+            if (requestId === latestRequest.current) setIsLoading(false);
         }
     };
 
+    // A new stage or search starts again from the first page; typing is debounced
     useEffect(() => {
-        fetchOrders();
-    }, []);
+        const timer = setTimeout(() => fetchOrders(), searchTerm ? 400 : 0);
+        return () => clearTimeout(timer);
+    }, [stageFilter, searchTerm]);
 
     const handleStatusUpdate = async (orderId, newStatus) => {
         const token = localStorage.getItem('adminToken');
@@ -76,11 +104,6 @@ const AdminOrders = () => {
         }
     };
 
-    const filteredOrders = orders.filter(o =>
-        o.Order_ID.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        o.User_Email.toLowerCase().includes(searchTerm.toLowerCase())
-    );
-
     const steps = ['Order Placed', 'Confirmed', 'Picked', 'Shipped', 'Delivered'];
 
     return (
@@ -90,14 +113,26 @@ const AdminOrders = () => {
                     <h1 className="page-title">Order Management</h1>
                     <p className="page-subtitle">Track and update customer orders.</p>
                 </div>
-                <div className="search-bar">
-                    <Search size={18} />
-                    <input
-                        type="text"
-                        placeholder="Search ID or Email..."
-                        value={searchTerm}
-                        onChange={(e) => setSearchTerm(e.target.value)}
-                    />
+                <div className="header-filters">
+                    <select
+                        className="stage-filter"
+                        value={stageFilter}
+                        onChange={(e) => setStageFilter(e.target.value)}
+                    >
+                        <option value="">All stages</option>
+                        {[...steps, 'Cancelled'].map(step => (
+                            <option key={step} value={step}>{step}</option>
+                        ))}
+                    </select>
+                    <div className="search-bar">
+                        <Search size={18} />
+                        <input
+                            type="text"
+                            placeholder="Order ID or customer email..."
+                            value={searchTerm}
+                            onChange={(e) => setSearchTerm(e.target.value)}
+                        />
+                    </div>
                 </div>
             </div>
 
@@ -118,7 +153,7 @@ const AdminOrders = () => {
                         </tr>
                     </thead>
                     <tbody>
-                        {filteredOrders.map(order => (
+                        {orders.map(order => (
                             <React.Fragment key={order.Order_ID}>
                                 <tr className={`order-row ${expandedRow === order.Order_ID ? 'expanded' : ''}`} onClick={() => toggleRow(order.Order_ID)}>
                                     <td className="font-mono">{order.Order_ID}</td>
@@ -198,6 +233,13 @@ const AdminOrders = () => {
                         ))}
                     </tbody>
                 </table>
+                {nextCursor && (
+                    <div className="load-more">
+                        <button onClick={() => fetchOrders(nextCursor)} disabled={isLoading}>
+                            {isLoading ? 'Loading...' : 'Load more orders'}
+                        </button>
+                    </div>
+                )}
             </div>
 
             <style jsx>{`
@@ -216,6 +258,19 @@ const AdminOrders = () => {
                     color: #666;
                     font-size: 14px;
                 }
+                .header-filters {
+                    display: flex;
+                    align-items: center;
+                    gap: 12px;
+                }
+                .stage-filter {
+                    padding: 10px 16px;
+                    border-radius: 50px;
+                    border: 1px solid #e1e1e1;
+                    background: #fff;
+                    font-size: 14px;
+                    outline: none;
+                }
                 .search-bar {
                     display: flex;
                     align-items: center;
@@ -239,6 +294,24 @@ const AdminOrders = () => {
                     box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.05);
                     overflow: hidden;
                 }
+                .load-more {
+                    display: flex;
+                    justify-content: center;
+                    padding: 16px;
+                }
+                .load-more button {
+                    padding: 10px 20px;
+                    border-radius: 8px;
+                    border: 1px solid #e5e7eb;
+                    background: #fff;
+                    font-size: 13px;
+                    font-weight: 500;
+                    cursor: pointer;
+                }
+                .load-more button:disabled {
+                    opacity: 0.6;
+                    cursor: default;
+                }
                 .orders-table {
                     width: 100%;
                     border-collapse: collapse;